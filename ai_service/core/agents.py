@@ -20,6 +20,10 @@ class AgentConfig:
     voice_prefs: Dict[str, str]
     description: str
     active: bool = True
+    # Prompt budget in input tokens (None = CONTEXT_TOKEN_BUDGET)
+    context_token_budget: Optional[int] = None
+    # Spoken reply length in seconds (None = SPEECH_TARGET_SECONDS)
+    speech_target_seconds: Optional[float] = None
 
     def build_prompt(self, lang: str, emotion_snapshot: Optional[Dict] = None, rag_context: Optional[str] = None) -> str:
         """Build the complete system prompt for the agent"""
@@ -0,0 +1,76 @@
+"""
+Chat session module for AI Psychologist service
+Per-session Gemini chat history kept incrementally across turns
+"""
+from typing import Dict, List
+from collections import deque
+import threading
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.context_builder import ContextExchange, estimate_tokens
+except ImportError:
+    from .context_builder import ContextExchange, estimate_tokens
+
+load_dotenv()
+
+# Most exchanges kept per chat; how many are sent is decided by the token budget
+CHAT_HISTORY_TURNS = int(os.getenv("CHAT_HISTORY_TURNS", "10"))
+
+
+class SessionChat:
+    """
+    Conversation state for one session
+    The system instruction is fixed when the chat is created; history grows by
+    one exchange per turn (token-counted once, on append), so each turn only adds
+    the new user message instead of rebuilding the whole context.
+    """
+    def __init__(self, session_id: str, system_instruction: str, max_turns: int = CHAT_HISTORY_TURNS):
+        self.session_id = session_id
+        self.system_instruction = system_instruction
+        self.system_tokens = estimate_tokens(system_instruction)
+        self.max_turns = max_turns
+        self.history: deque = deque(maxlen=max_turns)
+        self.turns = 0
+
+    def seed(self, memory_turns: List[Dict[str, str]]):
+        """Load earlier turns (e.g. from MemoryManager) into an empty chat"""
+        if self.history:
+            return
+        for turn in memory_turns[-self.max_turns:]:
+            self.append(turn["user"], turn["assistant"])
+
+    def exchanges(self) -> List[ContextExchange]:
+        """Past exchanges, oldest first"""
+        return list(self.history)
+
+    def append(self, user_text: str, reply: str):
+        """Record a completed exchange"""
+        self.history.append(ContextExchange(user_text, reply))
+        self.turns += 1
+
+
+_session_chats: Dict[str, SessionChat] = {}
+_lock = threading.Lock()
+
+
+def get_session_chat(session_id: str, system_instruction: str) -> SessionChat:
+    """Get or create the chat for a session"""
+    with _lock:
+        chat = _session_chats.get(session_id)
+        if chat is None:
+            chat = SessionChat(session_id, system_instruction)
+            _session_chats[session_id] = chat
+        return chat
+
+
+def cleanup_session_chat(session_id: str):
+    """Drop a finished session's chat"""
+    with _lock:
+        _session_chats.pop(session_id, None)
+
+
+def get_active_chats_count() -> int:
+    """Get number of sessions with a live chat"""
+    return len(_session_chats)
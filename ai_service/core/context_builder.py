@@ -0,0 +1,157 @@
+"""
+Context builder module for AI Psychologist service
+Token-budgeted prompt assembly: fills system prompt, emotion context,
+retrieved snippets and recent turns by priority within an agent's budget
+"""
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+import math
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Default prompt budget per turn (input tokens); agents may override
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+# Longest single history message kept verbatim; longer ones keep their tail
+CONTEXT_MAX_MESSAGE_TOKENS = int(os.getenv("CONTEXT_MAX_MESSAGE_TOKENS", "250"))
+
+# Characters per token for the local estimator. Gemini's SentencePiece
+# vocabulary packs Latin text at ~4 chars/token but Indic scripts far denser.
+_LATIN_CHARS_PER_TOKEN = 4.0
+_OTHER_CHARS_PER_TOKEN = 1.6
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate Gemini token count locally (no API round trip)"""
+    if not text:
+        return 0
+    ascii_chars = 0
+    other_chars = 0
+    for char in text:
+        if char.isspace():
+            continue
+        if ord(char) < 128:
+            ascii_chars += 1
+        else:
+            other_chars += 1
+    words = len(text.split())
+    # Each word boundary tends to start a new token
+    return max(1, math.ceil(max(ascii_chars / _LATIN_CHARS_PER_TOKEN, words * 0.75) + other_chars / _OTHER_CHARS_PER_TOKEN))
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the tail of text within max_tokens (the end of a monologue matters most)"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    low, high = 0, len(words)
+    # Smallest start index whose tail fits
+    while low < high:
+        mid = (low + high) // 2
+        if estimate_tokens(" ".join(words[mid:])) + 1 <= max_tokens:
+            high = mid
+        else:
+            low = mid + 1
+    return "… " + " ".join(words[low:])
+
+
+@dataclass
+class ContextExchange:
+    """One past user/assistant exchange with its (cached) token estimate"""
+    user: str
+    assistant: str
+    tokens: int = -1
+
+    def __post_init__(self):
+        if self.tokens < 0:
+            self.user = clip_to_tokens(self.user, CONTEXT_MAX_MESSAGE_TOKENS)
+            self.assistant = clip_to_tokens(self.assistant, CONTEXT_MAX_MESSAGE_TOKENS)
+            self.tokens = estimate_tokens(self.user) + estimate_tokens(self.assistant)
+
+
+@dataclass
+class BuiltContext:
+    """Result of context assembly for one turn"""
+    exchanges: List[ContextExchange] = field(default_factory=list)
+    rag_passages: List[str] = field(default_factory=list)
+    emotion_text: str = ""
+    sizes: Dict[str, int] = field(default_factory=dict)
+    dropped: Dict[str, int] = field(default_factory=dict)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {"prompt_tokens": dict(self.sizes), "dropped": dict(self.dropped)}
+
+
+def build_context(
+    budget_tokens: int,
+    system_tokens: int,
+    user_text: str,
+    history: List[ContextExchange],
+    emotion_text: str = "",
+    rag_passages: Optional[List[str]] = None
+) -> BuiltContext:
+    """
+    Select context for a turn within budget_tokens
+
+    Priority: system prompt and current user message (always sent), then
+    emotion context, retrieved snippets in rank order, then past exchanges
+    newest first. Lower-priority items that don't fit are dropped.
+    """
+    built = BuiltContext()
+    user_tokens = estimate_tokens(user_text)
+    remaining = budget_tokens - system_tokens - user_tokens
+
+    emotion_tokens = estimate_tokens(emotion_text)
+    if emotion_text and emotion_tokens <= remaining:
+        built.emotion_text = emotion_text
+        remaining -= emotion_tokens
+    else:
+        emotion_tokens = 0
+
+    rag_tokens = 0
+    for passage in rag_passages or []:
+        tokens = estimate_tokens(passage)
+        if tokens <= remaining:
+            built.rag_passages.append(passage)
+            remaining -= tokens
+            rag_tokens += tokens
+    built.dropped["rag_passages"] = len(rag_passages or []) - len(built.rag_passages)
+
+    history_tokens = 0
+    selected: List[ContextExchange] = []
+    for exchange in reversed(history):
+        if exchange.tokens > remaining:
+            break
+        selected.append(exchange)
+        remaining -= exchange.tokens
+        history_tokens += exchange.tokens
+    built.exchanges = list(reversed(selected))
+    built.dropped["turns"] = len(history) - len(selected)
+
+    built.sizes = {
+        "budget": budget_tokens,
+        "system": system_tokens,
+        "user": user_tokens,
+        "emotion": emotion_tokens,
+        "rag": rag_tokens,
+        "history": history_tokens,
+        "history_turns": len(selected),
+        "total": system_tokens + user_tokens + emotion_tokens + rag_tokens + history_tokens
+    }
+    return built
+
+
+def exchanges_from_turns(memory_turns: List[Dict[str, str]]) -> List[ContextExchange]:
+    """Convert MemoryManager.get_context() turns to exchanges"""
+    return [ContextExchange(turn["user"], turn["assistant"]) for turn in memory_turns]
+
+
+def exchanges_to_messages(exchanges: List[ContextExchange]) -> List[Dict[str, Any]]:
+    """Gemini contents for the selected exchanges"""
+    messages = []
+    for exchange in exchanges:
+        messages.append({"role": "user", "parts": [exchange.user]})
+        messages.append({"role": "model", "parts": [exchange.assistant]})
+    return messages
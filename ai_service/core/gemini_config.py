@@ -0,0 +1,45 @@
+"""
+Gemini configuration module for AI Psychologist service
+Configures google-generativeai once for the reply and risk paths, optionally
+against a Gemini-compatible endpoint such as scripts/gemini_standin.py
+"""
+import google.generativeai as genai
+import threading
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_lock = threading.Lock()
+_configured_with = None
+
+
+def gemini_client_options() -> dict:
+    """genai.configure arguments from GEMINI_API_KEY and GEMINI_API_ENDPOINT"""
+    options = {"api_key": os.getenv("GEMINI_API_KEY")}
+    endpoint = os.getenv("GEMINI_API_ENDPOINT", "").strip()
+    if endpoint:
+        # Custom endpoints are reached over REST; http:// is allowed for local stand-ins
+        options["transport"] = "rest"
+        options["client_options"] = {"api_endpoint": endpoint}
+    return options
+
+
+def configure_gemini(force: bool = False) -> bool:
+    """
+    Configure the Gemini client (once per process unless the settings change)
+
+    Returns:
+        bool: True if an API key is configured
+    """
+    global _configured_with
+    options = gemini_client_options()
+    key = (options["api_key"], str(options.get("client_options")))
+    with _lock:
+        if force or _configured_with != key:
+            if options["api_key"] or options.get("client_options"):
+                genai.configure(**options)
+            if options.get("client_options"):
+                print(f"🔌 Gemini endpoint: {options['client_options']['api_endpoint']}")
+            _configured_with = key
+    return bool(options["api_key"])
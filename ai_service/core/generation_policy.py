@@ -0,0 +1,134 @@
+"""
+Generation policy module for AI Psychologist service
+Derives output token caps and temperature from a spoken-duration budget, the
+user's emotion state and the language's speech rate, and trims replies that
+would overrun the budget at a sentence boundary before TTS
+"""
+from typing import Dict, Optional, Any
+from dataclasses import dataclass
+import math
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.reply_cache import emotion_bucket
+    from core.segmenter import split_sentences
+except ImportError:
+    from .reply_cache import emotion_bucket
+    from .segmenter import split_sentences
+
+load_dotenv()
+
+ADAPTIVE_GENERATION = os.getenv("ADAPTIVE_GENERATION", "true").lower() == "true"
+
+# Spoken length the prompt asks for ("1–3 sentences, ~6–12s"); agents may override
+SPEECH_TARGET_SECONDS = float(os.getenv("SPEECH_TARGET_SECONDS", "10"))
+
+# A reply may run this much past the target before it is trimmed
+SPEECH_OVERSHOOT_TOLERANCE = float(os.getenv("SPEECH_OVERSHOOT_TOLERANCE", "1.2"))
+
+# Room over the target in the token cap, so the model can finish its sentence
+# (overshoot is trimmed at a sentence boundary afterwards)
+OUTPUT_TOKEN_HEADROOM = float(os.getenv("OUTPUT_TOKEN_HEADROOM", "2.0"))
+MIN_OUTPUT_TOKENS = int(os.getenv("MIN_OUTPUT_TOKENS", "64"))
+MAX_OUTPUT_TOKENS = int(os.getenv("MAX_OUTPUT_TOKENS", "250"))
+
+# Spoken characters per second at the TTS speaking rate (0.9). Tamil words are
+# long and agglutinative, so fewer characters fit in a second.
+SPEECH_CHARS_PER_SECOND = {
+    "en-IN": 13.0,
+    "hi-IN": 12.0,
+    "ta-IN": 10.5
+}
+
+# Reply characters (spaces included) per output token, in line with
+# context_builder.estimate_tokens; Indic scripts tokenize far denser
+OUTPUT_CHARS_PER_TOKEN = {
+    "en-IN": 4.5,
+    "hi-IN": 1.9,
+    "ta-IN": 1.9
+}
+
+_SENTENCE_END = (".", "!", "?", "।", "॥", "…")
+
+# Per emotion bucket: share of the speech target, and a temperature ceiling
+# (tense users get shorter, steadier replies)
+_EMOTION_POLICY = {
+    "anxious": {"length": 0.7, "max_temperature": 0.3},
+    "stressed": {"length": 0.8, "max_temperature": 0.35},
+    "positive": {"length": 1.0, "max_temperature": None},
+    "neutral": {"length": 1.0, "max_temperature": None},
+    "none": {"length": 1.0, "max_temperature": None}
+}
+
+
+@dataclass
+class GenerationPolicy:
+    """Generation settings for one reply"""
+    lang: str
+    emotion: str
+    target_seconds: float
+    max_output_tokens: int
+    temperature: float
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {
+            "target_seconds": round(self.target_seconds, 1),
+            "emotion": self.emotion,
+            "max_output_tokens": self.max_output_tokens,
+            "temperature": self.temperature
+        }
+
+
+def speech_rate(lang: str) -> float:
+    return SPEECH_CHARS_PER_SECOND.get(lang, SPEECH_CHARS_PER_SECOND["en-IN"])
+
+
+def estimate_speech_seconds(text: str, lang: str) -> float:
+    """Approximate spoken duration of text in the session language"""
+    return len(" ".join(text.split())) / speech_rate(lang)
+
+
+def generation_policy(
+    lang: str,
+    emotion_snapshot: Optional[Dict[str, float]] = None,
+    base_temperature: float = 0.4,
+    target_seconds: Optional[float] = None
+) -> GenerationPolicy:
+    """Token cap and temperature for a reply of the target spoken length"""
+    emotion = emotion_bucket(emotion_snapshot)
+    policy = _EMOTION_POLICY.get(emotion, _EMOTION_POLICY["neutral"])
+    seconds = (target_seconds or SPEECH_TARGET_SECONDS) * policy["length"]
+
+    chars_per_token = OUTPUT_CHARS_PER_TOKEN.get(lang, OUTPUT_CHARS_PER_TOKEN["en-IN"])
+    target_tokens = seconds * speech_rate(lang) / chars_per_token
+    max_tokens = min(MAX_OUTPUT_TOKENS, max(MIN_OUTPUT_TOKENS, math.ceil(target_tokens * OUTPUT_TOKEN_HEADROOM)))
+
+    temperature = base_temperature
+    if policy["max_temperature"] is not None:
+        temperature = min(temperature, policy["max_temperature"])
+
+    return GenerationPolicy(lang, emotion, seconds, max_tokens, temperature)
+
+
+def fit_to_speech(text: str, lang: str, target_seconds: float) -> str:
+    """
+    Trim text at a sentence boundary to fit the spoken-duration budget
+    The first sentence is always kept; a trailing fragment cut off by the
+    token cap is dropped. Text within the tolerance is otherwise unchanged.
+    """
+    sentences = split_sentences(text) if text else []
+    if len(sentences) > 1 and not sentences[-1].rstrip("\"'”’) ").endswith(_SENTENCE_END):
+        sentences = sentences[:-1]
+        text = " ".join(sentences)
+
+    limit = target_seconds * SPEECH_OVERSHOOT_TOLERANCE
+    if not text or estimate_speech_seconds(text, lang) <= limit:
+        return text
+
+    kept = sentences[:1]
+    for sentence in sentences[1:]:
+        if estimate_speech_seconds(" ".join(kept + [sentence]), lang) > limit:
+            break
+        kept.append(sentence)
+    return " ".join(kept)
@@ -0,0 +1,271 @@
+"""
+Intent routing module for AI Psychologist service
+Local fast path for therapeutic exercise requests (breathing, 5-4-3-2-1
+grounding, thought record) answered from localized templates without an LLM call
+"""
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
+import threading
+import re
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.text_classifier import load_classifier, normalize_text
+except ImportError:
+    from .text_classifier import load_classifier, normalize_text
+
+load_dotenv()
+
+# Serve an intent locally only at or above this confidence
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.75"))
+
+# Optional hashed n-gram classifier (.npz) consulted when no pattern matches
+INTENT_CLASSIFIER_PATH = os.getenv("INTENT_CLASSIFIER_PATH", "")
+
+# Local fast path can be switched off entirely
+ENABLE_LOCAL_INTENTS = os.getenv("ENABLE_LOCAL_INTENTS", "true").lower() == "true"
+
+# Explicit requests for an exercise (English, Hindi/Hinglish, Tamil/Tanglish)
+_STRONG_PATTERNS: Dict[str, List[str]] = {
+    "breathing_exercise": [
+        r"\b(?:breathing|breath) (?:exercise|technique|practice|routine)s?\b",
+        r"\b(?:box|deep|belly|4[- ]7[- ]8) breathing\b",
+        r"\bhelp me (?:to )?(?:breathe|calm down|relax)\b",
+        r"\b(?:teach|show|guide) me (?:how )?to breathe\b",
+        r"\b(?:let'?s|can we|can you) (?:do|try|start) (?:a |some )?breathing\b",
+        r"(?:सांस|साँस) (?:लेने )?(?:का|की|के) (?:अभ्यास|व्यायाम|एक्सरसाइज)",
+        r"(?:सांस|साँस) लेने में मदद",
+        r"\bsaa?ns (?:lene )?(?:ka|ki|wali) (?:exercise|abhyas)\b",
+        r"மூச்சுப்? ?பயிற்சி",
+        r"\bmoo?chu payirchi\b"
+    ],
+    "grounding_5_4_3_2_1": [
+        r"\b5[\s-]*4[\s-]*3[\s-]*2[\s-]*1\b",
+        r"\bfive[\s-]+four[\s-]+three\b",
+        r"\bgrounding (?:exercise|technique|practice)s?\b",
+        r"\b(?:help me (?:feel )?grounded|ground me)\b",
+        r"ग्राउंडिंग",
+        r"\bgrounding (?:karwa|kara)o\b",
+        r"நிலைப்படுத்தும் பயிற்சி"
+    ],
+    "thought_record": [
+        r"\bthought (?:record|diary|journal|log)s?\b",
+        r"\b(?:challenge|examine|reframe|question) (?:my|these|this|those|negative) (?:negative )?(?:thoughts?|thinking)\b",
+        r"विचार (?:रिकॉर्ड|डायरी)",
+        r"नकारात्मक विचारों? (?:को )?(?:बदल|समझ|चुनौती)",
+        r"\bthought record (?:banao|karo)\b",
+        r"எண்ணப் ?பதிவு",
+        r"எதிர்மறை எண்ணங்களை (?:மாற்ற|கேள்வி)"
+    ]
+}
+
+# Topical keywords - not enough to skip the LLM on their own
+_WEAK_PATTERNS: Dict[str, List[str]] = {
+    "breathing_exercise": [r"\bbreathe\b", r"\bbreathing\b", r"\bcalm (?:down|me)\b", r"सांस|साँस", r"மூச்சு"],
+    "grounding_5_4_3_2_1": [r"\bgrounded?\b", r"\bpresent moment\b", r"\bmindful(?:ness)?\b"],
+    "thought_record": [r"\bnegative thoughts?\b", r"\boverthinking\b", r"नकारात्मक विचार", r"எதிர்மறை எண்ண"]
+}
+
+_STRONG_CONFIDENCE = 0.9
+_WEAK_CONFIDENCE = 0.5
+
+# Negation on either side of the match ("I don't want a breathing exercise",
+# "breathing exercise nahi chahiye", "மூச்சுப் பயிற்சி வேண்டாம்")
+_NEGATION_RE = re.compile(
+    r"(?:\b(?:don'?t|do not|not|no|never|stop|without|can'?t|cannot|won'?t|doesn'?t|didn'?t"
+    r"|nahi|nahin|nai|mat|venda|vendam|illa|illai)\b|नहीं|नही|मत|வேண்டாம்|இல்லை)"
+)
+_NEGATION_WINDOW_CHARS = 30
+
+# Served locally only when the request is most of the utterance: beyond the
+# matched phrase at most this many words that are not request phrasing
+INTENT_MAX_EXTRA_WORDS = int(os.getenv("INTENT_MAX_EXTRA_WORDS", "3"))
+
+# Request phrasing around an exercise request (English, Hindi/Hinglish, Tamil/Tanglish)
+_FILLER_WORDS = frozenset({
+    "i", "i'd", "i'm", "want", "wanna", "to", "do", "a", "an", "the", "some", "one", "can", "could", "would",
+    "you", "we", "us", "me", "please", "pls", "let's", "lets", "let", "guide", "walk", "through", "try",
+    "start", "with", "now", "just", "quick", "quickly", "ok", "okay", "like", "need", "give", "show",
+    "teach", "how", "again", "together", "maybe", "hey", "hi", "hello", "thanks", "for", "little",
+    "mujhe", "karna", "karni", "hai", "chahiye", "karao", "karwao", "karaiye", "ek", "kya", "hum",
+    "kar", "sakte", "hain", "ji", "abhi", "thoda",
+    "enakku", "oru", "venum", "vendum", "pannalama", "pannunga", "sollunga", "seyyalama",
+    "मुझे", "करना", "करनी", "है", "चाहिए", "एक", "कृपया", "करें", "करवाइए", "क्या", "हम", "कर", "सकते",
+    "हैं", "अभी", "थोड़ा",
+    "எனக்கு", "ஒரு", "வேண்டும்", "செய்யலாமா", "சொல்லுங்கள்", "செய்வோம்", "தயவுசெய்து",
+})
+
+# Words allowed for the exercise phrase itself when only the classifier
+# recognized it (on top of INTENT_MAX_EXTRA_WORDS)
+_CLASSIFIER_PHRASE_WORDS = 3
+
+_WORD_RE = re.compile(r"[\w\u0900-\u097F\u0B80-\u0BFF']+")
+
+_COMPILED_STRONG = {intent: re.compile("|".join(f"(?:{p})" for p in patterns)) for intent, patterns in _STRONG_PATTERNS.items()}
+_COMPILED_WEAK = {intent: re.compile("|".join(f"(?:{p})" for p in patterns)) for intent, patterns in _WEAK_PATTERNS.items()}
+
+# Localized exercise scripts
+_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "breathing_exercise": {
+        "en-IN": "Okay, let's do a breathing exercise for {minutes} minutes. Sit comfortably, place one hand on your chest and one on your belly. Breathe in slowly through your nose for 4 counts, hold for 4, then exhale through your mouth for 6 counts. Focus on your breath moving in and out.",
+        "hi-IN": "ठीक है, चलिए {minutes} मिनट के लिए साँस लेने का अभ्यास करते हैं। आराम से बैठिए, एक हाथ सीने पर और एक पेट पर रखिए। नाक से धीरे-धीरे चार गिनती तक साँस लीजिए, चार गिनती तक रोकिए, फिर मुँह से छह गिनती तक छोड़िए। बस अपनी साँस के आने-जाने पर ध्यान दीजिए।",
+        "ta-IN": "சரி, {minutes} நிமிடங்கள் ஒரு மூச்சுப் பயிற்சி செய்வோம். வசதியாக உட்காருங்கள், ஒரு கையை மார்பிலும் மற்றொன்றை வயிற்றிலும் வையுங்கள். மூக்கு வழியாக நான்கு எண்ணிக்கை வரை மெதுவாக மூச்சை இழுங்கள், நான்கு எண்ணிக்கை வரை நிறுத்துங்கள், பிறகு வாய் வழியாக ஆறு எண்ணிக்கை வரை விடுங்கள். உங்கள் மூச்சின் மீது மட்டும் கவனம் செலுத்துங்கள்."
+    },
+    "grounding_5_4_3_2_1": {
+        "en-IN": "Let's do the 5-4-3-2-1 grounding exercise. Name 5 things you can see around you. Now 4 things you can touch. 3 things you can hear. 2 things you can smell. And 1 thing you can taste. How do you feel now?",
+        "hi-IN": "चलिए 5-4-3-2-1 ग्राउंडिंग अभ्यास करते हैं। अपने आसपास की 5 चीज़ें बताइए जो आप देख सकते हैं। अब 4 चीज़ें जिन्हें आप छू सकते हैं। 3 आवाज़ें जो आप सुन सकते हैं। 2 चीज़ें जिनकी आप गंध ले सकते हैं। और 1 चीज़ जिसका आप स्वाद ले सकते हैं। अब आप कैसा महसूस कर रहे हैं?",
+        "ta-IN": "5-4-3-2-1 நிலைப்படுத்தும் பயிற்சியைச் செய்வோம். உங்களைச் சுற்றி நீங்கள் பார்க்கக்கூடிய 5 பொருட்களைச் சொல்லுங்கள். இப்போது தொடக்கூடிய 4 பொருட்கள். கேட்கக்கூடிய 3 ஒலிகள். நுகரக்கூடிய 2 வாசனைகள். சுவைக்கக்கூடிய 1 பொருள். இப்போது எப்படி உணர்கிறீர்கள்?"
+    },
+    "thought_record": {
+        "en-IN": "Let's create a thought record. {start_prompt} We'll examine this thought objectively and see if we can find a more balanced perspective.",
+        "hi-IN": "चलिए एक थॉट रिकॉर्ड बनाते हैं। अभी कौन सा विचार आपको सबसे ज़्यादा परेशान कर रहा है? हम इस विचार को निष्पक्ष रूप से देखेंगे और एक ज़्यादा संतुलित नज़रिया ढूँढने की कोशिश करेंगे।",
+        "ta-IN": "ஒரு எண்ணப் பதிவை உருவாக்குவோம். இப்போது எந்த எண்ணம் உங்களை அதிகம் தொந்தரவு செய்கிறது? அந்த எண்ணத்தை நடுநிலையாகப் பார்த்து, சமநிலையான ஒரு பார்வையைக் கண்டுபிடிக்க முயல்வோம்."
+    }
+}
+
+INTENT_NAMES = list(_TEMPLATES)
+
+_DEFAULT_PARAMETERS: Dict[str, Dict[str, Any]] = {
+    "breathing_exercise": {"duration_sec": 300},
+    "grounding_5_4_3_2_1": {},
+    "thought_record": {"start_prompt": "What thought is troubling you right now?"}
+}
+
+
+@dataclass
+class IntentMatch:
+    intent: str
+    confidence: float
+    source: str  # "pattern" | "classifier"
+    parameters: Dict[str, Any]
+
+
+class IntentRouter:
+    """
+    Matches exercise requests with compiled patterns (and an optional classifier)
+    and renders the localized script, tracking the share of turns served locally
+    """
+    def __init__(self, threshold: float = INTENT_CONFIDENCE_THRESHOLD, classifier_path: str = INTENT_CLASSIFIER_PATH):
+        self.threshold = threshold
+        self.enabled = ENABLE_LOCAL_INTENTS
+        self.classifier = load_classifier(classifier_path)
+        self.stats = {"evaluated": 0, "served_locally": 0, "by_intent": {intent: 0 for intent in _TEMPLATES}}
+        self._lock = threading.Lock()
+
+    def match(self, text: str, intents: Optional[List[str]] = None) -> Optional[IntentMatch]:
+        """Best matching intent (any confidence), or None"""
+        normalized = normalize_text(text)
+        candidates = intents or list(_TEMPLATES)
+        best: Optional[IntentMatch] = None
+
+        for intent in candidates:
+            confidence = 0.0
+            match = _COMPILED_STRONG[intent].search(normalized)
+            if match:
+                confidence = _STRONG_CONFIDENCE
+            else:
+                match = _COMPILED_WEAK[intent].search(normalized)
+                if match:
+                    confidence = _WEAK_CONFIDENCE
+            if not match:
+                continue
+
+            before = normalized[max(0, match.start() - _NEGATION_WINDOW_CHARS):match.start()]
+            after = normalized[match.end():match.end() + _NEGATION_WINDOW_CHARS]
+            if _NEGATION_RE.search(before) or _NEGATION_RE.search(after):
+                confidence *= 0.3
+            elif confidence == _STRONG_CONFIDENCE and _extra_words(normalized, match) > INTENT_MAX_EXTRA_WORDS:
+                # The message is about more than the exercise - let the LLM respond
+                confidence = _WEAK_CONFIDENCE
+
+            if best is None or confidence > best.confidence:
+                best = IntentMatch(intent, confidence, "pattern", dict(_DEFAULT_PARAMETERS[intent]))
+
+        # The classifier only covers phrasings no pattern recognized; it never
+        # overrides a pattern match, including one demoted by the checks above
+        if self.classifier and best is None and self._classifier_may_serve(normalized):
+            label, probability = self.classifier.predict(text)
+            if label in candidates:
+                best = IntentMatch(label, probability, "classifier", dict(_DEFAULT_PARAMETERS[label]))
+
+        return best
+
+    def _classifier_may_serve(self, normalized: str) -> bool:
+        """
+        The pattern checks for a classifier verdict, which has no matched
+        phrase: no negation anywhere, and no more words than a short request
+        """
+        if _NEGATION_RE.search(normalized):
+            return False
+        words = sum(1 for word in _WORD_RE.findall(normalized) if word not in _FILLER_WORDS)
+        return words <= INTENT_MAX_EXTRA_WORDS + _CLASSIFIER_PHRASE_WORDS
+
+    def route(
+        self, text: str, lang: str = "en-IN", risk_level: str = "none"
+    ) -> Optional[Tuple[str, IntentMatch]]:
+        """
+        Local reply for a confident exercise request, or None to use the LLM
+        risk_level is the highest level the risk screen or session tracker
+        reported; anything above none always goes to the LLM.
+        Every call counts toward the local-share metric.
+        """
+        with self._lock:
+            self.stats["evaluated"] += 1
+
+        if not self.enabled or risk_level != "none":
+            return None
+
+        match = self.match(text)
+        if not match or match.confidence < self.threshold:
+            return None
+
+        with self._lock:
+            self.stats["served_locally"] += 1
+            self.stats["by_intent"][match.intent] += 1
+
+        print(f"⚡ Local intent {match.intent} ({match.source}, {match.confidence:.2f})")
+        return render_intent(match.intent, lang, match.parameters), match
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {**self.stats, "by_intent": dict(self.stats["by_intent"])}
+        stats["local_share"] = round(stats["served_locally"] / stats["evaluated"], 3) if stats["evaluated"] else 0.0
+        stats["threshold"] = self.threshold
+        stats["classifier"] = self.classifier is not None
+        return stats
+
+
+def _extra_words(normalized: str, match: "re.Match") -> int:
+    """Words outside the matched phrase that are not request phrasing"""
+    outside = normalized[:match.start()] + " " + normalized[match.end():]
+    return sum(1 for word in _WORD_RE.findall(outside) if word not in _FILLER_WORDS)
+
+
+def render_intent(intent: str, lang: str = "en-IN", parameters: Optional[Dict[str, Any]] = None) -> str:
+    """Localized script for an intent (English if the language has no template)"""
+    templates = _TEMPLATES.get(intent)
+    if not templates:
+        return "I'm not sure about that specific technique right now. Let's talk about what's on your mind."
+
+    params = {**_DEFAULT_PARAMETERS.get(intent, {}), **(parameters or {})}
+    return templates.get(lang, templates["en-IN"]).format(
+        minutes=params.get("duration_sec", 300) // 60,
+        start_prompt=params.get("start_prompt", "")
+    )
+
+
+# Global router instance
+_intent_router = IntentRouter()
+
+def route_intent(text: str, lang: str = "en-IN", risk_level: str = "none") -> Optional[Tuple[str, IntentMatch]]:
+    """Convenience function: local reply for confident exercise requests"""
+    return _intent_router.route(text, lang, risk_level)
+
+def match_intent(text: str, intents: Optional[List[str]] = None) -> Optional[IntentMatch]:
+    """Convenience function: best intent match without serving it"""
+    return _intent_router.match(text, intents)
+
+def get_intent_stats() -> Dict[str, Any]:
+    """Convenience function for local fast-path metrics"""
+    return _intent_router.get_stats()
@@ -4,22 +4,54 @@ Handles LLM conversations, function calling, and safety responses
 """
 import google.generativeai as genai
 from google.generativeai.types import GenerationConfig
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import threading
 import json
 import base64
 from datetime import datetime
+import time
 import os
 from dotenv import load_dotenv
 
+try:
+    from core.gemini_config import configure_gemini
+    from core.model_router import model_router
+    from core.rate_limiter import RateLimitExceeded
+    from core.chat_session import get_session_chat
+    from core.context_builder import (
+        CONTEXT_TOKEN_BUDGET, build_context, estimate_tokens, exchanges_from_turns, exchanges_to_messages
+    )
+    from core.intent_router import INTENT_CONFIDENCE_THRESHOLD, INTENT_NAMES, match_intent, render_intent
+    from core.generation_policy import ADAPTIVE_GENERATION, estimate_speech_seconds, fit_to_speech, generation_policy
+    from core.safety_stream import LLM_STREAMING_ENABLED, SafetyScanner, ScreenedSentence, safety_metadata
+except ImportError:
+    from .gemini_config import configure_gemini
+    from .model_router import model_router
+    from .rate_limiter import RateLimitExceeded
+    from .chat_session import get_session_chat
+    from .context_builder import (
+        CONTEXT_TOKEN_BUDGET, build_context, estimate_tokens, exchanges_from_turns, exchanges_to_messages
+    )
+    from .intent_router import INTENT_CONFIDENCE_THRESHOLD, INTENT_NAMES, match_intent, render_intent
+    from .generation_policy import ADAPTIVE_GENERATION, estimate_speech_seconds, fit_to_speech, generation_policy
+    from .safety_stream import LLM_STREAMING_ENABLED, SafetyScanner, ScreenedSentence, safety_metadata
+
 load_dotenv()
 
-# Configure Gemini API
-api_key = os.getenv("GEMINI_API_KEY")
-if api_key:
-    genai.configure(api_key=api_key)
-else:
+# Configure Gemini API (GEMINI_API_ENDPOINT selects a Gemini-compatible server)
+if not configure_gemini():
     print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables. LLM functionality will fail.")
 
+# Request hedging: if the primary model hasn't answered by its latency percentile,
+# send the same request to the next model and take whichever finishes first
+LLM_HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_DEFAULT_DELAY_MS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_MS", "2000"))
+LLM_HEDGE_MIN_DELAY_MS = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "300"))
+LLM_HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", "16"))
+
 class LLMHandler:
     def __init__(self):
         self.model_name = "gemini-1.5-flash"
@@ -29,6 +61,17 @@ class LLMHandler:
             top_p=0.9,
             top_k=40
         )
+        self.hedging_enabled = LLM_HEDGING_ENABLED
+        self.streaming_enabled = LLM_STREAMING_ENABLED
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+        self.hedge_stats = {
+            "requests": 0,
+            "hedged": 0,
+            "primary_wins": 0,
+            "hedge_wins": 0,
+            "both_failed": 0
+        }
 
     def generate_reply(
         self,
@@ -37,132 +80,324 @@ class LLMHandler:
         memory_turns: List[Dict[str, str]],
         emotion_snapshot: Optional[Dict[str, float]] = None,
         rag_passages: Optional[List[str]] = None,
-        function_schemas: Optional[List[Dict]] = None
+        function_schemas: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None,
+        token_budget: Optional[int] = None,
+        max_output_tokens: Optional[int] = None,
+        models: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+        lang: Optional[str] = None,
+        speech_target_seconds: Optional[float] = None,
+        on_sentence: Optional[Callable[[ScreenedSentence], None]] = None
     ) -> Tuple[str, Dict[str, Any]]:
         """
         Generate AI reply using Gemini
 
+        With a session_id the session's chat is used: the system prompt of the
+        first call is kept for the session and memory_turns only seed the history.
+        Context is selected within token_budget (CONTEXT_TOKEN_BUDGET by default);
+        the metadata reports the resulting prompt size.
+
+        max_output_tokens and models override the defaults for a cheaper call.
+        A reply finishing after deadline (time.monotonic()) is not added to the
+        session chat, since the caller has already answered without it.
+
+        With a lang (and ADAPTIVE_GENERATION on) the output cap and temperature
+        follow the spoken-duration target for the language and emotion state,
+        and a reply that would overrun it is trimmed at a sentence boundary.
+
+        Every reply passes the output safety scanner sentence by sentence: a
+        held sentence is replaced and ends the reply. With streaming enabled,
+        each screened sentence is handed to on_sentence as soon as it completes.
+
         Returns:
             Tuple[str, Dict]: reply text and metadata (including function calls)
         """
         try:
-            # Build conversation history
-            messages = []
-
-            # Add memory turns (limited to last 6-8)
-            for turn in memory_turns[-6:]:
+            emotion_text = self._format_emotion_context(emotion_snapshot) if emotion_snapshot else ""
+
+            if session_id:
+                # Session chat: fixed system instruction, history kept incrementally,
+                # per-turn context travels with the user message
+                chat = get_session_chat(session_id, system_prompt)
+                chat.seed(memory_turns)
+                system_prompt = chat.system_instruction
+                system_tokens = chat.system_tokens
+                history = chat.exchanges()
+            else:
+                chat = None
+                system_tokens = estimate_tokens(system_prompt)
+                history = exchanges_from_turns(memory_turns)
+
+            # Fill emotion, RAG and recent turns by priority within the token budget
+            context = build_context(
+                token_budget or CONTEXT_TOKEN_BUDGET,
+                system_tokens,
+                user_text,
+                history,
+                emotion_text=emotion_text,
+                rag_passages=rag_passages
+            )
+            messages = exchanges_to_messages(context.exchanges)
+
+            if chat:
                 messages.append({
                     "role": "user",
-                    "parts": [turn["user"]]
+                    "parts": [self._with_turn_context(user_text, context.emotion_text, context.rag_passages)]
                 })
+            else:
                 messages.append({
-                    "role": "model",
-                    "parts": [turn["assistant"]]
+                    "role": "user",
+                    "parts": [user_text]
                 })
 
-            # Add rag context to system prompt if available
-            if rag_passages:
-                rag_context = "\n".join(rag_passages[:3])  # Limit to 3 passages
-                system_prompt += f"\n\nRelevant context:\n{rag_context}"
-
-            # Add emotion context if available
-            if emotion_snapshot:
-                emotion_text = self._format_emotion_context(emotion_snapshot)
-                if emotion_text:
-                    system_prompt += f"\n{emotion_text}"
-
-            # Add current user message
-            messages.append({
-                "role": "user",
-                "parts": [user_text]
-            })
-
-            # List of models to try in order of preference
-            models_to_try = ["gemini-2.0-flash", "gemini-2.0-flash-lite", "gemini-1.5-flash", "gemini-pro"]
-            
-            response = None
-            last_error = None
-
-            for model_name in models_to_try:
-                try:
-                    print(f"🤖 Attempting to generate with model: {model_name}")
-                    
-                    # Try with system_instruction (supported by newer models)
-                    try:
-                        model = genai.GenerativeModel(
-                            model_name=model_name,
-                            system_instruction=system_prompt
-                        )
-                        response = model.generate_content(
-                            messages,
-                            generation_config=self.generation_config
-                        )
-                    except Exception as inner_e:
-                        # Fallback for models/libraries that don't support system_instruction
-                        # or if the API call fails with specific parameter errors
-                        print(f"⚠️ Standard generation failed for {model_name}, trying prompt injection: {inner_e}")
-                        
-                        # Create a deep copy of messages for this attempt
-                        fallback_messages = json.loads(json.dumps(messages))
-                        
-                        # Inject system prompt into the first user message
-                        if fallback_messages and fallback_messages[0]['role'] == 'user':
-                            fallback_messages[0]['parts'][0] = f"System Instruction: {system_prompt}\n\nUser Message: {fallback_messages[0]['parts'][0]}"
-                        else:
-                            fallback_messages.insert(0, {"role": "user", "parts": [f"System Instruction: {system_prompt}"]})
-                            
-                        model = genai.GenerativeModel(model_name=model_name)
-                        response = model.generate_content(
-                            fallback_messages,
-                            generation_config=self.generation_config
-                        )
-                    
-                    # If we got here, we have a response
-                    if response:
-                        break
-                        
-                except Exception as e:
-                    print(f"❌ Model {model_name} failed: {e}")
-                    last_error = e
-                    continue
+                # Add rag context to system prompt if available
+                if context.rag_passages:
+                    rag_context = "\n".join(context.rag_passages)
+                    system_prompt += f"\n\nRelevant context:\n{rag_context}"
+
+                # Add emotion context if available
+                if context.emotion_text:
+                    system_prompt += f"\n{context.emotion_text}"
+
+            policy = None
+            if lang and ADAPTIVE_GENERATION:
+                policy = generation_policy(
+                    lang, emotion_snapshot, self.generation_config.temperature, speech_target_seconds
+                )
+                max_output_tokens = min(max_output_tokens or policy.max_output_tokens, policy.max_output_tokens)
+            generation_config = self._generation_config(
+                max_output_tokens, policy.temperature if policy else None
+            )
+
+            # Healthiest model first; failing models are skipped by the router.
+            # A streamed call returns once the first chunk has arrived.
+            stream = self.streaming_enabled
+            if self.hedging_enabled:
+                response, model_name, last_error = self._generate_hedged(
+                    messages, system_prompt, generation_config, models, stream=stream
+                )
+            else:
+                response, model_name, last_error = model_router.generate_content(
+                    messages,
+                    generation_config=generation_config,
+                    system_instruction=system_prompt,
+                    models=models,
+                    label="LLM",
+                    stream=stream
+                )
+            if response:
+                print(f"🤖 Reply generated with model: {model_name}")
+
+            if not response and isinstance(last_error, RateLimitExceeded):
+                return ("I need a brief moment to gather my thoughts. Could you say that again?",
+                        {"error": str(last_error), "rate_limited": True, **context.to_metadata()})
 
             if not response:
+                # Available models are on /diagnostics/models (discovered off the request path)
                 print("💀 All models failed to generate a response.")
                 if last_error:
                     print(f"Last error: {last_error}")
-                    # Try to list available models for debugging
-                    try:
-                        print("📋 Available models for your API key:")
-                        for m in genai.list_models():
-                            if 'generateContent' in m.supported_generation_methods:
-                                print(f"   - {m.name}")
-                    except Exception as list_err:
-                        print(f"Could not list models: {list_err}")
-                        
-                return "I'm having trouble connecting to my brain right now. Please check my configuration.", {"error": str(last_error)}
-
-            # Safely extract text
-            reply_text = ""
-            if response.candidates and response.candidates[0].content.parts:
-                reply_text = response.text.strip()
-            elif response.prompt_feedback and response.prompt_feedback.block_reason:
+                return "I'm having trouble connecting to my brain right now. Please check my configuration.", {"error": str(last_error), **context.to_metadata()}
+
+            # Safely extract text, screening it sentence by sentence
+            scanner = SafetyScanner(lang or "en-IN")
+            if stream:
+                self._screen_stream(response, scanner, on_sentence)
+            elif response.candidates and response.candidates[0].content.parts:
+                scanner.feed(response.text.strip())
+                scanner.finish()
+
+            reply_text = scanner.text()
+            speech_metadata = None
+            if reply_text:
+                if policy:
+                    spoken_text = fit_to_speech(reply_text, lang, policy.target_seconds)
+                    speech_metadata = {
+                        **policy.to_metadata(),
+                        "estimated_seconds": round(estimate_speech_seconds(spoken_text, lang), 1),
+                        "truncated": spoken_text != reply_text
+                    }
+                    reply_text = spoken_text
+                if chat and (deadline is None or time.monotonic() <= deadline):
+                    chat.append(user_text, reply_text)
+            elif getattr(response, "prompt_feedback", None) and response.prompt_feedback.block_reason:
                 print(f"⚠️ Response blocked: {response.prompt_feedback.block_reason}")
                 reply_text = "I'm sorry, I can't respond to that specific query due to safety guidelines. Can we discuss something else?"
             else:
-                print(f"⚠️ Empty response from model. Finish reason: {response.candidates[0].finish_reason if response.candidates else 'Unknown'}")
+                candidates = getattr(response, "candidates", None)
+                print(f"⚠️ Empty response from model. Finish reason: {candidates[0].finish_reason if candidates else 'Unknown'}")
                 reply_text = "I'm listening. Could you please rephrase that?"
 
-            # Check if this should trigger safety response
-            safety_metadata = self._analyze_for_safety(reply_text)
-            if safety_metadata:
-                return reply_text, safety_metadata
+            metadata = {"model": model_name, **context.to_metadata()}
+            if speech_metadata:
+                metadata["speech"] = speech_metadata
+
+            # Flagged or held sentences make this a safety response
+            safety = safety_metadata(scanner)
+            if safety:
+                return reply_text, {**safety, **metadata}
 
-            return reply_text, {"response_type": "normal"}
+            return reply_text, {"response_type": "normal", **metadata}
 
         except Exception as e:
             print(f"Error generating reply: {e}")
             return "I'm sorry, I encountered an error processing your message. Please try again.", {"error": str(e)}
 
+    def _screen_stream(
+        self,
+        response: Any,
+        scanner: SafetyScanner,
+        on_sentence: Optional[Callable[[ScreenedSentence], None]] = None
+    ):
+        """Feed a streamed response through the scanner, handing on each screened sentence"""
+        def emit(sentences: List[ScreenedSentence]):
+            if on_sentence:
+                for sentence in sentences:
+                    on_sentence(sentence)
+
+        try:
+            for chunk in response:
+                if chunk.candidates and chunk.candidates[0].content.parts:
+                    emit(scanner.feed(chunk.text))
+                if scanner.held:
+                    # Nothing generated after a held sentence is used
+                    print("🛑 Stopped streaming after a held sentence")
+                    return
+        except genai.types.BlockedPromptException:
+            # Answered like an unstreamed blocked prompt (from prompt_feedback)
+            return
+        except Exception as e:
+            # Keep what already streamed; with nothing yet, it is a failed reply
+            if not scanner.sentences and not scanner.pending_text():
+                raise
+            print(f"⚠️ Reply stream interrupted: {e}")
+        emit(scanner.finish())
+
+    def _generation_config(
+        self,
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> GenerationConfig:
+        """Default generation config, or a copy with a smaller output limit or temperature"""
+        if not max_output_tokens and temperature is None:
+            return self.generation_config
+        return GenerationConfig(
+            temperature=temperature if temperature is not None else self.generation_config.temperature,
+            max_output_tokens=max_output_tokens or self.generation_config.max_output_tokens,
+            top_p=self.generation_config.top_p,
+            top_k=self.generation_config.top_k
+        )
+
+    def _with_turn_context(self, user_text: str, emotion_text: str = "", rag_passages: Optional[List[str]] = None) -> str:
+        """Prefix the user message with this turn's emotion and RAG context"""
+        context = []
+        if rag_passages:
+            context.append("Relevant context:\n" + "\n".join(rag_passages))
+        if emotion_text:
+            context.append(emotion_text)
+        if not context:
+            return user_text
+        return "[" + "\n".join(context) + "]\n\n" + user_text
+
+    def _hedge_delay_ms(self, model_name: str) -> float:
+        """How long to wait for the primary model before hedging"""
+        if len(model_router.latency_samples(model_name)) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DEFAULT_DELAY_MS
+        delay = model_router.latency_percentile(model_name, LLM_HEDGE_PERCENTILE)
+        return max(delay or LLM_HEDGE_DEFAULT_DELAY_MS, LLM_HEDGE_MIN_DELAY_MS)
+
+    def _count(self, key: str):
+        with self._hedge_lock:
+            self.hedge_stats[key] += 1
+
+    def _generate_hedged(
+        self,
+        messages: List[Dict],
+        system_prompt: str,
+        generation_config: Any = None,
+        models: Optional[List[str]] = None,
+        **kwargs
+    ) -> Tuple[Any, Optional[str], Optional[Exception]]:
+        """
+        Call the primary model, hedging to the next model after the percentile deadline
+
+        Returns the same (response, model name, last error) tuple as the router.
+        The losing request cannot be interrupted mid-flight; its result is
+        discarded (its outcome still feeds the router's health record).
+        """
+        generation_config = generation_config or self.generation_config
+        candidates = model_router.candidates(models)
+        if len(candidates) < 2:
+            return model_router.generate_content(
+                messages, generation_config=generation_config, system_instruction=system_prompt,
+                models=candidates, label="LLM", **kwargs
+            )
+
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=LLM_HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+
+        self._count("requests")
+        primary, secondary = candidates[0], candidates[1]
+        last_error = None
+
+        def submit(model_name: str):
+            return self._hedge_executor.submit(
+                model_router.call_model, model_name, messages, generation_config, system_prompt, **kwargs
+            )
+
+        futures = {submit(primary): primary}
+        done, _ = wait(futures, timeout=self._hedge_delay_ms(primary) / 1000.0)
+
+        if not done:
+            print(f"⏱️ {primary} is slow, hedging with {secondary}")
+            self._count("hedged")
+            futures[submit(secondary)] = secondary
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    print(f"❌ LLM model {futures[future]} failed: {e}")
+                    last_error = e
+                    continue
+                if response:
+                    for other in pending:
+                        other.cancel()
+                    if len(futures) > 1:
+                        self._count("primary_wins" if futures[future] == primary else "hedge_wins")
+                    return response, futures[future], None
+
+        if len(futures) > 1:
+            self._count("both_failed")
+
+        # Both raced models failed - fall back through the remaining models in order
+        remaining = [m for m in candidates if m not in futures.values()]
+        if not remaining:
+            return None, None, last_error
+        response, model_name, error = model_router.generate_content(
+            messages,
+            generation_config=generation_config,
+            system_instruction=system_prompt,
+            models=remaining,
+            label="LLM",
+            **kwargs
+        )
+        return response, model_name, error or last_error
+
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """Hedge rate and win counts"""
+        with self._hedge_lock:
+            stats = dict(self.hedge_stats)
+        stats["enabled"] = self.hedging_enabled
+        stats["hedge_rate"] = round(stats["hedged"] / stats["requests"], 3) if stats["requests"] else 0.0
+        return stats
+
     def _format_emotion_context(self, emotion_snapshot: Dict[str, float]) -> str:
         """Format emotion data into contextual prompt text"""
         if not emotion_snapshot:
@@ -186,63 +421,74 @@ class LLMHandler:
         return ""
 
     def _check_function_trigger(self, user_text: str, function_schemas: List[Dict]) -> Optional[Dict]:
-        """Check if user text triggers a function call using simple heuristics"""
-        # This is a simple implementation - in production, use Gemini's function calling
-        lower_text = user_text.lower()
-
-        for schema in function_schemas:
-            func_name = schema.get("name", "")
-            if func_name == "breathing_exercise" and any(word in lower_text for word in ["breath", "breathe", "calm", "relax"]):
-                return {"name": "breathing_exercise", "parameters": {"duration_sec": 300}}
-            elif func_name == "grounding_5_4_3_2_1" and any(word in lower_text for word in ["ground", "present", "mindful"]):
-                return {"name": "grounding_5_4_3_2_1", "parameters": {}}
-            elif func_name == "thought_record" and any(word in lower_text for word in ["think", "thought", "negative", "mind"]):
-                return {"name": "thought_record", "parameters": {"start_prompt": "Let's examine what you're thinking..."}}
-
+        """Check if user text confidently requests one of the given functions (see intent_router)"""
+        names = [schema.get("name", "") for schema in function_schemas]
+        match = match_intent(user_text, [name for name in names if name in INTENT_NAMES])
+        if match and match.confidence >= INTENT_CONFIDENCE_THRESHOLD:
+            return {"name": match.intent, "parameters": match.parameters}
         return None
 
-    def _execute_function_locally(self, function_call: Dict) -> str:
+    def _execute_function_locally(self, function_call: Dict, lang: str = "en-IN") -> str:
         """Execute functions locally when triggered"""
-        func_name = function_call.get("name")
-        params = function_call.get("parameters", {})
-
-        if func_name == "breathing_exercise":
-            duration = params.get("duration_sec", 300)
-            return f"Okay, let's do a breathing exercise for {duration // 60} minutes. Sit comfortably, place one hand on your chest and one on your belly. Breathe in slowly through your nose for 4 counts, hold for 4, then exhale through your mouth for 6 counts. Focus on your breath moving in and out."
-
-        elif func_name == "grounding_5_4_3_2_1":
-            return "Let's do the 5-4-3-2-1 grounding exercise. Name 5 things you can see around you. Now 4 things you can touch. 3 things you can hear. 2 things you can smell. And 1 thing you can taste. How do you feel now?"
-
-        elif func_name == "thought_record":
-            return f"Let's create a thought record. {params.get('start_prompt', 'What thought is troubling you right now?')} We'll examine this thought objectively and see if we can find a more balanced perspective."
-
-        return "I'm not sure about that specific technique right now. Let's talk about what's on your mind."
-
-    def _analyze_for_safety(self, response: str) -> Optional[Dict]:
-        """Analyze response for safety concerns and return metadata"""
-        # This could be enhanced with more sophisticated analysis
-        safety_keywords = ["helpline", "crisis", "emergency", "suicide", "harm"]
-        if any(keyword in response.lower() for keyword in safety_keywords):
-            return {
-                "response_type": "safety",
-                "safety_level": "medium"
-            }
-        return None
+        return render_intent(function_call.get("name"), lang, function_call.get("parameters", {}))
+
+
+# Global handler shared by all sessions
+_handler = LLMHandler()
+
+def get_hedge_stats() -> Dict[str, Any]:
+    """Convenience function for LLM hedging metrics"""
+    return _handler.get_hedge_stats()
 
 def generate_reply(
     system_prompt: str,
     user_text: str,
     memory_turns: List[Dict[str, str]],
     emotion_snapshot: Optional[Dict[str, float]] = None,
-    rag_passages: Optional[List[str]] = None
+    rag_passages: Optional[List[str]] = None,
+    session_id: Optional[str] = None,
+    token_budget: Optional[int] = None
 ) -> str:
     """Convenience function for generating replies"""
-    handler = LLMHandler()
-    reply_text, _ = handler.generate_reply(
+    reply_text, _ = generate_reply_with_metadata(
         system_prompt=system_prompt,
         user_text=user_text,
         memory_turns=memory_turns,
         emotion_snapshot=emotion_snapshot,
-        rag_passages=rag_passages
+        rag_passages=rag_passages,
+        session_id=session_id,
+        token_budget=token_budget
     )
     return reply_text
+
+def generate_reply_with_metadata(
+    system_prompt: str,
+    user_text: str,
+    memory_turns: List[Dict[str, str]],
+    emotion_snapshot: Optional[Dict[str, float]] = None,
+    rag_passages: Optional[List[str]] = None,
+    session_id: Optional[str] = None,
+    token_budget: Optional[int] = None,
+    max_output_tokens: Optional[int] = None,
+    models: Optional[List[str]] = None,
+    deadline: Optional[float] = None,
+    lang: Optional[str] = None,
+    speech_target_seconds: Optional[float] = None,
+    on_sentence: Optional[Callable[[ScreenedSentence], None]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """Convenience function returning the reply and its metadata (model, prompt size, speech length)"""
+    return _handler.generate_reply(
+        system_prompt=system_prompt,
+        user_text=user_text,
+        memory_turns=memory_turns,
+        emotion_snapshot=emotion_snapshot,
+        rag_passages=rag_passages,
+        session_id=session_id,
+        token_budget=token_budget,
+        max_output_tokens=max_output_tokens,
+        models=models,
+        deadline=deadline,
+        lang=lang,
+        speech_target_seconds=speech_target_seconds,
+        on_sentence=on_sentence
+    )
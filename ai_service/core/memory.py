@@ -84,32 +84,23 @@ class MemoryManager:
         ]
 
     def persist_to_backend(self, django_url: str):
-        """Persist conversation to Django backend if consent given"""
+        """Queue the conversation for the Django backend if consent given (delivered by the outbox)"""
         if not self.consent_store or not self.memory:
             return
 
         try:
-            import requests
+            try:
+                from core.outbox import enqueue_event
+            except ImportError:
+                from .outbox import enqueue_event
 
-            memory_data = self.get_full_memory()
-
-            # In production, you might batch send turns or send periodically
-            # For now, this is a placeholder structure
             payload = {
                 "session_id": self.session_id,
-                "conversations": memory_data
+                "conversations": self.get_full_memory()
             }
 
-            response = requests.post(
-                f"{django_url}/api/turns/bulk/",
-                json=payload,
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                print(f"Persisted {len(self.memory)} turns for session {self.session_id}")
-            else:
-                print(f"Failed to persist turns: {response.status_code}")
+            enqueue_event(f"{django_url}/api/ai/sessions/turns/", payload)
+            print(f"Queued {len(self.memory)} turns for session {self.session_id}")
 
         except Exception as e:
             print(f"Error persisting memory: {e}")
@@ -0,0 +1,157 @@
+"""
+Model catalog module for AI Psychologist service
+Discovers the Gemini models available to the API key once at startup and
+refreshes them in the background, so requests skip unavailable models up
+front and nothing lists models on the request path
+"""
+import google.generativeai as genai
+from typing import Dict, List, Optional, Any
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.gemini_config import configure_gemini
+except ImportError:
+    from .gemini_config import configure_gemini
+
+load_dotenv()
+
+def _model_list(value: str) -> List[str]:
+    return [m.strip() for m in value.split(",") if m.strip()]
+
+
+# Model chains in order of preference. Reply and risk calls go through the
+# model router; the backend's summaries read their chain from /diagnostics/models.
+MODEL_CHAINS = {
+    "reply": _model_list(os.getenv(
+        "GEMINI_MODELS", "gemini-2.0-flash,gemini-2.0-flash-lite,gemini-1.5-flash,gemini-pro"
+    )),
+    "risk": _model_list(os.getenv("GEMINI_RISK_MODELS", "") or os.getenv(
+        "GEMINI_MODELS", "gemini-2.0-flash,gemini-2.0-flash-lite,gemini-1.5-flash,gemini-pro"
+    )),
+    "summary": _model_list(os.getenv(
+        "GEMINI_SUMMARY_MODELS", "gemini-2.5-flash,gemini-2.5-flash-preview-05-20,gemini-2.5-pro-preview-03-25"
+    ))
+}
+
+MODEL_CATALOG_ENABLED = os.getenv("MODEL_CATALOG_ENABLED", "true").lower() == "true"
+# Background refresh interval (0 = discover once at startup only)
+MODEL_CATALOG_REFRESH_SECONDS = float(os.getenv("MODEL_CATALOG_REFRESH_SECONDS", "900"))
+
+
+class ModelCatalog:
+    """
+    Gemini models that accept generateContent for the configured key
+    Until the first successful discovery every model counts as available, so
+    a listing outage never blocks generation.
+    """
+    def __init__(self, chains: Optional[Dict[str, List[str]]] = None):
+        self.enabled = MODEL_CATALOG_ENABLED
+        self.chains = {name: list(models) for name, models in (chains or MODEL_CHAINS).items()}
+        self._models: Optional[Dict[str, Dict[str, Any]]] = None
+        self.discovered_at: Optional[float] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        """List models now (blocking); returns True on success"""
+        if not self.enabled:
+            return False
+        started = time.perf_counter()
+        try:
+            configure_gemini()
+            models = {}
+            for model in genai.list_models():
+                if "generateContent" not in model.supported_generation_methods:
+                    continue
+                name = model.name.split("/", 1)[-1]
+                models[name] = {
+                    "display_name": getattr(model, "display_name", name),
+                    "input_token_limit": getattr(model, "input_token_limit", None),
+                    "output_token_limit": getattr(model, "output_token_limit", None)
+                }
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                self.last_error = str(e)[:200]
+            print(f"⚠️ Model discovery failed, keeping {'last catalog' if self._models else 'configured models'}: {e}")
+            return False
+
+        with self._lock:
+            self._models = models
+            self.discovered_at = time.time()
+            self.refreshes += 1
+            self.last_error = None
+        missing = sorted({m for chain in self.chains.values() for m in chain} - set(models))
+        print(f"📋 Model catalog: {len(models)} models in {(time.perf_counter() - started) * 1000:.0f}ms"
+              + (f", unavailable: {', '.join(missing)}" if missing else ""))
+        return True
+
+    def is_available(self, model_name: str) -> bool:
+        with self._lock:
+            return self._models is None or model_name in self._models
+
+    def available(self, models: List[str]) -> List[str]:
+        """
+        Models from the list the catalog knows, in order
+        If none of them is listed the list is returned unchanged: a wrong
+        catalog must not leave a path with nothing to try.
+        """
+        with self._lock:
+            if self._models is None:
+                return list(models)
+            listed = [m for m in models if m in self._models]
+        return listed or list(models)
+
+    def chain(self, name: str) -> List[str]:
+        """Available models of a named chain (reply, risk, summary)"""
+        return self.available(self.chains.get(name, []))
+
+    def start(self):
+        """Discover in the background now, then every MODEL_CATALOG_REFRESH_SECONDS"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-catalog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        self.refresh()
+        while MODEL_CATALOG_REFRESH_SECONDS > 0 and not self._stop.wait(MODEL_CATALOG_REFRESH_SECONDS):
+            self.refresh()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            models = dict(self._models) if self._models is not None else None
+            return {
+                "enabled": self.enabled,
+                "discovered": models is not None,
+                "discovered_at": self.discovered_at,
+                "age_seconds": round(time.time() - self.discovered_at, 1) if self.discovered_at else None,
+                "refresh_seconds": MODEL_CATALOG_REFRESH_SECONDS,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "last_error": self.last_error,
+                "models": models,
+                "chains": {
+                    name: [{"model": m, "available": models is None or m in models} for m in chain]
+                    for name, chain in self.chains.items()
+                }
+            }
+
+
+# Global catalog shared by the reply, risk and summary paths
+model_catalog = ModelCatalog()
+
+def get_model_catalog() -> ModelCatalog:
+    """Get the global model catalog"""
+    return model_catalog
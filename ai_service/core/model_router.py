@@ -0,0 +1,401 @@
+"""
+Model routing module for AI Psychologist service
+Reuses Gemini model instances and routes requests to the healthiest model
+"""
+import google.generativeai as genai
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple, Any
+from collections import OrderedDict, deque
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.turn_metrics import percentile
+    from core.rate_limiter import PRIORITY_AUDIT, PRIORITY_REPLY, RateLimitExceeded, gemini_rate_limiter
+    from core.model_catalog import MODEL_CHAINS, model_catalog
+except ImportError:
+    from .turn_metrics import percentile
+    from .rate_limiter import PRIORITY_AUDIT, PRIORITY_REPLY, RateLimitExceeded, gemini_rate_limiter
+    from .model_catalog import MODEL_CHAINS, model_catalog
+
+load_dotenv()
+
+# Reply models in order of preference (GEMINI_MODELS, see model_catalog)
+DEFAULT_MODELS = MODEL_CHAINS["reply"]
+
+# Cached GenerativeModel instances (one per model + system prompt)
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "64"))
+
+# Context caching of the stable prefix (system + safety prompt) where the API
+# supports it; models that reject it silently use a plain instance
+LLM_CONTEXT_CACHE = os.getenv("LLM_CONTEXT_CACHE", "false").lower() == "true"
+LLM_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("LLM_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+
+# Circuit breaker: open after N consecutive failures (or a low success rate over
+# enough recent calls), probe again after the cooldown
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("MODEL_CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_MIN_SUCCESS_RATE = float(os.getenv("MODEL_CIRCUIT_MIN_SUCCESS_RATE", "0.5"))
+CIRCUIT_MIN_SAMPLES = int(os.getenv("MODEL_CIRCUIT_MIN_SAMPLES", "10"))
+CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("MODEL_CIRCUIT_COOLDOWN_SECONDS", "30"))
+
+# Recent calls kept per model for success rate and latency percentiles
+MODEL_HEALTH_WINDOW = int(os.getenv("MODEL_HEALTH_WINDOW", "100"))
+
+# Health score (lower is better, in ms): p95 latency + error rate * penalty +
+# rank in the configured order * step. The step keeps the preferred model
+# first unless another is clearly faster or more reliable.
+MODEL_ERROR_PENALTY_MS = float(os.getenv("MODEL_ERROR_PENALTY_MS", "10000"))
+MODEL_PREFERENCE_STEP_MS = float(os.getenv("MODEL_PREFERENCE_STEP_MS", "1000"))
+# Probe a cooled-down model with a one-token background request instead of a user request
+MODEL_BACKGROUND_PROBE = os.getenv("MODEL_BACKGROUND_PROBE", "true").lower() == "true"
+
+
+class ModelHealth:
+    """Rolling success/latency record and circuit state for one model"""
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.outcomes: deque = deque(maxlen=MODEL_HEALTH_WINDOW)
+        self.latencies_ms: deque = deque(maxlen=MODEL_HEALTH_WINDOW)
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.state = "closed"  # closed | open | half_open
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def success_rate(self) -> float:
+        if not self.outcomes:
+            return 1.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = list(self.latencies_ms)
+        return {
+            "state": self.state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "success_rate": round(self.success_rate, 3),
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99)
+            },
+            "last_error": self.last_error
+        }
+
+
+class ModelRouter:
+    """
+    Process-wide Gemini model router
+    Keeps model instances for reuse and orders candidates by health score, so
+    a slow or failing model stops costing a timeout on every request.
+    """
+    def __init__(self, models: Optional[List[str]] = None):
+        self.models = list(models or DEFAULT_MODELS)
+        # (model, system prompt) -> (GenerativeModel, expires_at or None)
+        self._instances: "OrderedDict[Tuple[str, Optional[str]], Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._health: Dict[str, ModelHealth] = {}
+        # Models that rejected system_instruction; the prompt is injected for these
+        self._no_system_instruction: set = set()
+        # Models that rejected context caching
+        self._no_context_cache: set = set()
+        self.context_cache_enabled = LLM_CONTEXT_CACHE
+        self.context_caches_created = 0
+        self._lock = threading.Lock()
+
+    def _get_health(self, model_name: str) -> ModelHealth:
+        health = self._health.get(model_name)
+        if health is None:
+            health = ModelHealth(model_name)
+            self._health[model_name] = health
+        return health
+
+    def get_model(self, model_name: str, system_instruction: Optional[str] = None):
+        """Return a cached GenerativeModel for (model, system prompt)"""
+        key = (model_name, system_instruction)
+        with self._lock:
+            entry = self._instances.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._instances.move_to_end(key)
+                return entry[0]
+
+        model, expires_at = None, None
+        if system_instruction and self.context_cache_enabled and model_name not in self._no_context_cache:
+            model = self._create_cached_model(model_name, system_instruction)
+            if model is not None:
+                # Renew before the server-side cache expires
+                expires_at = time.monotonic() + LLM_CONTEXT_CACHE_TTL_SECONDS * 0.9
+
+        if model is None:
+            if system_instruction:
+                model = genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+            else:
+                model = genai.GenerativeModel(model_name=model_name)
+
+        with self._lock:
+            self._instances[key] = (model, expires_at)
+            self._instances.move_to_end(key)
+            while len(self._instances) > MODEL_CACHE_SIZE:
+                self._instances.popitem(last=False)
+        return model
+
+    def _create_cached_model(self, model_name: str, system_instruction: str):
+        """Model backed by a server-side context cache of the system prompt, or None"""
+        try:
+            from google.generativeai import caching
+            cache = caching.CachedContent.create(
+                model=model_name if model_name.startswith("models/") else f"models/{model_name}",
+                system_instruction=system_instruction,
+                ttl=timedelta(seconds=LLM_CONTEXT_CACHE_TTL_SECONDS)
+            )
+            model = genai.GenerativeModel.from_cached_content(cache)
+            with self._lock:
+                self.context_caches_created += 1
+            return model
+        except Exception as e:
+            # Unsupported model, prompt below the minimum cacheable size, old SDK...
+            with self._lock:
+                self._no_context_cache.add(model_name)
+            print(f"ℹ️ Context caching unavailable for {model_name}, using plain instances: {e}")
+            return None
+
+    def candidates(self, models: Optional[List[str]] = None) -> List[str]:
+        """
+        Models to try, healthiest first
+        Models missing from the catalog are skipped. Closed circuits are
+        ordered by health score (p95 latency, error rate, configured
+        preference). Open circuits are skipped until their cooldown elapses;
+        the model is then half-open: a background probe checks it, and it is
+        only tried after every healthy model.
+        """
+        models = model_catalog.available(list(models or self.models))
+        now = time.monotonic()
+        healthy, half_open, probes = [], [], []
+
+        with self._lock:
+            for index, model_name in enumerate(models):
+                health = self._get_health(model_name)
+                if health.state == "closed":
+                    healthy.append((index, model_name, health))
+                    continue
+                if now - (health.opened_at or 0) >= CIRCUIT_COOLDOWN_SECONDS:
+                    # Cooldown elapsed (or a probe never concluded): probe and restart the cooldown
+                    health.state = "half_open"
+                    health.opened_at = now
+                    probes.append(model_name)
+                if health.state == "half_open":
+                    half_open.append(model_name)
+
+            known_p95 = [p for p in (percentile(list(h.latencies_ms), 95) for _, _, h in healthy) if p is not None]
+            # A model without samples is assumed as fast as the fastest known one
+            default_p95 = min(known_p95) if known_p95 else 0.0
+            ranked = sorted(healthy, key=lambda item: self._health_score(item[2], item[0], default_p95))
+
+        for model_name in probes:
+            self._start_probe(model_name)
+
+        ordered = [model_name for _, model_name, _ in ranked] + half_open
+        # Every circuit is open - still try in preference order rather than fail outright
+        return ordered or models
+
+    def _health_score(self, health: ModelHealth, index: int, default_p95: float) -> float:
+        """Lower is better: p95 latency (ms) plus penalties for errors and configured rank"""
+        p95 = percentile(list(health.latencies_ms), 95)
+        return ((p95 if p95 is not None else default_p95)
+                + (1.0 - health.success_rate) * MODEL_ERROR_PENALTY_MS
+                + index * MODEL_PREFERENCE_STEP_MS)
+
+    def _start_probe(self, model_name: str):
+        """Check a half-open model with a one-token request off the request path"""
+        if not MODEL_BACKGROUND_PROBE:
+            return
+        print(f"🔌 Probing model {model_name} after circuit cooldown")
+
+        def probe():
+            try:
+                # The outcome closes or reopens the circuit (record_success/record_failure)
+                self.call_model(model_name, "ping", generation_config={"max_output_tokens": 1},
+                                priority=PRIORITY_AUDIT)
+            except Exception as e:
+                print(f"🔌 Probe of {model_name} failed: {e}")
+
+        threading.Thread(target=probe, name=f"probe-{model_name}", daemon=True).start()
+
+    def record_success(self, model_name: str, latency_ms: float):
+        with self._lock:
+            health = self._get_health(model_name)
+            health.outcomes.append(1)
+            health.latencies_ms.append(latency_ms)
+            health.successes += 1
+            health.consecutive_failures = 0
+            if health.state != "closed":
+                print(f"✅ Model {model_name} recovered, closing circuit")
+                # Start the recovered model with a clean record
+                health.outcomes.clear()
+                health.outcomes.append(1)
+            health.state = "closed"
+            health.opened_at = None
+
+    def record_failure(self, model_name: str, error: Exception):
+        with self._lock:
+            health = self._get_health(model_name)
+            health.outcomes.append(0)
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_error = str(error)[:200]
+            degraded = (len(health.outcomes) >= CIRCUIT_MIN_SAMPLES
+                        and health.success_rate < CIRCUIT_MIN_SUCCESS_RATE)
+            if health.state == "half_open" or degraded or health.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                if health.state != "open":
+                    print(f"🚫 Opening circuit for model {model_name} "
+                          f"(consecutive failures {health.consecutive_failures}, "
+                          f"success rate {health.success_rate:.2f})")
+                health.state = "open"
+                health.opened_at = time.monotonic()
+
+    def latency_samples(self, model_name: str) -> List[float]:
+        """Recent successful call latencies for a model"""
+        with self._lock:
+            return list(self._get_health(model_name).latencies_ms)
+
+    def latency_percentile(self, model_name: str, pct: float) -> Optional[float]:
+        """Latency percentile of recent successful calls to a model"""
+        return percentile(self.latency_samples(model_name), pct)
+
+    def generate_content(
+        self,
+        contents: Any,
+        generation_config: Any = None,
+        system_instruction: Optional[str] = None,
+        models: Optional[List[str]] = None,
+        label: str = "llm",
+        priority: int = PRIORITY_REPLY,
+        **kwargs
+    ) -> Tuple[Any, Optional[str], Optional[Exception]]:
+        """
+        Send a request to the healthiest available model, falling back in order
+
+        Returns:
+            Tuple of (response or None, model name that answered, last error)
+        """
+        last_error = None
+
+        for model_name in self.candidates(models):
+            try:
+                response = self.call_model(
+                    model_name, contents, generation_config, system_instruction, priority=priority, **kwargs
+                )
+                if response:
+                    return response, model_name, None
+            except RateLimitExceeded as e:
+                # Shed, or the API reported quota exhaustion; the quota is shared
+                # by all models - falling back would not help
+                print(f"🚦 {label} request shed by rate limiter")
+                return None, None, e
+            except Exception as e:
+                print(f"❌ {label} model {model_name} failed: {e}")
+                last_error = e
+
+        return None, None, last_error
+
+    def call_model(
+        self,
+        model_name: str,
+        contents: Any,
+        generation_config: Any = None,
+        system_instruction: Optional[str] = None,
+        priority: int = PRIORITY_REPLY,
+        **kwargs
+    ):
+        """Call one model, recording the outcome; raises on failure (RateLimitExceeded if shed or out of quota)"""
+        gemini_rate_limiter.acquire(priority)
+        started = time.perf_counter()
+        try:
+            if system_instruction and model_name in self._no_system_instruction:
+                response = self._generate_with_injected_prompt(
+                    model_name, contents, generation_config, system_instruction, **kwargs
+                )
+            else:
+                try:
+                    model = self.get_model(model_name, system_instruction)
+                    response = model.generate_content(contents, generation_config=generation_config, **kwargs)
+                except Exception as e:
+                    if not (system_instruction and _is_system_instruction_error(e)):
+                        raise
+                    # Older models/libraries without system_instruction support
+                    print(f"⚠️ {model_name} does not accept system_instruction, using prompt injection")
+                    with self._lock:
+                        self._no_system_instruction.add(model_name)
+                    response = self._generate_with_injected_prompt(
+                        model_name, contents, generation_config, system_instruction, **kwargs
+                    )
+        except Exception as e:
+            if gemini_rate_limiter.report_error(e):
+                # The key's quota is spent, not the model: shed like the limiter
+                # would instead of counting it against the model's health
+                raise RateLimitExceeded(priority) from e
+            self.record_failure(model_name, e)
+            raise
+
+        self.record_success(model_name, (time.perf_counter() - started) * 1000)
+        return response
+
+    def _generate_with_injected_prompt(self, model_name, contents, generation_config, system_instruction, **kwargs):
+        model = self.get_model(model_name)
+        return model.generate_content(
+            _inject_system_prompt(contents, system_instruction),
+            generation_config=generation_config,
+            **kwargs
+        )
+
+    def clear(self):
+        """Drop cached model instances (e.g. after reconfiguring the client)"""
+        with self._lock:
+            self._instances.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cached_instances": len(self._instances),
+                "prompt_injection_models": sorted(self._no_system_instruction),
+                "context_cache": {
+                    "enabled": self.context_cache_enabled,
+                    "created": self.context_caches_created,
+                    "unsupported_models": sorted(self._no_context_cache)
+                },
+                "models": {name: health.to_dict() for name, health in self._health.items()}
+            }
+
+
+def _is_system_instruction_error(error: Exception) -> bool:
+    """True when a failure means the model/library rejected system_instruction"""
+    if isinstance(error, TypeError):
+        return "system_instruction" in str(error)
+    message = str(error).lower()
+    return "system_instruction" in message or "system instruction" in message
+
+
+def _inject_system_prompt(contents: Any, system_prompt: str) -> Any:
+    """Prepend the system prompt to the first user message"""
+    if isinstance(contents, str):
+        return f"System Instruction: {system_prompt}\n\nUser Message: {contents}"
+
+    messages = [dict(message, parts=list(message["parts"])) for message in contents]
+    if messages and messages[0]["role"] == "user":
+        messages[0]["parts"][0] = f"System Instruction: {system_prompt}\n\nUser Message: {messages[0]['parts'][0]}"
+    else:
+        messages.insert(0, {"role": "user", "parts": [f"System Instruction: {system_prompt}"]})
+    return messages
+
+
+# Global router shared by the LLM and risk handlers
+model_router = ModelRouter()
+
+
+def get_model_router() -> ModelRouter:
+    """Get the process-wide model router"""
+    return model_router
@@ -0,0 +1,313 @@
+"""
+Outbox module for AI Psychologist service
+Durable queue for writes to the Django backend: events are stored in a local
+SQLite file and a background thread delivers them in per-endpoint batches,
+retrying with backoff, so live turns never wait on Django and nothing is
+lost while the backend is slow or restarting
+"""
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urlparse
+import threading
+import sqlite3
+import random
+import uuid
+import json
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# SQLite file holding undelivered events (survives restarts)
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "outbox.sqlite3")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+# Idle wait between flushes; a safety alert wakes the flusher at once
+OUTBOX_FLUSH_INTERVAL_SECONDS = float(os.getenv("OUTBOX_FLUSH_INTERVAL_SECONDS", "1.0"))
+OUTBOX_TIMEOUT_SECONDS = float(os.getenv("OUTBOX_TIMEOUT_SECONDS", "5"))
+# Retry backoff: base * 2^attempts with jitter, capped
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "1"))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "60"))
+# Time shutdown gives the last delivery attempt; the rest stays on disk for the next start
+OUTBOX_SHUTDOWN_FLUSH_SECONDS = float(os.getenv("OUTBOX_SHUTDOWN_FLUSH_SECONDS", "5"))
+# Attempts a non-alert event gets on 401/403/404 before it is marked dead
+# (safety alerts keep retrying those for as long as it takes)
+OUTBOX_MAX_CLIENT_ERROR_ATTEMPTS = int(os.getenv("OUTBOX_MAX_CLIENT_ERROR_ATTEMPTS", "20"))
+
+# Delivery order: alerts go ahead of everything else
+PRIORITY_ALERT = 0
+PRIORITY_NORMAL = 1
+
+# Endpoints that accept {"events": [...]} and answer with a result per event_id
+BATCH_PATHS = ("/api/ai/alerts/", "/api/ai/sessions/risk/", "/api/ai/sessions/turns/")
+
+# Replies that usually clear up once the backend is fixed or catches up: a
+# rotated INTERNAL_AI_TOKEN, or a session row that isn't written yet
+_RECOVERABLE_CLIENT_ERRORS = (401, 403, 404)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_error TEXT
+)
+"""
+
+
+def _retryable(status: Optional[int], priority: int = PRIORITY_NORMAL, attempts: int = 0) -> bool:
+    """
+    Network errors, timeouts, throttling and server errors always; 401/403/404
+    always for alerts and for a bounded number of attempts otherwise. Other
+    client errors (a malformed payload) will not succeed later.
+    """
+    if status is None or status in (408, 425, 429) or status >= 500:
+        return True
+    if status in _RECOVERABLE_CLIENT_ERRORS:
+        return priority == PRIORITY_ALERT or attempts < OUTBOX_MAX_CLIENT_ERROR_ATTEMPTS
+    return False
+
+
+class Outbox:
+    """
+    SQLite-backed queue of backend writes with a background flusher
+    Delivery is at least once: every payload carries an event_id the backend
+    uses to acknowledge a repeat instead of storing it twice. Events the
+    backend rejects outright are kept with status 'dead' for inspection; a
+    dead safety alert is logged loudly and listed in get_stats().
+    """
+    def __init__(self, path: str = OUTBOX_PATH):
+        self.path = path
+        self.stats = {"enqueued": 0, "delivered": 0, "batches": 0, "retries": 0, "dead": 0, "dead_alerts": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database on first use (called with the lock held)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            # WAL keeps inserts from live turns cheap and committed rows survive a crash
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS events_due ON events (status, url, priority, next_attempt)")
+            self._conn = conn
+        return self._conn
+
+    def enqueue(self, url: str, payload: Dict[str, Any], priority: int = PRIORITY_NORMAL) -> str:
+        """Store an event for delivery and return its event_id (one local insert, no network)"""
+        event_id = uuid.uuid4().hex
+        body = json.dumps({**payload, "event_id": event_id}, ensure_ascii=False, default=str)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            next_attempt = now
+            if priority != PRIORITY_ALERT:
+                # Join an endpoint that is backing off instead of probing it again; alerts always try now
+                backoff = db.execute(
+                    "SELECT MAX(next_attempt) FROM events WHERE status = 'pending' AND url = ?", (url,)
+                ).fetchone()[0]
+                next_attempt = max(now, backoff or now)
+            db.execute(
+                "INSERT INTO events (event_id, url, payload, priority, next_attempt, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (event_id, url, body, priority, next_attempt, now)
+            )
+            self.stats["enqueued"] += 1
+
+        self.start()
+        if priority == PRIORITY_ALERT:
+            self._wake.set()
+        return event_id
+
+    def flush(self) -> int:
+        """Deliver one batch per endpoint with events due, alert endpoints first; returns events delivered"""
+        now = time.time()
+        with self._lock:
+            urls = [row[0] for row in self._db().execute(
+                "SELECT url FROM events WHERE status = 'pending' AND next_attempt <= ? "
+                "GROUP BY url ORDER BY MIN(priority), MIN(id)",
+                (now,)
+            )]
+
+        delivered = 0
+        for url in urls:
+            batched = urlparse(url).path in BATCH_PATHS
+            with self._lock:
+                # Events still backing off ride along, so a recovered endpoint gets full batches
+                rows = self._db().execute(
+                    "SELECT id, event_id, payload, attempts, priority FROM events "
+                    "WHERE status = 'pending' AND url = ? ORDER BY priority, id LIMIT ?",
+                    (url, OUTBOX_BATCH_SIZE if batched else 1)
+                ).fetchall()
+            if rows:
+                delivered += self._deliver(url, rows, batched)
+        return delivered
+
+    def _deliver(self, url: str, rows: List[Tuple], batched: bool) -> int:
+        """POST one batch (or a single event) and settle each event by its result"""
+        import requests
+
+        payloads = [json.loads(row[2]) for row in rows]
+        error = None
+        try:
+            response = requests.post(
+                url,
+                json={"events": payloads} if batched else payloads[0],
+                headers={'X-Internal-Token': os.getenv('INTERNAL_AI_TOKEN', 'your-secret-token-here')},
+                timeout=OUTBOX_TIMEOUT_SECONDS
+            )
+            statuses = self._statuses(response, rows, batched)
+            if response.status_code >= 300:
+                error = f"HTTP {response.status_code}"
+        except Exception as e:
+            statuses = {row[1]: None for row in rows}
+            error = str(e)[:200]
+
+        # One backoff for the whole batch keeps its events together on the next attempt
+        tries = max(row[3] for row in rows)
+        retry_at = time.time() + min(
+            OUTBOX_RETRY_MAX_SECONDS, OUTBOX_RETRY_BASE_SECONDS * 2 ** tries
+        ) * random.uniform(0.5, 1.0)
+        delivered = retried = dead = 0
+        dead_alerts = []
+        with self._lock:
+            db = self._db()
+            for row_id, event_id, _, attempts, priority in rows:
+                status = statuses.get(event_id)
+                if status is not None and 200 <= status < 300:
+                    db.execute("DELETE FROM events WHERE id = ?", (row_id,))
+                    delivered += 1
+                elif _retryable(status, priority, attempts + 1):
+                    db.execute(
+                        "UPDATE events SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                        (attempts + 1, retry_at, error or f"HTTP {status}", row_id)
+                    )
+                    retried += 1
+                else:
+                    db.execute(
+                        "UPDATE events SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                        (attempts + 1, f"HTTP {status}", row_id)
+                    )
+                    dead += 1
+                    if priority == PRIORITY_ALERT:
+                        dead_alerts.append((event_id, status))
+            self.stats["batches"] += 1
+            self.stats["delivered"] += delivered
+            self.stats["retries"] += retried
+            self.stats["dead"] += dead
+            self.stats["dead_alerts"] += len(dead_alerts)
+
+        path = urlparse(url).path
+        if delivered:
+            print(f"📮 Outbox delivered {delivered} event(s) to {path}")
+        if retried:
+            print(f"⚠️ Outbox: {retried} event(s) for {path} will be retried ({error or 'rejected'})")
+        if dead:
+            print(f"❌ Outbox: {dead} event(s) for {path} rejected by the backend, kept as dead")
+        for event_id, status in dead_alerts:
+            # A counselor never saw this alert: make it impossible to miss
+            print(f"🚨🚨 SAFETY ALERT NOT DELIVERED: event {event_id} rejected with HTTP {status}; "
+                  f"see GET /stats/outbox and deliver it by hand")
+        return delivered
+
+    def _statuses(self, response: Any, rows: List[Tuple], batched: bool) -> Dict[str, Optional[int]]:
+        """HTTP-style status per event_id; a batch reply lists one per event"""
+        statuses = {row[1]: response.status_code for row in rows}
+        if batched and response.status_code == 200:
+            try:
+                for result in response.json().get("results", []):
+                    if result.get("event_id") in statuses:
+                        statuses[result["event_id"]] = int(result.get("status", 500))
+            except (ValueError, AttributeError, TypeError):
+                # Not a batch reply: every event shares the response status
+                pass
+        return statuses
+
+    def start(self):
+        """Start the background flusher (also delivers events left from a previous run)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="backend-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = OUTBOX_SHUTDOWN_FLUSH_SECONDS):
+        """Stop the flusher after one last delivery attempt, waiting at most timeout seconds"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                delivered = self.flush()
+            except Exception as e:
+                print(f"Error flushing outbox: {e}")
+                delivered = 0
+            # A full batch may have more behind it; otherwise wait for new events or retries
+            if not delivered:
+                self._wake.wait(OUTBOX_FLUSH_INTERVAL_SECONDS)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Error flushing outbox on shutdown: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            db = self._db()
+            by_status = dict(db.execute("SELECT status, COUNT(*) FROM events GROUP BY status").fetchall())
+            pending_by_url = dict(db.execute(
+                "SELECT url, COUNT(*) FROM events WHERE status = 'pending' GROUP BY url"
+            ).fetchall())
+            oldest = db.execute("SELECT MIN(created_at) FROM events WHERE status = 'pending'").fetchone()[0]
+            dead_alerts = db.execute(
+                "SELECT event_id, payload, attempts, last_error, created_at FROM events "
+                "WHERE status = 'dead' AND priority = ? ORDER BY id",
+                (PRIORITY_ALERT,)
+            ).fetchall()
+        stats["pending"] = by_status.get("pending", 0)
+        stats["dead_stored"] = by_status.get("dead", 0)
+        # Undelivered safety alerts need someone to act on them
+        stats["dead_alert_events"] = []
+        for event_id, payload, attempts, last_error, created_at in dead_alerts:
+            alert = json.loads(payload)
+            stats["dead_alert_events"].append({
+                "event_id": event_id,
+                "session_id": alert.get("session_id"),
+                "risk_level": alert.get("risk_level"),
+                "attempts": attempts,
+                "last_error": last_error,
+                "created_at": created_at
+            })
+        stats["pending_by_endpoint"] = {urlparse(url).path: count for url, count in pending_by_url.items()}
+        stats["oldest_pending_seconds"] = round(time.time() - oldest, 1) if oldest else 0.0
+        stats["path"] = self.path
+        stats["running"] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+
+# Global outbox
+outbox = Outbox()
+
+def enqueue_event(url: str, payload: Dict[str, Any], priority: int = PRIORITY_NORMAL) -> str:
+    """Convenience function to queue a backend write"""
+    return outbox.enqueue(url, payload, priority)
+
+def get_outbox_stats() -> Dict[str, Any]:
+    """Convenience function for outbox delivery stats"""
+    return outbox.get_stats()
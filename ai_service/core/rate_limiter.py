@@ -0,0 +1,157 @@
+"""
+Rate limiting module for AI Psychologist service
+Process-wide token bucket for Gemini calls with priority classes, so safety
+checks keep working when the shared API key approaches its quota
+"""
+from typing import Dict, Any
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Priority classes (lower value = more important)
+PRIORITY_RISK = 0
+PRIORITY_REPLY = 1
+PRIORITY_SUMMARY = 2
+PRIORITY_AUDIT = 3  # offline transcript re-screening
+PRIORITY_NAMES = {PRIORITY_RISK: "risk", PRIORITY_REPLY: "reply", PRIORITY_SUMMARY: "summary", PRIORITY_AUDIT: "audit"}
+
+# Requests per minute for this worker's share of the API key, and burst size
+GEMINI_RATE_LIMIT_RPM = float(os.getenv("GEMINI_RATE_LIMIT_RPM", "60"))
+GEMINI_RATE_LIMIT_BURST = float(os.getenv("GEMINI_RATE_LIMIT_BURST", "10"))
+
+# Fraction of the bucket a priority class cannot dip into (kept for higher classes)
+_RESERVED_FRACTION = {
+    PRIORITY_RISK: 0.0,
+    PRIORITY_REPLY: float(os.getenv("GEMINI_RATE_RESERVE_FOR_RISK", "0.2")),
+    PRIORITY_SUMMARY: float(os.getenv("GEMINI_RATE_RESERVE_FOR_LIVE", "0.5")),
+    PRIORITY_AUDIT: float(os.getenv("GEMINI_RATE_RESERVE_FOR_LIVE", "0.5"))
+}
+
+# How long each class may queue for a token before it is shed
+_MAX_WAIT_SECONDS = {
+    PRIORITY_RISK: float(os.getenv("GEMINI_RATE_WAIT_RISK_SECONDS", "2.0")),
+    PRIORITY_REPLY: float(os.getenv("GEMINI_RATE_WAIT_REPLY_SECONDS", "1.0")),
+    PRIORITY_SUMMARY: float(os.getenv("GEMINI_RATE_WAIT_SUMMARY_SECONDS", "0")),
+    # Batch audits queue for tokens rather than being shed
+    PRIORITY_AUDIT: float(os.getenv("GEMINI_RATE_WAIT_AUDIT_SECONDS", "30"))
+}
+
+# After a quota error (429) the bucket is emptied and refills from zero
+QUOTA_ERROR_MARKERS = ("429", "resource_exhausted", "resource exhausted", "quota")
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call is shed because no token became available in time"""
+    def __init__(self, priority: int):
+        super().__init__(f"Gemini rate limit: {PRIORITY_NAMES.get(priority, priority)} call shed")
+        self.priority = priority
+
+
+class PriorityRateLimiter:
+    """
+    Token bucket shared by all Gemini callers in the process
+    Lower-priority classes may only use the part of the bucket above their
+    reserve and never overtake a waiting higher-priority caller.
+    """
+    def __init__(self, rate_per_minute: float = GEMINI_RATE_LIMIT_RPM, burst: float = GEMINI_RATE_LIMIT_BURST):
+        self.enabled = rate_per_minute > 0
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+        self._waiting = {priority: 0 for priority in PRIORITY_NAMES}
+        self.stats = {
+            name: {"granted": 0, "queued": 0, "shed": 0, "wait_ms_total": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self.quota_errors = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def _can_take(self, priority: int) -> bool:
+        if any(self._waiting[p] for p in PRIORITY_NAMES if p < priority):
+            return False
+        return self.tokens - 1.0 >= self.capacity * _RESERVED_FRACTION[priority]
+
+    def acquire(self, priority: int = PRIORITY_REPLY, max_wait: float = None):
+        """Take one token, queueing up to the class's max wait; raises RateLimitExceeded"""
+        if not self.enabled:
+            return
+        if max_wait is None:
+            max_wait = _MAX_WAIT_SECONDS[priority]
+        name = PRIORITY_NAMES[priority]
+        started = time.monotonic()
+        deadline = started + max_wait
+
+        with self._condition:
+            self._refill()
+            if not self._can_take(priority):
+                self.stats[name]["queued"] += 1
+                self._waiting[priority] += 1
+                try:
+                    while True:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.stats[name]["shed"] += 1
+                            raise RateLimitExceeded(priority)
+                        # Wake when a token could have refilled, or when notified
+                        self._condition.wait(min(remaining, max(1.0 / max(self.rate_per_second, 1e-6), 0.01)))
+                        self._refill()
+                        if self._can_take(priority):
+                            break
+                finally:
+                    self._waiting[priority] -= 1
+                    self._condition.notify_all()
+
+            self.tokens -= 1.0
+            self.stats[name]["granted"] += 1
+            self.stats[name]["wait_ms_total"] += (time.monotonic() - started) * 1000
+
+    def report_error(self, error: Exception) -> bool:
+        """Empty the bucket when the API reports quota exhaustion; True if it did"""
+        message = str(error).lower()
+        if not any(marker in message for marker in QUOTA_ERROR_MARKERS):
+            return False
+        with self._condition:
+            self.quota_errors += 1
+            self.tokens = 0.0
+            self._updated = time.monotonic()
+        print("⚠️ Gemini quota error - rate limiter drained")
+        return True
+
+    def headroom(self) -> float:
+        """Fraction of the bucket currently available (1.0 = full burst available)"""
+        if not self.enabled:
+            return 1.0
+        with self._condition:
+            self._refill()
+            return round(self.tokens / self.capacity, 3)
+
+    def get_stats(self) -> Dict[str, Any]:
+        headroom = self.headroom()
+        with self._condition:
+            classes = {name: dict(counts) for name, counts in self.stats.items()}
+            waiting = {PRIORITY_NAMES[p]: count for p, count in self._waiting.items()}
+        for counts in classes.values():
+            counts["avg_wait_ms"] = round(counts["wait_ms_total"] / counts["granted"], 2) if counts["granted"] else 0.0
+            counts["wait_ms_total"] = round(counts["wait_ms_total"], 2)
+        return {
+            "enabled": self.enabled,
+            "rate_per_minute": round(self.rate_per_second * 60, 2),
+            "burst": self.capacity,
+            "headroom": headroom,
+            "waiting": waiting,
+            "quota_errors": self.quota_errors,
+            "classes": classes
+        }
+
+
+# Global limiter shared by the risk, reply and summary paths
+gemini_rate_limiter = PriorityRateLimiter()
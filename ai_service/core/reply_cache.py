@@ -0,0 +1,229 @@
+"""
+Reply cache module for AI Psychologist service
+Opt-in cache of LLM replies for near-identical turns, shared across sessions
+in a worker with a pluggable backend (in-memory LRU or Redis)
+"""
+from typing import Dict, List, Optional, Any
+from collections import OrderedDict, defaultdict
+import threading
+import hashlib
+import json
+import time
+import re
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.text_classifier import normalize_text
+except ImportError:
+    from .text_classifier import normalize_text
+
+load_dotenv()
+
+REPLY_CACHE_ENABLED = os.getenv("REPLY_CACHE_ENABLED", "false").lower() == "true"
+REPLY_CACHE_TTL_SECONDS = int(os.getenv("REPLY_CACHE_TTL_SECONDS", "3600"))
+REPLY_CACHE_MAX_ENTRIES = int(os.getenv("REPLY_CACHE_MAX_ENTRIES", "2000"))
+
+# "memory" (per worker) or "redis" (shared, needs the redis package and REDIS_URL)
+REPLY_CACHE_BACKEND = os.getenv("REPLY_CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Past exchanges folded into the key: replies are only reused in the same context
+REPLY_CACHE_CONTEXT_TURNS = int(os.getenv("REPLY_CACHE_CONTEXT_TURNS", "1"))
+
+# Utterances with no user-specific detail (greetings, thanks, acknowledgements).
+# Replies are shared only for sessions made entirely of these: the reply is
+# generated from the whole session chat, so anything personal earlier in the
+# session could surface in it.
+_GENERIC_UTTERANCES = [
+    "hi", "hello", "hey", "hi there", "hello there", "good morning", "good afternoon", "good evening",
+    "how are you", "hello how are you", "hi how are you", "are you there", "can you hear me",
+    "thanks", "thank you", "thank you so much", "thanks a lot", "ok", "okay", "yes", "no",
+    "bye", "goodbye", "see you", "see you later",
+    "namaste", "namaskar", "dhanyavad", "shukriya", "theek hai", "haan",
+    "नमस्ते", "नमस्कार", "धन्यवाद", "शुक्रिया", "ठीक है", "हाँ", "आप कैसे हैं",
+    "vanakkam", "nandri", "sari",
+    "வணக்கம்", "நன்றி", "சரி", "ஆம்", "எப்படி இருக்கிறீர்கள்",
+]
+# Optional file of more generic utterances, one per line
+REPLY_CACHE_PHRASES_PATH = os.getenv("REPLY_CACHE_PHRASES_PATH", "")
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s\u0900-\u097F\u0B80-\u0BFF]")
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry"""
+    def __init__(self, max_entries: int = REPLY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: int):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Redis-backed store shared by all workers (eviction per the server's maxmemory policy)"""
+    def __init__(self, url: str = REDIS_URL, prefix: str = "reply_cache:"):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.5)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl_seconds: int):
+        self.client.setex(self.prefix + key, ttl_seconds, value)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+def _create_backend(name: str):
+    if name == "redis":
+        try:
+            return RedisBackend()
+        except Exception as e:
+            print(f"⚠️ Redis reply cache unavailable, using in-memory cache: {e}")
+    return MemoryBackend()
+
+
+def emotion_bucket(emotion_snapshot: Optional[Dict[str, float]]) -> str:
+    """Coarse emotion state, matching the thresholds of LLMHandler._format_emotion_context"""
+    if not emotion_snapshot:
+        return "none"
+    anxious = emotion_snapshot.get('anxious', 0)
+    stressed = emotion_snapshot.get('stressed', 0)
+    if anxious + stressed > 0.6:
+        return "anxious"
+    if emotion_snapshot.get('happy', 0) > 0.7 and emotion_snapshot.get('neutral', 0) < 0.3:
+        return "positive"
+    if stressed > 0.5:
+        return "stressed"
+    return "neutral"
+
+
+def normalize_utterance(text: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a transcript"""
+    return " ".join(_PUNCTUATION_RE.sub(" ", normalize_text(text)).split())
+
+
+class ReplyCache:
+    """
+    Reply cache keyed on (agent, language, normalized text, recent context, emotion bucket)
+    Lookups and stores are only for consenting sessions whose utterances are
+    all generic (see eligible); callers also pick the reply types to store.
+    Per-agent hit ratio is tracked here.
+    """
+    def __init__(self, backend=None, ttl_seconds: int = REPLY_CACHE_TTL_SECONDS, enabled: bool = REPLY_CACHE_ENABLED):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend if backend is not None else (_create_backend(REPLY_CACHE_BACKEND) if enabled else None)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "stores": 0, "errors": 0})
+        self.generic_utterances = {normalize_utterance(text) for text in _GENERIC_UTTERANCES}
+        if REPLY_CACHE_PHRASES_PATH:
+            try:
+                with open(REPLY_CACHE_PHRASES_PATH, "r", encoding="utf-8") as fh:
+                    self.allow_utterances(line for line in fh if line.strip())
+            except OSError as e:
+                print(f"⚠️ Could not read reply cache phrases {REPLY_CACHE_PHRASES_PATH}: {e}")
+        self._lock = threading.Lock()
+
+    def allow_utterances(self, utterances):
+        """Add utterances that carry no user-specific detail (e.g. demo transcripts)"""
+        self.generic_utterances.update(normalize_utterance(text) for text in utterances)
+
+    def is_generic(self, text: str) -> bool:
+        return normalize_utterance(text) in self.generic_utterances
+
+    def eligible(self, consent_store: bool, generic_session: bool) -> bool:
+        """
+        Whether a turn may read or write the cache: storage consent, and every
+        utterance of the session so far generic. Without consent a session
+        neither contributes replies nor receives replies made for others.
+        """
+        return bool(self.enabled and consent_store and generic_session)
+
+    def make_key(
+        self,
+        agent_id: str,
+        lang: str,
+        user_text: str,
+        recent_turns: Optional[List[Dict[str, str]]] = None,
+        emotion_snapshot: Optional[Dict[str, float]] = None
+    ) -> str:
+        context = [
+            [normalize_utterance(turn["user"]), turn["assistant"]]
+            for turn in (recent_turns or [])[-REPLY_CACHE_CONTEXT_TURNS:]
+        ] if REPLY_CACHE_CONTEXT_TURNS > 0 else []
+        material = json.dumps(
+            [agent_id, lang, normalize_utterance(user_text), context, emotion_bucket(emotion_snapshot)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _count(self, agent_id: str, field: str):
+        with self._lock:
+            self.stats[agent_id][field] += 1
+
+    def get(self, agent_id: str, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"⚠️ Reply cache lookup failed: {e}")
+            self._count(agent_id, "errors")
+            return None
+        self._count(agent_id, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, agent_id: str, key: str, reply: str):
+        if not self.enabled or not reply:
+            return
+        try:
+            self.backend.set(key, reply, self.ttl_seconds)
+            self._count(agent_id, "stores")
+        except Exception as e:
+            print(f"⚠️ Reply cache store failed: {e}")
+            self._count(agent_id, "errors")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            agents = {agent: dict(counts) for agent, counts in self.stats.items()}
+        for counts in agents.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_ratio"] = round(counts["hits"] / lookups, 3) if lookups else 0.0
+        hits = sum(c["hits"] for c in agents.values())
+        lookups = hits + sum(c["misses"] for c in agents.values())
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "entries": self.backend.size() if self.backend else 0,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "agents": agents
+        }
+
+
+# Global cache shared by all sessions in this worker
+reply_cache = ReplyCache()
@@ -2,53 +2,158 @@
 Risk classification module for AI Psychologist service
 Analyzes user text for safety concerns using Gemini
 """
-import google.generativeai as genai
 from google.generativeai.types import GenerationConfig
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple
+import threading
 import json
-import re
 import os
 from dotenv import load_dotenv
 
+try:
+    from core.gemini_config import configure_gemini
+    from core.model_router import model_router
+    from core.model_catalog import MODEL_CHAINS
+    from core.rate_limiter import PRIORITY_RISK, RateLimitExceeded
+    from core.risk_lexicon import RISK_REASONS, match_risk_patterns
+    from core.text_classifier import load_classifier
+    from core.turn_budget import fast_model_order
+except ImportError:
+    from .gemini_config import configure_gemini
+    from .model_router import model_router
+    from .model_catalog import MODEL_CHAINS
+    from .rate_limiter import PRIORITY_RISK, RateLimitExceeded
+    from .risk_lexicon import RISK_REASONS, match_risk_patterns
+    from .text_classifier import load_classifier
+    from .turn_budget import fast_model_order
+
 load_dotenv()
 
 # Configure Gemini API
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+configure_gemini()
+
+# Risk models in order of preference (GEMINI_RISK_MODELS, default GEMINI_MODELS)
+RISK_MODELS = MODEL_CHAINS["risk"]
+
+# Optional local risk model (.npz from scripts/train_text_classifier.py, labels
+# none/low/medium/high). Only its uncertain band goes to Gemini.
+RISK_CLASSIFIER_PATH = os.getenv("RISK_CLASSIFIER_PATH", "")
+# P(none) + P(low) at or above this resolves the turn locally as safe
+RISK_LOCAL_SAFE_THRESHOLD = float(os.getenv("RISK_LOCAL_SAFE_THRESHOLD", "0.9"))
+# P(medium) + P(high) at or above this escalates without waiting for Gemini
+RISK_LOCAL_ESCALATE_THRESHOLD = float(os.getenv("RISK_LOCAL_ESCALATE_THRESHOLD", "0.8"))
+
+# Ask Gemini for schema-constrained JSON (response_mime_type + response_schema)
+RISK_STRUCTURED_OUTPUT = os.getenv("RISK_STRUCTURED_OUTPUT", "true").lower() == "true"
+# Output cap for a verdict: the JSON object with a one-line reason
+RISK_MAX_OUTPUT_TOKENS = int(os.getenv("RISK_MAX_OUTPUT_TOKENS", "80"))
+
+_LEVEL_ORDER = {"none": 0, "low": 1, "medium": 2, "high": 3}
+
+RISK_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "risk_level": {"type": "string", "format": "enum", "enum": list(_LEVEL_ORDER)},
+        "reason": {"type": "string"},
+        "urgent": {"type": "boolean"}
+    },
+    "required": ["risk_level", "reason", "urgent"]
+}
 
 class RiskClassifier:
     def __init__(self):
         self.model_name = "gemini-1.5-flash"
+        structured = {
+            "response_mime_type": "application/json",
+            "response_schema": RISK_RESPONSE_SCHEMA
+        } if RISK_STRUCTURED_OUTPUT else {}
         self.generation_config = GenerationConfig(
             temperature=0.1,  # Very low for consistent risk classification
-            max_output_tokens=150,
+            max_output_tokens=RISK_MAX_OUTPUT_TOKENS,
             top_p=0.9,
-            top_k=20
+            top_k=20,
+            **structured
         )
-
-    def classify(self, text: str) -> Dict[str, Any]:
+        self.local_model = load_classifier(RISK_CLASSIFIER_PATH)
+        self.safe_threshold = RISK_LOCAL_SAFE_THRESHOLD
+        self.escalate_threshold = RISK_LOCAL_ESCALATE_THRESHOLD
+        # degraded: Gemini was wanted but the pattern verdict stood in (shed, failed, unreadable)
+        self.stats = {"evaluated": 0, "pattern": 0, "local_safe": 0, "local_escalated": 0, "llm": 0, "degraded": 0}
+        # Gemini replies read, the ones that were not a valid verdict, and how those ended
+        self.parse_stats = {"responses": 0, "failures": 0, "recovered": 0, "fallbacks": 0, "output_tokens": 0}
+        self._lock = threading.Lock()
+
+    def classify(
+        self, text: str, pattern_only: bool = False, session_context: Optional[str] = None,
+        priority: int = PRIORITY_RISK
+    ) -> Dict[str, Any]:
         """
         Classify risk level of user input
+        pattern_only skips the Gemini call (used when the turn's latency budget is tight)
+        session_context summarizes the session's earlier risk levels (see risk_tracker)
+        priority is the rate-limiter class of the Gemini call (batch audits use PRIORITY_AUDIT)
 
         Returns dictionary with:
         - risk_level: "none", "low", "medium", "high"
         - reason: explanation for classification
         - urgent: boolean indicating if immediate action needed
+        - source: "pattern", "classifier" or "llm"
+        - degraded / degraded_reason: set when Gemini was wanted but the
+          pattern verdict stands in ("shed", "llm_failed", "unparseable", "error")
         """
         try:
-            # First do a quick pattern match for obvious risks
-            pattern_result = self._quick_pattern_check(text)
-            if pattern_result['risk_level'] == 'high':
-                return pattern_result
+            pattern_result, resolved = self.screen(text)
+            if resolved:
+                return resolved
+            if pattern_only:
+                return self._resolved(pattern_result, "pattern")
+            return self.classify_llm(text, pattern_result, session_context, priority)
 
-            # Use Gemini for classification
+        except Exception as e:
+            print(f"Error in risk classification: {e}")
+            # Fallback to pattern matching
+            return self._degraded(self._quick_pattern_check(text), "error")
+
+    def screen(
+        self, text: str, probabilities: Optional[Dict[str, float]] = None
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Local stages: (pattern verdict, final verdict or None if Gemini is needed)
+        probabilities may carry the local model's scores when already computed
+        for a whole batch.
+        """
+        # First do a quick pattern match for obvious risks
+        pattern_result = self._quick_pattern_check(text)
+        if pattern_result['risk_level'] == 'high':
+            return pattern_result, self._resolved(pattern_result, "pattern")
+
+        # Then the local model: clearly safe or clearly dangerous text skips Gemini
+        return pattern_result, self._local_check(text, pattern_result, probabilities)
+
+    def screen_many(self, texts: List[str]) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """screen() for a batch, scoring the local model over all texts at once"""
+        probabilities = self.local_model.predict_proba_many(texts) if self.local_model else [None] * len(texts)
+        return [self.screen(text, p) for text, p in zip(texts, probabilities)]
+
+    def classify_llm(
+        self, text: str, pattern_result: Dict[str, Any], session_context: Optional[str] = None,
+        priority: int = PRIORITY_RISK
+    ) -> Dict[str, Any]:
+        """
+        Gemini stage; falls back to the pattern verdict when no model answers
+        A reply that is not a valid verdict is retried once on a faster model,
+        then falls back to the pattern verdict (never to "none").
+        """
+        try:
+            context = f"\n{session_context} Weigh the message in that context.\n" if session_context else ""
             prompt = f"""Analyze the following user message for mental health risk.
 Return only JSON in this exact format:
 {{
 "risk_level": "none|low|medium|high",
-"reason": "brief explanation",
+"reason": "brief explanation, at most 12 words",
 "urgent": true|false
 }}
 
+{context}
 Message: "{text}"
 
 Risk levels:
@@ -57,118 +162,169 @@ Risk levels:
 - medium: significant distress, possible self-harm ideation
 - high: immediate danger, active self-harm intent, severe crisis"""
 
-            # List of models to try for risk classification
-            models_to_try = ["gemini-2.0-flash", "gemini-2.0-flash-lite", "gemini-1.5-flash", "gemini-pro"]
-            
-            response = None
-            
-            for model_name in models_to_try:
-                try:
-                    model = genai.GenerativeModel(model_name)
-                    response = model.generate_content(prompt, generation_config=self.generation_config)
-                    if response:
-                        break
-                except Exception as e:
-                    print(f"⚠️ Risk model {model_name} failed: {e}")
-                    continue
-            
+            response, model_name, error = model_router.generate_content(
+                prompt,
+                generation_config=self.generation_config,
+                models=RISK_MODELS,
+                label="Risk",
+                priority=priority
+            )
+
             if not response:
+                if isinstance(error, RateLimitExceeded):
+                    print("⚠️ Risk call shed by the rate limiter, falling back to pattern matching")
+                    return self._degraded(pattern_result, "shed")
                 print("❌ All risk models failed, falling back to pattern matching")
-                return self._quick_pattern_check(text)
-
-            # Parse JSON response
-            result = self._parse_json_response(response.text)
-            return result if result else {"risk_level": "none", "reason": "could not parse response", "urgent": False}
+                return self._degraded(pattern_result, "llm_failed")
+
+            result = self._read_verdict(response)
+            if result is None:
+                retry_models = [m for m in fast_model_order(RISK_MODELS) if m != model_name]
+                print(f"⚠️ Unparseable risk verdict from {model_name}, "
+                      f"retrying on {retry_models[0] if retry_models else 'no other model'}")
+                response, _, _ = model_router.generate_content(
+                    prompt,
+                    generation_config=self.generation_config,
+                    models=retry_models,
+                    label="Risk retry",
+                    priority=priority
+                ) if retry_models else (None, None, None)
+                result = self._read_verdict(response) if response else None
+                self._count_parse("recovered" if result else "fallbacks")
+
+            if result is None:
+                print("❌ No readable risk verdict, falling back to pattern matching")
+                return self._degraded(pattern_result, "unparseable")
+            return self._resolved(result, "llm")
 
         except Exception as e:
             print(f"Error in risk classification: {e}")
             # Fallback to pattern matching
-            return self._quick_pattern_check(text)
+            return self._degraded(pattern_result, "error")
 
-    def _quick_pattern_check(self, text: str) -> Dict[str, Any]:
-        """Quick pattern-based risk detection"""
-        text_lower = text.lower()
-
-        # High risk keywords (immediate attention needed)
-        high_risk_patterns = [
-            r'i want to (kill|harm) myself',
-            r'i\'m going to (end|kill) it',
-            r'i can\'t take it anymore',
-            r'i want to die',
-            r'i\'m suicidal',
-            r'i\'m having thoughts of suicide'
-        ]
-
-        for pattern in high_risk_patterns:
-            if re.search(pattern, text_lower):
-                return {
-                    "risk_level": "high",
-                    "reason": "active suicidal ideation detected",
-                    "urgent": True
-                }
-
-        # Medium risk keywords
-        medium_risk_patterns = [
-            r'i feel like harming myself',
-            r'intent to harm myself',
-            r'thoughts of (hurting|harming) myself',
-            r'life isn\'t worth living',
-            r'i wish i were dead',
-            r'dangerous thoughts'
-        ]
-
-        for pattern in medium_risk_patterns:
-            if re.search(pattern, text_lower):
-                return {
-                    "risk_level": "medium",
-                    "reason": "passive suicidal ideation or self-harm concerns",
-                    "urgent": False
-                }
-
-        # Low risk indicators (general distress)
-        low_risk_patterns = [
-            r'i feel (depressed|sad|hopeless|worthless| useless)',
-            r'i\'m struggling',
-            r'i need help',
-            r'i\'m (worried|anxious) about',
-            r'i can\'t cope'
-        ]
-
-        for pattern in low_risk_patterns:
-            if re.search(pattern, text_lower):
-                return {
-                    "risk_level": "low",
-                    "reason": "general distress or emotional pain",
+    def _read_verdict(self, response: Any) -> Optional[Dict[str, Any]]:
+        """Verdict from a Gemini response, or None (counted as a parse failure)"""
+        try:
+            text = response.text
+        except Exception:
+            # Blocked or empty candidate: no text to parse
+            text = ""
+        usage = getattr(response, "usage_metadata", None)
+        result = self._parse_json_response(text)
+        with self._lock:
+            self.parse_stats["responses"] += 1
+            self.parse_stats["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+            if result is None:
+                self.parse_stats["failures"] += 1
+        return result
+
+    def _count_parse(self, outcome: str):
+        with self._lock:
+            self.parse_stats[outcome] += 1
+
+    def _local_check(
+        self, text: str, pattern_result: Dict[str, Any], probabilities: Optional[Dict[str, float]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Local model verdict outside its uncertain band, or None to ask Gemini
+        A pattern hit is never overruled downward: safe only resolves when the
+        patterns found at most low risk.
+        """
+        if not self.local_model:
+            return None
+        probabilities = probabilities or self.local_model.predict_proba(text)
+        safe = probabilities.get("none", 0.0) + probabilities.get("low", 0.0)
+        danger = probabilities.get("medium", 0.0) + probabilities.get("high", 0.0)
+        pattern_level = pattern_result["risk_level"]
+
+        if danger >= self.escalate_threshold:
+            level = "high" if probabilities.get("high", 0.0) >= probabilities.get("medium", 0.0) else "medium"
+            if _LEVEL_ORDER[pattern_level] > _LEVEL_ORDER[level]:
+                level = pattern_level
+            print(f"🚨 Local risk model escalated to {level} ({danger:.2f})")
+            result = {"risk_level": level, "reason": RISK_REASONS[level], "urgent": level == "high"}
+            source, outcome = "classifier", "local_escalated"
+        elif safe >= self.safe_threshold and _LEVEL_ORDER[pattern_level] <= _LEVEL_ORDER["low"]:
+            outcome = "local_safe"
+            if pattern_level == "low":
+                result, source = pattern_result, "pattern"
+            else:
+                level = "low" if probabilities.get("low", 0.0) > probabilities.get("none", 0.0) else "none"
+                result = {
+                    "risk_level": level,
+                    "reason": RISK_REASONS.get(level, "no risk indicators detected"),
                     "urgent": False
                 }
+                source = "classifier"
+        else:
+            return None
+
+        result = {**result, "local_probabilities": {k: round(v, 3) for k, v in probabilities.items()}}
+        return self._resolved(result, source, outcome)
+
+    def _resolved(self, result: Dict[str, Any], source: str, outcome: Optional[str] = None) -> Dict[str, Any]:
+        """Tag a verdict with its source and count it toward the local-share metric"""
+        with self._lock:
+            self.stats["evaluated"] += 1
+            self.stats[outcome or source] += 1
+        return {**result, "source": source}
+
+    def _degraded(self, pattern_result: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        """Pattern verdict standing in for a Gemini check that did not happen"""
+        with self._lock:
+            self.stats["degraded"] += 1
+        return {**self._resolved(pattern_result, "pattern"), "degraded": True, "degraded_reason": reason}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        resolved_locally = stats["evaluated"] - stats["llm"]
+        stats["local_share"] = round(resolved_locally / stats["evaluated"], 3) if stats["evaluated"] else 0.0
+        stats["classifier"] = self.local_model is not None
+        stats["safe_threshold"] = self.safe_threshold
+        stats["escalate_threshold"] = self.escalate_threshold
+        with self._lock:
+            parse = dict(self.parse_stats)
+        responses = parse["responses"]
+        parse["failure_rate"] = round(parse["failures"] / responses, 3) if responses else 0.0
+        parse["output_tokens_mean"] = round(parse["output_tokens"] / responses, 1) if responses else 0.0
+        stats["structured_output"] = RISK_STRUCTURED_OUTPUT
+        stats["parse"] = parse
+        return stats
 
-        return {"risk_level": "none", "reason": "no risk indicators detected", "urgent": False}
+    def _quick_pattern_check(self, text: str) -> Dict[str, Any]:
+        """Quick pattern-based risk detection (compiled multilingual lexicon, with matched spans)"""
+        return match_risk_patterns(text)
 
     def _parse_json_response(self, text: str) -> Optional[Dict[str, Any]]:
-        """Parse JSON response from Gemini"""
+        """
+        Parse JSON response from Gemini
+        Structured output is plain JSON; free-text replies may wrap it in
+        markdown, so the outermost object is tried next. Only the schema
+        fields are kept, and anything without a valid risk_level is None.
+        """
         try:
+            data = json.loads(text)
+        except (json.JSONDecodeError, TypeError):
             # Extract JSON from response (might have markdown formatting)
-            json_start = text.find('{')
-            json_end = text.rfind('}') + 1
-
-            if json_start != -1 and json_end > json_start:
-                json_str = text[json_start:json_end]
-                data = json.loads(json_str)
-
-                # Validate required fields
-                if 'risk_level' in data and data['risk_level'] in ['none', 'low', 'medium', 'high']:
-                    # Ensure has reason and urgent fields
-                    if 'reason' not in data:
-                        data['reason'] = "classified by AI"
-                    if 'urgent' not in data:
-                        data['urgent'] = data['risk_level'] == 'high'
-
-                    return data
-
-        except json.JSONDecodeError:
-            pass
-
-        return None
+            json_start = text.find('{') if text else -1
+            json_end = text.rfind('}') + 1 if text else 0
+            if json_start == -1 or json_end <= json_start:
+                return None
+            try:
+                data = json.loads(text[json_start:json_end])
+            except json.JSONDecodeError:
+                return None
+
+        if not isinstance(data, dict) or data.get('risk_level') not in _LEVEL_ORDER:
+            return None
+        level = data['risk_level']
+        urgent = data.get('urgent')
+        return {
+            "risk_level": level,
+            "reason": str(data.get('reason') or "classified by AI"),
+            "urgent": urgent if isinstance(urgent, bool) else level == 'high'
+        }
 
 class SafetyResponseGenerator:
     def __init__(self):
@@ -224,9 +380,21 @@ class SafetyResponseGenerator:
 _classifier = RiskClassifier()
 _safety_generator = SafetyResponseGenerator()
 
-def classify_risk(text: str) -> Dict[str, Any]:
+def classify_risk(text: str, pattern_only: bool = False, session_context: Optional[str] = None) -> Dict[str, Any]:
     """Convenience function to classify risk"""
-    return _classifier.classify(text)
+    return _classifier.classify(text, pattern_only=pattern_only, session_context=session_context)
+
+def screen_risk_many(texts: List[str]) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """Convenience function: pattern and local-model stages for a batch"""
+    return _classifier.screen_many(texts)
+
+def classify_risk_llm(text: str, pattern_result: Dict[str, Any], priority: int = PRIORITY_RISK) -> Dict[str, Any]:
+    """Convenience function: Gemini stage for a text the local stages left undecided"""
+    return _classifier.classify_llm(text, pattern_result, priority=priority)
+
+def get_risk_stats() -> Dict[str, Any]:
+    """Convenience function for the share of risk checks resolved without Gemini"""
+    return _classifier.get_stats()
 
 def generate_safety_reply(risk_level: str, lang: str = "en-IN") -> str:
     """Convenience function to generate safety reply"""
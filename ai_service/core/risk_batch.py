@@ -0,0 +1,133 @@
+"""
+Risk batch module for AI Psychologist service
+Batch risk classification for transcript audits: patterns and the local model
+run over the whole batch first, then the remaining texts go to Gemini with
+bounded concurrency at audit priority; results are yielded as they complete
+"""
+from typing import Dict, List, Any, AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+import asyncio
+import json
+import time
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.risk import classify_risk_llm, screen_risk_many
+    from core.rate_limiter import PRIORITY_AUDIT
+except ImportError:
+    from .risk import classify_risk_llm, screen_risk_many
+    from .rate_limiter import PRIORITY_AUDIT
+
+load_dotenv()
+
+# Concurrent Gemini risk calls per batch (the default, and the most a request may ask for)
+RISK_BATCH_CONCURRENCY = int(os.getenv("RISK_BATCH_CONCURRENCY", "8"))
+RISK_BATCH_MAX_ITEMS = int(os.getenv("RISK_BATCH_MAX_ITEMS", "20000"))
+
+
+def parse_batch(body: str) -> List[Dict[str, Any]]:
+    """
+    Items from a JSON array, a {"texts": [...]} object or NDJSON
+    Each entry is a string or an object with "text" and an optional "id";
+    raises ValueError for anything else.
+    """
+    body = body.strip()
+    if not body:
+        return []
+    try:
+        data = json.loads(body)
+        entries = data.get("texts") if isinstance(data, dict) and "texts" in data else data
+        if not isinstance(entries, list):
+            entries = [entries]
+    except json.JSONDecodeError:
+        entries = []
+        for number, line in enumerate(body.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {number}: {e}")
+
+    items = []
+    for number, entry in enumerate(entries, 1):
+        if isinstance(entry, str):
+            items.append({"id": None, "text": entry})
+        elif isinstance(entry, dict) and isinstance(entry.get("text"), str):
+            items.append({"id": entry.get("id"), "text": entry["text"]})
+        else:
+            raise ValueError(f"item {number}: expected a string or an object with \"text\"")
+    return items
+
+
+async def classify_batch(
+    items: List[Dict[str, Any]], concurrency: int = RISK_BATCH_CONCURRENCY, priority: int = PRIORITY_AUDIT
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield {"index", "id", **verdict} per item as it completes, then {"summary": ...}
+    Items whose Gemini call was shed or failed carry the pattern verdict with
+    degraded set; the summary counts them so an audit never passes silently.
+    Gemini calls run on a pool of their own, so an audit waiting on the rate
+    limiter never holds the executor threads live turns use.
+    """
+    loop = asyncio.get_event_loop()
+    started = time.perf_counter()
+    texts = [item["text"] for item in items]
+    levels: Counter = Counter()
+    sources: Counter = Counter()
+    degraded: Counter = Counter()
+
+    def record(index: int, verdict: Dict[str, Any]) -> Dict[str, Any]:
+        levels[verdict["risk_level"]] += 1
+        sources[verdict.get("source", "unknown")] += 1
+        if verdict.get("degraded"):
+            degraded[verdict.get("degraded_reason", "unknown")] += 1
+        return {"index": index, "id": items[index].get("id"), **verdict}
+
+    screened = await loop.run_in_executor(None, screen_risk_many, texts)
+    pending = []
+    for index, (_, verdict) in enumerate(screened):
+        if verdict:
+            yield record(index, verdict)
+        else:
+            pending.append(index)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="risk-batch")
+
+    async def classify_one(index: int):
+        verdict = await loop.run_in_executor(
+            executor, lambda: classify_risk_llm(texts[index], screened[index][0], priority=priority)
+        )
+        return index, verdict
+
+    tasks = [asyncio.ensure_future(classify_one(index)) for index in pending]
+    try:
+        for done in asyncio.as_completed(tasks):
+            index, verdict = await done
+            yield record(index, verdict)
+    finally:
+        # A client that disconnects mid-stream cancels the calls not yet started
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"🗂️ Risk batch: {len(items)} texts, {len(pending)} Gemini calls in {elapsed:.1f}s")
+    if degraded:
+        print(f"⚠️ Risk batch: {sum(degraded.values())} verdict(s) fell back to patterns ({dict(degraded)})")
+    yield {
+        "summary": {
+            "items": len(items),
+            "llm_calls": len(pending),
+            "local_share": round(1 - len(pending) / len(items), 3) if items else 0.0,
+            "by_level": dict(levels),
+            "by_source": dict(sources),
+            # Items that needed Gemini but got the pattern verdict, and how many of those were shed
+            "degraded": sum(degraded.values()),
+            "shed": degraded["shed"],
+            "degraded_by_reason": dict(degraded),
+            "elapsed_s": round(elapsed, 3)
+        }
+    }
@@ -0,0 +1,243 @@
+"""
+Risk lexicon module for AI Psychologist service
+Precompiled multilingual risk-pattern matcher: one alternation per risk level
+over Unicode-normalized text, covering English, Hindi, Tamil and romanized
+Hinglish/Tanglish, with matched spans returned for audit
+"""
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, asdict
+import re
+
+try:
+    from core.text_classifier import normalize_text
+except ImportError:
+    from .text_classifier import normalize_text
+
+RISK_LEVELS = ["high", "medium", "low"]
+
+RISK_REASONS = {
+    "high": "active suicidal ideation detected",
+    "medium": "passive suicidal ideation or self-harm concerns",
+    "low": "general distress or emotional pain"
+}
+
+# First-person risk statements by level and script. Patterns are written
+# against normalize_risk_text() output: lowercase, straight apostrophes, no
+# nukta, and anusvara for chandrabindu. Latin patterns use \b word
+# boundaries; Devanagari and Tamil vowel signs are not \w, so those patterns
+# match on substrings.
+RISK_PATTERNS: Dict[str, Dict[str, List[str]]] = {
+    "high": {
+        "en": [
+            r"\bi (?:want|wanna|am going|'?m going|plan|intend) to (?:kill|harm|hurt) myself\b",
+            r"\bi(?:'?m| am) (?:going|gonna) (?:to )?(?:end|kill) (?:it|it all|my life|myself)\b",
+            r"\bi want to (?:die|end my life|end it all)\b",
+            r"\bi(?:'?m| am) suicidal\b",
+            r"\bi(?:'?m| am| have been) having thoughts of (?:suicide|killing myself)\b",
+            r"\bi can(?:'?t|not) take it anymore\b",
+            r"\bi(?:'?m| am) going to (?:jump off|hang myself|overdose)\b",
+            r"\b(?:wrote|writing|written) (?:a |my )?suicide note\b"
+        ],
+        "hi": [
+            r"(?:खुद|अपने आप) को (?:मार|खत्म कर) (?:दूंगा|दूंगी|डालूंगा|डालूंगी|लूंगा|लूंगी|देना चाहता|देना चाहती|डालना चाहता|डालना चाहती)",
+            r"मरना चाहता|मरना चाहती|मर जाना चाहता|मर जाना चाहती|मरना चाहिए|मर जाना चाहिए",
+            r"आत्महत्या (?:करना चाहता|करना चाहती|कर लूंगा|कर लूंगी|करने वाला|करने वाली)",
+            r"अब (?:और )?(?:बर्दाश्त|सहन) नहीं (?:होता|हो रहा|कर सकता|कर सकती)"
+        ],
+        "hi-Latn": [
+            r"\bmar(?:na| ?ja+na) cha+h?(?:t[aie]|i?y?e)\b",
+            r"\bkhud ?ko (?:maa?r|khatam|khatm|khtm) (?:kar )?(?:dunga|dungi|da+lunga|da+lungi|lunga|lungi|dena cha+h?t[ai])\b",
+            r"\b(?:suicide|aa?tmahatya|khudkh?ushi) (?:karna cha+h?t[ai]|kar lunga|kar lungi|karunga|karungi)\b",
+            r"\bab (?:aur )?(?:bardasht|bardash|sahan) (?:nahi?n?|nhi|nai) (?:hota|ho raha|kar sakta|kar sakti)\b"
+        ],
+        "ta": [
+            r"தற்கொலை செய்(?:து)? ?(?:கொள்ள)?ப்? ?(?:போகிறேன்|போறேன்|வேண்டும்|விரும்புகிறேன்)",
+            r"சாகப்? ?(?:போகிறேன்|போறேன்|வேண்டும்|விரும்புகிறேன்|தோணுது|தோன்றுகிறது)",
+            r"என்னை (?:நானே )?கொல்லப்? ?(?:போகிறேன்|போறேன்|வேண்டும்|விரும்புகிறேன்)",
+            r"இனி (?:தாங்க|பொறுக்க) (?:முடியாது|முடியலை|முடியல)"
+        ],
+        "ta-Latn": [
+            r"\bsaa?ga ?(?:poren|pogiren|venum|thonuthu|thonudhu)\b",
+            r"\bsaa?ganum\b",
+            r"\bseth(?:h)?u ?po(?:i|y)?(?:duven|ren|ven)\b",
+            r"\b(?:tha?r ?kolai|thatkolai|suicide) (?:panna ?poren|pannik?ka ?poren|pannanum|pannik?kanum)\b",
+            r"\bennaye? (?:naane )?kolla ?(?:poren|venum)\b",
+            r"\ba?ini (?:thaanga|thanga|porukka) mudiyala\b"
+        ]
+    },
+    "medium": {
+        "en": [
+            r"\bi feel like (?:harming|hurting|cutting) myself\b",
+            r"\bintent to harm myself\b",
+            r"\bthoughts (?:of|about) (?:hurting|harming|cutting) myself\b",
+            r"\blife (?:isn'?t|is not) worth living\b",
+            r"\bi wish i (?:were|was) dead\b",
+            r"\bdangerous thoughts\b",
+            r"\bi (?:don'?t|do not) want to (?:live|be alive|exist)\b",
+            r"\b(?:everyone|everybody|they) would be better off without me\b",
+            r"\bi(?:'?ve| have) been (?:cutting|hurting|harming) myself\b",
+            r"\bno (?:reason|point) (?:to live|in living)\b"
+        ],
+        "hi": [
+            r"जीना नहीं? (?:चाहता|चाहती|चाहते|चाहिए|है)|नहीं? जीना (?:चाहता|चाहती|चाहते|चाहिए|है)",
+            r"(?:जिंदगी|जीवन) (?:में )?(?:कोई मतलब नहीं|का कोई मतलब नहीं|बेकार है|जीने लायक नहीं)",
+            r"काश मैं मर (?:जाता|जाती|गया होता|गई होती)",
+            r"(?:खुद|अपने आप) को (?:चोट|नुकसान) (?:पहुंचा|पहुंचाना|पहुंचाने)",
+            r"मेरे बिना (?:सब|सबका) (?:बेहतर|अच्छा)"
+        ],
+        "hi-Latn": [
+            r"\b(?:jee?na|jina) (?:hi )?(?:nahi?n?|nhi|nai)(?: cha+h?(?:t[aie]|i?y?e)| hai| h)?\b",
+            r"\b(?:nahi?n?|nhi|nai) (?:jee?na|jina)(?: cha+h?(?:t[aie]|i?y?e)| hai| h)?\b",
+            r"\b(?:jee?ne|jine) ka (?:koi )?(?:matlab|mann|man) (?:nahi?n?|nhi|nai)\b",
+            r"\bkaa?sh (?:main? |mein )?mar (?:ja+ta|ja+ti)\b",
+            r"\bkhud ?ko (?:chot|hurt|nuksa+n) (?:pahuncha|pohcha|karna|karne)",
+            r"\bmere bina sab (?:better|behtar|accha|achha)\b"
+        ],
+        "ta": [
+            r"வாழ (?:விருப்பமில்லை|விருப்பம் இல்லை|பிடிக்கவில்லை|ஆசை இல்லை)",
+            r"(?:செத்து|இறந்து) ?போயிருக்கலாம்",
+            r"என்னை (?:நானே )?காயப்படுத்த",
+            r"வாழ்க்கைக்கு (?:அர்த்தம்|அர்த்தமே) இல்லை"
+        ],
+        "ta-Latn": [
+            r"\bvaa?zha? (?:pidikkala|pudikkala|virupam illa|aasai illa|venam)\b",
+            r"\bennaye? (?:naane )?(?:kaaya?p?paduth|hurt pann)\w*",
+            r"\bseth(?:h)?u ?poyirukkalam\b",
+            r"\bseth(?:h)?u(?:d|t)alaa?m\b"
+        ]
+    },
+    "low": {
+        "en": [
+            r"\bi feel (?:so |really |very )?(?:depressed|sad|hopeless|worthless|useless|empty|lonely)\b",
+            r"\bi(?:'?m| am) (?:so |really )?struggling\b",
+            r"\bi need help\b",
+            r"\bi(?:'?m| am) (?:so |really |very )?(?:worried|anxious|stressed) about\b",
+            r"\bi can(?:'?t|not) cope\b"
+        ],
+        "hi": [
+            r"(?:बहुत )?(?:उदास|निराश|अकेला|अकेली|परेशान|तनाव में) (?:हूं|महसूस)",
+            r"मुझे मदद (?:चाहिए|की जरूरत)",
+            r"(?:संभाल|झेल) नहीं पा (?:रहा|रही)"
+        ],
+        "hi-Latn": [
+            r"\b(?:bahut |bohot |bht )?(?:udaa?s|nirash|akel[ai]|pa?reshaa?n|tension mein) (?:hu|hoo?n|hun|feel)\b",
+            r"\bmujhe (?:help|madad) cha+h?i?y?e\b",
+            r"\b(?:sambhal|handle) nahi?n? (?:ho raha|kar pa raha|kar pa rahi|pa raha|pa rahi)\b"
+        ],
+        "ta": [
+            r"(?:சோகமா|கவலையா|தனிமையா|மனச்சோர்வா) (?:இருக்கு|இருக்கிறது|இருக்கேன்|உணர்கிறேன்)",
+            r"எனக்கு உதவி (?:வேண்டும்|தேவை)",
+            r"சமாளிக்க முடியவில்லை|சமாளிக்க முடியல"
+        ],
+        "ta-Latn": [
+            r"\b(?:romba )?(?:sogama|kavalaiya|thanimaiya|depressed ah?|stress ah?) (?:irukku|iruku|irukken|feel pann?ren)\b",
+            r"\benakku (?:help|udhavi|uthavi) (?:venum|vendum|thevai)\b",
+            r"\bsamaa?likka mudiyala\b"
+        ]
+    }
+}
+
+# Spelling variants folded before matching: curly apostrophes, zero-width
+# joiners, the nukta (ज़ = ज) and chandrabindu (ँ = ं)
+_FOLD = str.maketrans({
+    "\u2019": "'", "\u2018": "'", "\u02bc": "'",
+    "\u200c": None, "\u200d": None,
+    "\u093c": None,
+    "\u0901": "\u0902"
+})
+
+
+_LANG_SCRIPTS = {"hi": "devanagari", "ta": "tamil"}
+_SCRIPT_RES = {
+    "latin": re.compile(r"[a-z]"),
+    "devanagari": re.compile(r"[\u0900-\u097f]"),
+    "tamil": re.compile(r"[\u0b80-\u0bff]")
+}
+
+
+def normalize_risk_text(text: str) -> str:
+    """NFKC, lowercase, collapsed whitespace, folded script variants"""
+    return normalize_text(text).translate(_FOLD)
+
+
+@dataclass
+class LexiconMatch:
+    """One matched risk phrase; span indexes the normalized text"""
+    level: str
+    lang: str
+    pattern: int
+    text: str
+    span: List[int]
+
+
+class RiskLexicon:
+    """
+    One compiled alternation per risk level and script
+    Latin alternations share one leading word boundary, so the pattern list
+    is only tried where a word starts; a script's alternation only runs when
+    the text contains that script. Branches start with plain literals, which
+    the regex engine rejects cheaply; which pattern matched is worked out
+    only for the (rare) hits.
+    """
+    def __init__(self, patterns: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        patterns = patterns or RISK_PATTERNS
+        # level -> [(script, combined alternation, [(lang, index, pattern)])]
+        self._compiled: Dict[str, List[tuple]] = {}
+        for level in RISK_LEVELS:
+            by_script: Dict[str, list] = {}
+            for lang, lang_patterns in patterns.get(level, {}).items():
+                script = _LANG_SCRIPTS.get(lang, "latin")
+                for index, pattern in enumerate(lang_patterns):
+                    pattern = pattern.translate(_FOLD)
+                    if script == "latin":
+                        if not pattern.startswith(r"\b"):
+                            raise ValueError(f"Latin risk pattern must start with \\b: {pattern}")
+                        pattern = pattern[2:]
+                    by_script.setdefault(script, []).append((lang, index, pattern))
+            self._compiled[level] = [
+                (
+                    script,
+                    re.compile(("\\b(?:" if script == "latin" else "(?:") + "|".join(p for _, _, p in entries) + ")"),
+                    [(lang, index, re.compile(pattern)) for lang, index, pattern in entries]
+                )
+                for script, entries in by_script.items()
+            ]
+
+    def scan(self, text: str, levels: Optional[List[str]] = None) -> List[LexiconMatch]:
+        """All risk phrases in text, highest level first"""
+        normalized = normalize_risk_text(text)
+        present = {script for script, script_re in _SCRIPT_RES.items() if script_re.search(normalized)}
+        matches = []
+        for level in levels or RISK_LEVELS:
+            for script, combined, entries in self._compiled.get(level, []):
+                if script not in present:
+                    continue
+                for match in combined.finditer(normalized):
+                    # The first alternative matching here is the one the alternation took
+                    lang, index = next(
+                        ((lang, index) for lang, index, pattern in entries if pattern.match(normalized, match.start())),
+                        (script, -1)
+                    )
+                    matches.append(LexiconMatch(level, lang, index, match.group(), [match.start(), match.end()]))
+        return matches
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """Highest matched risk level with every matched phrase for audit"""
+        matches = self.scan(text)
+        if not matches:
+            return {"risk_level": "none", "reason": "no risk indicators detected", "urgent": False, "matches": []}
+        level = matches[0].level
+        return {
+            "risk_level": level,
+            "reason": RISK_REASONS[level],
+            "urgent": level == "high",
+            "matches": [asdict(m) for m in matches]
+        }
+
+
+# Global lexicon, compiled once per process
+risk_lexicon = RiskLexicon()
+
+def match_risk_patterns(text: str) -> Dict[str, Any]:
+    """Convenience function for pattern-based risk classification"""
+    return risk_lexicon.classify(text)
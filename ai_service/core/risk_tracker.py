@@ -0,0 +1,186 @@
+"""
+Risk tracker module for AI Psychologist service
+Session-level risk state: a decayed score, the peak level and the recent
+slope, updated in constant time per turn. Sustained upward trends raise a
+safety alert, stable low-risk sessions skip most Gemini risk calls, and the
+trajectory is queued for the backend when the session ends
+"""
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, asdict
+from collections import deque
+import time
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.outbox import enqueue_event
+except ImportError:
+    from .outbox import enqueue_event
+
+load_dotenv()
+
+RISK_TRACKING_ENABLED = os.getenv("RISK_TRACKING_ENABLED", "true").lower() == "true"
+# Turns after which a level's weight in the decayed score halves
+RISK_SCORE_HALF_LIFE_TURNS = float(os.getenv("RISK_SCORE_HALF_LIFE_TURNS", "4"))
+# Turns the slope is fitted over
+RISK_TREND_WINDOW_TURNS = int(os.getenv("RISK_TREND_WINDOW_TURNS", "5"))
+# A trend alert needs this many turns, a slope of at least
+# RISK_TREND_ALERT_SLOPE levels per turn and a decayed score of at least
+# RISK_TREND_ALERT_MIN_SCORE (1.0 = "low" on average)
+RISK_TREND_MIN_TURNS = int(os.getenv("RISK_TREND_MIN_TURNS", "3"))
+RISK_TREND_ALERT_SLOPE = float(os.getenv("RISK_TREND_ALERT_SLOPE", "0.25"))
+RISK_TREND_ALERT_MIN_SCORE = float(os.getenv("RISK_TREND_ALERT_MIN_SCORE", "1.0"))
+# A session is stable low-risk after this many turns with no level above low,
+# a decayed score below 0.5 and no rise; it then asks Gemini only every
+# RISK_STABLE_RECHECK_TURNS turns (patterns and the local model still run)
+RISK_STABLE_MIN_TURNS = int(os.getenv("RISK_STABLE_MIN_TURNS", "5"))
+RISK_STABLE_RECHECK_TURNS = int(os.getenv("RISK_STABLE_RECHECK_TURNS", "4"))
+
+LEVEL_VALUES = {"none": 0, "low": 1, "medium": 2, "high": 3}
+_LEVEL_NAMES = {value: level for level, value in LEVEL_VALUES.items()}
+
+
+@dataclass
+class RiskPoint:
+    """One turn of the session's risk trajectory"""
+    turn: int
+    level: str
+    score: float
+    slope: float
+    source: Optional[str]
+    at: float
+
+
+@dataclass
+class RiskTrend:
+    """Session risk state after a turn"""
+    level: str
+    score: float
+    peak: str
+    slope: float
+    turns: int
+    alert: bool = False
+    alert_reason: Optional[str] = None
+
+
+class RiskTracker:
+    """
+    Cumulative risk state for one session
+    The score is an exponentially decayed average of level values (none=0 ..
+    high=3); the slope is a least-squares fit over the last few turns, kept
+    as running sums so an update never rescans the window.
+    """
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.decay = 0.5 ** (1.0 / RISK_SCORE_HALF_LIFE_TURNS)
+        self.turns = 0
+        self.score = 0.0
+        self.peak = 0
+        self.slope = 0.0
+        self.alerted_level = 0  # highest level a trend alert was raised at
+        self.llm_skips = 0
+        self.trajectory: List[RiskPoint] = []
+        self._window: deque = deque()
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xy = 0.0
+        self._sum_xx = 0.0
+
+    def update(self, level: str, source: Optional[str] = None) -> RiskTrend:
+        """Record one turn's risk level"""
+        value = LEVEL_VALUES.get(level, 0)
+        x = float(self.turns)
+        self.score = float(value) if self.turns == 0 else self.decay * self.score + (1.0 - self.decay) * value
+        self.peak = max(self.peak, value)
+        self.turns += 1
+
+        self._window.append((x, value))
+        self._sum_x += x
+        self._sum_y += value
+        self._sum_xy += x * value
+        self._sum_xx += x * x
+        if len(self._window) > RISK_TREND_WINDOW_TURNS:
+            old_x, old_y = self._window.popleft()
+            self._sum_x -= old_x
+            self._sum_y -= old_y
+            self._sum_xy -= old_x * old_y
+            self._sum_xx -= old_x * old_x
+        n = len(self._window)
+        denominator = n * self._sum_xx - self._sum_x ** 2
+        self.slope = (n * self._sum_xy - self._sum_x * self._sum_y) / denominator if n > 1 and denominator else 0.0
+
+        trend = self.trend()
+        if (n >= RISK_TREND_MIN_TURNS and self.slope >= RISK_TREND_ALERT_SLOPE
+                and self.score >= RISK_TREND_ALERT_MIN_SCORE and value > self.alerted_level):
+            self.alerted_level = value
+            trend.alert = True
+            trend.alert_reason = (
+                f"Risk rising over {n} turns: {' -> '.join(_LEVEL_NAMES[y] for _, y in self._window)} "
+                f"(score {self.score:.2f}, slope {self.slope:+.2f}/turn, peak {_LEVEL_NAMES[self.peak]})"
+            )
+            print(f"📈 {self.session_id}: {trend.alert_reason}")
+
+        self.trajectory.append(RiskPoint(self.turns, level, round(self.score, 3), round(self.slope, 3), source, time.time()))
+        return trend
+
+    def trend(self) -> RiskTrend:
+        last = self._window[-1][1] if self._window else 0
+        return RiskTrend(
+            level=_LEVEL_NAMES[last],
+            score=round(self.score, 3),
+            peak=_LEVEL_NAMES[self.peak],
+            slope=round(self.slope, 3),
+            turns=self.turns
+        )
+
+    def is_stable_low(self) -> bool:
+        return (self.turns >= RISK_STABLE_MIN_TURNS and self.peak <= LEVEL_VALUES["low"]
+                and self.score < 0.5 and self.slope <= 0.0)
+
+    def should_skip_llm(self) -> bool:
+        """
+        True when this turn's risk check can skip Gemini
+        Stable low-risk sessions still get a Gemini check every
+        RISK_STABLE_RECHECK_TURNS turns.
+        """
+        if not self.is_stable_low():
+            self.llm_skips = 0
+            return False
+        if self.llm_skips >= RISK_STABLE_RECHECK_TURNS - 1:
+            self.llm_skips = 0
+            return False
+        self.llm_skips += 1
+        return True
+
+    def prompt_context(self) -> Optional[str]:
+        """Session risk summary for the risk prompt, or None before the first turn"""
+        if not self.turns:
+            return None
+        direction = "rising" if self.slope > 0.1 else "falling" if self.slope < -0.1 else "steady"
+        recent = ", ".join(_LEVEL_NAMES[y] for _, y in self._window)
+        return (f"Risk earlier in this session: recent levels {recent}; "
+                f"peak {_LEVEL_NAMES[self.peak]}; trend {direction}.")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary and full trajectory for export"""
+        return {
+            "session_id": self.session_id,
+            "turns": self.turns,
+            "score": round(self.score, 3),
+            "peak": _LEVEL_NAMES[self.peak],
+            "slope": round(self.slope, 3),
+            "trajectory": [asdict(point) for point in self.trajectory]
+        }
+
+
+def export_risk_trajectory(tracker: RiskTracker, django_url: str) -> bool:
+    """Queue a session's risk trajectory for the Django backend (delivered by the outbox)"""
+    if not tracker.turns:
+        return False
+    try:
+        enqueue_event(f"{django_url}/api/ai/sessions/risk/", tracker.to_dict())
+        print(f"Queued risk trajectory ({tracker.turns} turns) for session {tracker.session_id}")
+        return True
+    except Exception as e:
+        print(f"Error exporting risk trajectory: {e}")
+    return False
@@ -0,0 +1,303 @@
+"""
+Streaming safety module for AI Psychologist service
+Incremental output safety scanner: a compiled multi-pattern (Aho-Corasick)
+matcher runs over generated text as it streams, and each sentence is passed,
+flagged or held before it reaches TTS
+"""
+from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, field
+from collections import deque
+import threading
+import os
+from dotenv import load_dotenv
+
+try:
+    from core.segmenter import split_sentences
+except ImportError:
+    from .segmenter import split_sentences
+
+load_dotenv()
+
+# Replies are generated with stream=True and screened sentence by sentence
+LLM_STREAMING_ENABLED = os.getenv("LLM_STREAMING_ENABLED", "false").lower() == "true"
+
+ACTION_PASS = "pass"
+ACTION_FLAG = "flag"  # spoken, but the reply is marked as a safety response
+ACTION_HOLD = "hold"  # never spoken; replaced with a safe sentence
+
+# Phrases by action and category. Matching is case-insensitive on whole
+# words (punctuation counts as a word break); a trailing * matches any word
+# ending, e.g. "suicid*" also covers "suicidal".
+SAFETY_PATTERNS = {
+    ACTION_FLAG: {
+        "support_referral": [
+            "helpline", "helplines", "crisis", "emergency", "hotline", "aasra", "icall", "kiran",
+            "हेल्पलाइन", "आपातकाल", "உதவி எண்"
+        ],
+        "self_harm_topic": [
+            "suicid*", "harm", "self harm", "hurt yourself", "end your life",
+            "आत्महत्या", "தற்கொலை"
+        ]
+    },
+    ACTION_HOLD: {
+        "harmful_instruction": [
+            "kill yourself", "go die", "you should die", "better off dead", "hang yourself",
+            "cut yourself", "cut deeper", "slit your", "lethal dose", "overdose on", "how many pills",
+            "painless way to die", "no one would miss you",
+            "मर जाओ", "खुद को मार डालो", "செத்துப் போ"
+        ]
+    }
+}
+
+# Spoken instead of a held sentence
+HOLD_REPLACEMENTS = {
+    "en-IN": "Please reach out to someone you trust or call Kiran at 1800-599-0019 right now - you deserve support.",
+    "hi-IN": "कृपया अभी किसी भरोसेमंद व्यक्ति से बात करें या Kiran (1800-599-0019) पर कॉल करें - आप सहारे के हकदार हैं।",
+    "ta-IN": "தயவுசெய்து இப்போதே நம்பிக்கையான ஒருவரிடம் பேசுங்கள் அல்லது Kiran (1800-599-0019) ஐ அழையுங்கள் - உங்களுக்கு ஆதரவு தேவை."
+}
+
+# Characters that can end a sentence; text without one needs no re-segmentation
+_TERMINATORS = frozenset(".!?।॥…！？\n")
+# A boundary completes on the whitespace after a terminator (or its closing quote)
+_BOUNDARY_TAIL = _TERMINATORS | frozenset("\"'”’)]")
+
+
+def _is_word_char(char: str) -> bool:
+    # Devanagari and Tamil vowel signs are not alphanumeric but belong to the word
+    return (char.isalnum() or "\u0900" <= char <= "\u0963" or "\u0966" <= char <= "\u097F"
+            or "\u0B80" <= char <= "\u0BFF")
+
+
+def _normalize_pattern(phrase: str) -> str:
+    stem = phrase.endswith("*")
+    words = "".join(c if _is_word_char(c) else " " for c in phrase.rstrip("*").lower()).split()
+    # Surrounding spaces anchor the pattern to word boundaries
+    return " " + " ".join(words) + ("" if stem else " ")
+
+
+class PatternMatcher:
+    """
+    Aho-Corasick automaton over normalized text
+    Built once; feeding one character is amortized constant work regardless
+    of the number of patterns.
+    """
+    def __init__(self, patterns: Dict[str, Tuple[str, str]]):
+        # State 0 is the root; each state has goto edges, a failure link and outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str]]] = [[]]
+
+        for key, label in patterns.items():
+            state = 0
+            for char in key:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][char] = nxt
+                state = nxt
+            self._out[state].append(label)
+
+        # Breadth-first failure links; outputs of the failure state are inherited
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def step(self, state: int, char: str) -> int:
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        return self._goto[state].get(char, 0)
+
+    def outputs(self, state: int) -> List[Tuple[str, str]]:
+        return self._out[state]
+
+
+def _compile_patterns() -> PatternMatcher:
+    patterns = {}
+    for action, categories in SAFETY_PATTERNS.items():
+        for category, phrases in categories.items():
+            for phrase in phrases:
+                patterns[_normalize_pattern(phrase)] = (action, category)
+    return PatternMatcher(patterns)
+
+
+_matcher: Optional[PatternMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher() -> PatternMatcher:
+    """Compiled matcher shared by all scanners (built on first use)"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = _compile_patterns()
+    return _matcher
+
+
+@dataclass
+class ScreenedSentence:
+    """A sentence after screening; held sentences carry their replacement as text"""
+    text: str
+    action: str = ACTION_PASS
+    categories: List[str] = field(default_factory=list)
+    original: Optional[str] = None
+
+
+class SafetyScanner:
+    """
+    Screens one reply as it streams in
+
+    feed() takes each generated text chunk and returns the sentences it
+    completed, already screened. A held sentence ends the reply. Characters
+    go through the matcher once, as they arrive, and the matcher restarts at
+    every sentence terminator; only the unfinished sentence is kept and
+    re-segmented, and only when a chunk could have ended it.
+    """
+    def __init__(self, lang: str = "en-IN"):
+        self.lang = lang
+        self.matcher = get_matcher()
+        self.sentences: List[ScreenedSentence] = []
+        self.held = False  # a held sentence ends the reply
+        self._start_state = self.matcher.step(0, " ")
+        self._state = self._start_state
+        self._last_space = True
+        self._pending = ""
+        self._pending_start = 0  # stream offset of self._pending
+        self._offset = 0  # stream offset of the next character
+        self._hits: deque = deque()  # (stream offset, (action, category))
+
+    def feed(self, chunk: str) -> List[ScreenedSentence]:
+        """Scan a chunk of generated text; returns the sentences it completed"""
+        if not chunk or self.held:
+            return []
+        for char in chunk:
+            self._scan(char)
+        boundary = any(c in _TERMINATORS for c in chunk) or (
+            chunk[0].isspace() and self._pending[-1:] in _BOUNDARY_TAIL
+        )
+        self._pending += chunk
+        if not boundary:
+            return []
+        return self._emit(final=False)
+
+    def finish(self) -> List[ScreenedSentence]:
+        """End of the stream: screen the remaining text"""
+        if self.held:
+            return []
+        self._scan(" ")
+        return self._emit(final=True)
+
+    def text(self) -> str:
+        """The screened reply so far"""
+        return " ".join(s.text for s in self.sentences)
+
+    def pending_text(self) -> str:
+        """Text of the sentence still being generated"""
+        return self._pending.strip()
+
+    def categories(self) -> List[str]:
+        seen = []
+        for sentence in self.sentences:
+            seen.extend(c for c in sentence.categories if c not in seen)
+        return seen
+
+    def _scan(self, char: str):
+        if _is_word_char(char):
+            normalized = char.lower()
+        elif self._last_space:
+            if char in _TERMINATORS:
+                self._state = self._start_state
+            self._offset += 1
+            return
+        else:
+            normalized = " "
+        self._last_space = normalized == " "
+        self._state = self.matcher.step(self._state, normalized)
+        for label in self.matcher.outputs(self._state):
+            self._hits.append((self._offset, label))
+        if char in _TERMINATORS:
+            # No phrase spans a sentence end: the next word starts from the root
+            self._state = self._start_state
+        self._offset += 1
+
+    def _emit(self, final: bool) -> List[ScreenedSentence]:
+        pieces = split_sentences(self._pending)
+        if not final:
+            # The last piece may still grow
+            pieces = pieces[:-1]
+
+        emitted = []
+        cursor = 0
+        for index, piece in enumerate(pieces):
+            start = self._pending.find(piece, cursor)
+            cursor = (start if start >= 0 else cursor) + len(piece)
+            # At the end of the stream the last sentence takes every remaining match
+            end = float("inf") if final and index == len(pieces) - 1 else self._pending_start + cursor
+            sentence = self._screen(piece, end)
+            emitted.append(sentence)
+            self.sentences.append(sentence)
+            if sentence.action == ACTION_HOLD:
+                # The reply ends with the replacement; later text is dropped
+                self.held = True
+                final = True
+                break
+
+        if final:
+            self._hits.clear()
+            self._pending_start += len(self._pending)
+            self._pending = ""
+        elif cursor:
+            self._pending_start += cursor
+            self._pending = self._pending[cursor:]
+        return emitted
+
+    def _screen(self, text: str, end: float) -> ScreenedSentence:
+        # A whole-word match ends on the break after the sentence at the latest
+        labels = []
+        while self._hits and self._hits[0][0] <= end:
+            label = self._hits.popleft()[1]
+            if label not in labels:
+                labels.append(label)
+
+        categories = [category for _, category in labels]
+        if any(action == ACTION_HOLD for action, _ in labels):
+            print(f"🛑 Held generated sentence ({', '.join(categories)})")
+            return ScreenedSentence(hold_replacement(self.lang), ACTION_HOLD, categories, original=text)
+        if labels:
+            return ScreenedSentence(text, ACTION_FLAG, categories)
+        return ScreenedSentence(text)
+
+
+def hold_replacement(lang: str) -> str:
+    return HOLD_REPLACEMENTS.get(lang, HOLD_REPLACEMENTS["en-IN"])
+
+
+def screen_text(text: str, lang: str = "en-IN") -> SafetyScanner:
+    """Screen a complete reply (non-streamed generation)"""
+    scanner = SafetyScanner(lang)
+    scanner.feed(text)
+    scanner.finish()
+    return scanner
+
+
+def safety_metadata(scanner: SafetyScanner) -> Optional[Dict[str, Any]]:
+    """Reply metadata for a screened reply, or None if nothing matched"""
+    categories = scanner.categories()
+    if not categories:
+        return None
+    return {
+        "response_type": "safety",
+        "safety_level": "high" if scanner.held else "medium",
+        "safety_categories": categories,
+        "held_sentences": sum(1 for s in scanner.sentences if s.action == ACTION_HOLD)
+    }
@@ -0,0 +1,174 @@
+"""
+Sentence segmentation module for AI Psychologist service
+Linear-time, Indic-aware sentence splitting and TTS chunk planning
+"""
+import re
+from typing import List, Optional
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Target size of the first TTS chunk - short so the first audio arrives quickly
+FIRST_CHUNK_TARGET_CHARS = int(os.getenv("TTS_FIRST_CHUNK_CHARS", "60"))
+# A first sentence longer than this is split at a clause boundary
+FIRST_CHUNK_MAX_CHARS = int(os.getenv("TTS_FIRST_CHUNK_MAX_CHARS", "120"))
+
+# Sentence terminators: Latin punctuation (also used in Tamil), Devanagari
+# danda / double danda, ellipsis and full-width marks. Closing quotes and
+# brackets stay attached to the sentence they close. A terminator only counts
+# when followed by whitespace or end of text, so decimals ("3.5") and
+# dotted numbers ("1.2.3") never split.
+_BOUNDARY_RE = re.compile(
+    r"[.!?।॥…！？]+[\"'”’)\]]*(?=\s|$)|\n+"
+)
+
+# Clause boundaries used to shorten an overly long first sentence
+_CLAUSE_RE = re.compile(r"[,;:–—](?=\s)")
+
+# The word immediately before a terminator (bounded look-back keeps it O(1)).
+# Devanagari and Tamil vowel signs are combining marks that \w does not
+# match, so both blocks are listed explicitly (minus the dandas).
+_LAST_WORD_RE = re.compile(r"([\w\u0900-\u0963\u0966-\u097F\u0B80-\u0BFF]+)$")
+_LOOKBACK_CHARS = 16
+
+# Abbreviations that end in a period but do not end a sentence. Plain words
+# ("no", "min", "mar") are left out: they end sentences far more often.
+_ABBREVIATIONS = frozenset({
+    "dr", "mr", "mrs", "ms", "prof", "sr", "jr", "vs", "etc",
+    "approx", "dept", "govt", "hrs",
+    "jan", "feb", "apr", "aug", "sept", "oct", "nov",
+    # Devanagari and Tamil honorifics written with a period
+    "डॉ", "श्री", "श्रीमती", "कु", "டாக்", "திரு", "திருமதி",
+})
+
+# Dotted forms such as "e.g" / "i.e" / "U.S" right before the final period
+_DOTTED_RE = re.compile(r"(?:^|[^\w.])(?:[A-Za-z]\.)+[A-Za-z]$")
+# An initial ("P.") right after the boundary, or right before the current one
+_INITIAL_AHEAD_RE = re.compile(r"\s+[A-Z]\.(?=\s|$)")
+_INITIAL_BEHIND_RE = re.compile(r"(?:^|\s)[A-Z]\.\s+$")
+
+
+def _is_abbreviation(text: str, boundary_start: int, boundary: str) -> bool:
+    """Check whether a period boundary belongs to an abbreviation or initial"""
+    if boundary.rstrip("\"'”’)]") != ".":
+        return False
+
+    window = text[max(0, boundary_start - _LOOKBACK_CHARS):boundary_start]
+    match = _LAST_WORD_RE.search(window)
+    if not match:
+        return False
+
+    word = match.group(1)
+    if _DOTTED_RE.search(window):
+        return True
+    # Initials ("A. P. J. Abdul Kalam") only inside a run of initials, so
+    # "So am I." and "Plan A. Then B." still end sentences
+    if len(word) == 1:
+        if not word.isupper() or word == "I":
+            return False
+        return bool(_INITIAL_AHEAD_RE.match(text, boundary_start + len(boundary))
+                    or _INITIAL_BEHIND_RE.search(window[:match.start()]))
+    return word.lower() in _ABBREVIATIONS
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences in a single linear pass
+
+    Handles Latin, Devanagari (। ॥) and Tamil punctuation, abbreviations,
+    initials and decimal numbers.
+    """
+    if not text:
+        return []
+
+    sentences = []
+    start = 0
+
+    for match in _BOUNDARY_RE.finditer(text):
+        boundary = match.group(0)
+        if boundary[0] != "\n" and _is_abbreviation(text, match.start(), boundary):
+            continue
+
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+
+    return sentences
+
+
+def _split_first_sentence(sentence: str, target_chars: int) -> List[str]:
+    """Split an overly long first sentence at the clause boundary nearest the target"""
+    best = None
+    for match in _CLAUSE_RE.finditer(sentence):
+        if match.end() > target_chars * 2:
+            break
+        best = match.end()
+        if best >= target_chars:
+            break
+
+    if not best or best >= len(sentence) - 1:
+        return [sentence]
+
+    head, tail = sentence[:best].strip(), sentence[best:].strip()
+    return [head, tail] if head and tail else [sentence]
+
+
+def chunk_sentences(
+    sentences: List[str],
+    max_chunks: int = 3,
+    first_chunk_chars: Optional[int] = None
+) -> List[str]:
+    """
+    Plan TTS chunks: a short first chunk for fast first audio, then
+    remaining sentences packed into balanced chunks by character length
+    """
+    if not sentences:
+        return []
+    if max_chunks <= 1:
+        return [" ".join(sentences)]
+
+    target = first_chunk_chars or FIRST_CHUNK_TARGET_CHARS
+    sentences = list(sentences)
+
+    # A long opening sentence delays the first audio - break it at a clause
+    if len(sentences[0]) > FIRST_CHUNK_MAX_CHARS:
+        sentences[:1] = _split_first_sentence(sentences[0], target)
+
+    # First chunk: at least one sentence, grown while it stays under the target
+    first = sentences[0]
+    idx = 1
+    while idx < len(sentences) and len(first) + 1 + len(sentences[idx]) <= target:
+        first = f"{first} {sentences[idx]}"
+        idx += 1
+
+    chunks = [first]
+    rest = sentences[idx:]
+    if not rest:
+        return chunks
+
+    # Balanced packing of the remainder into at most (max_chunks - 1) chunks
+    slots = max_chunks - 1
+    remaining_chars = sum(len(s) for s in rest)
+    current: List[str] = []
+    current_len = 0
+
+    for i, sentence in enumerate(rest):
+        current.append(sentence)
+        current_len += len(sentence)
+        sentences_left = len(rest) - i - 1
+        slots_left = slots - len(chunks) + 1
+        if sentences_left and slots_left > 1 and current_len >= remaining_chars / slots_left:
+            chunks.append(" ".join(current))
+            remaining_chars -= current_len
+            current, current_len = [], 0
+
+    if current:
+        chunks.append(" ".join(current))
+
+    return chunks
@@ -0,0 +1,138 @@
+"""
+Session recording module for AI Psychologist service
+Captures inbound WebSocket frames and upstream (STT/LLM/TTS) responses per
+session so a session can be replayed deterministically for benchmarking.
+
+Recordings contain user transcripts - only enable SESSION_RECORDING_DIR on
+benchmark/staging instances, never for real users.
+"""
+from typing import Dict, Optional, Any, IO
+import base64
+import json
+import time
+import re
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RECORDING_FORMAT_VERSION = 1
+
+# Credential fields never written to a recording (token, ws_token, Authorization, api_key...)
+_CREDENTIAL_KEY_RE = re.compile(r"^(?:.*[_-])?(?:token|jwt|authorization|password|secret|api_?key|cookie)$", re.IGNORECASE)
+REDACTED = "[redacted]"
+
+
+def redact_credentials(value: Any) -> Any:
+    """Copy of a frame with credential fields replaced, at any depth"""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if isinstance(key, str) and _CREDENTIAL_KEY_RE.match(key) else redact_credentials(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact_credentials(item) for item in value]
+    return value
+
+
+class SessionRecorder:
+    """
+    Append-only JSONL recorder, one file per session
+    Each line is an event: {"t": seconds since session start, "kind": ..., ...}
+    """
+    def __init__(self, directory: Optional[str] = None, record_audio: Optional[bool] = None):
+        self.directory = directory if directory is not None else os.getenv("SESSION_RECORDING_DIR", "")
+        if record_audio is None:
+            record_audio = os.getenv("SESSION_RECORD_AUDIO", "false").lower() == "true"
+        self.record_audio = record_audio
+        self._files: Dict[str, IO[str]] = {}
+        self._started: Dict[str, float] = {}
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            print(f"📼 Session recording enabled: {self.directory}")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _write(self, session_id: str, event: Dict[str, Any]):
+        if not self.enabled:
+            return
+
+        try:
+            handle = self._files.get(session_id)
+            if handle is None:
+                path = os.path.join(self.directory, f"{session_id}.jsonl")
+                handle = open(path, "a", encoding="utf-8")
+                self._files[session_id] = handle
+                self._started[session_id] = time.monotonic()
+                handle.write(json.dumps({
+                    "t": 0.0,
+                    "kind": "header",
+                    "version": RECORDING_FORMAT_VERSION,
+                    "session_id": session_id,
+                    "recorded_at": time.time()
+                }) + "\n")
+
+            event["t"] = round(time.monotonic() - self._started[session_id], 4)
+            handle.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+            handle.flush()
+
+        except Exception as e:
+            print(f"Error recording session {session_id}: {e}")
+
+    def inbound(self, session_id: str, frame: Dict[str, Any]):
+        """Record an inbound JSON frame (init, audio_chunk, utterance end, barge-in...), credentials redacted"""
+        self._write(session_id, {"kind": "inbound", "frame": redact_credentials(frame)})
+
+    def inbound_binary(self, session_id: str, data: bytes):
+        """Record an inbound binary audio frame"""
+        self._write(session_id, {"kind": "inbound_binary", "data": base64.b64encode(data).decode("ascii")})
+
+    def upstream(self, session_id: str, stage: str, latency_ms: float, **payload: Any):
+        """Record an upstream response (stt, risk, llm, tts) with its latency"""
+        if stage == "tts" and not self.record_audio:
+            payload.pop("audio_base64", None)
+        self._write(session_id, {"kind": "upstream", "stage": stage, "latency_ms": round(latency_ms, 2), **payload})
+
+    def turn(self, session_id: str, record: Dict[str, Any]):
+        """Record the server-side metrics of a completed turn"""
+        self._write(session_id, {"kind": "turn", "metrics": record})
+
+    def close(self, session_id: str):
+        """Close the recording for a finished session"""
+        handle = self._files.pop(session_id, None)
+        self._started.pop(session_id, None)
+        if handle:
+            try:
+                handle.close()
+            except Exception as e:
+                print(f"Error closing recording for session {session_id}: {e}")
+
+
+def load_recording(path: str) -> Dict[str, Any]:
+    """Load a recording file into header, inbound frames, upstream fixtures and turns"""
+    recording: Dict[str, Any] = {"header": None, "inbound": [], "upstream": [], "turns": []}
+
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            kind = event.get("kind")
+            if kind == "header":
+                recording["header"] = event
+            elif kind in ("inbound", "inbound_binary"):
+                recording["inbound"].append(event)
+            elif kind == "upstream":
+                recording["upstream"].append(event)
+            elif kind == "turn":
+                recording["turns"].append(event["metrics"])
+
+    return recording
+
+
+# Global recorder (disabled unless SESSION_RECORDING_DIR is set)
+session_recorder = SessionRecorder()
@@ -0,0 +1,151 @@
+"""
+Text classifier module for AI Psychologist service
+Small on-CPU hashed character n-gram classifier (softmax regression) for
+short multilingual utterances; used where pattern matching is inconclusive
+"""
+from typing import Dict, List, Optional, Tuple
+import unicodedata
+import zlib
+import math
+import random
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """NFKC, lowercase, collapsed whitespace"""
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+class HashedNgramClassifier:
+    """
+    Softmax regression over hashed character n-grams and word unigrams
+    Character n-grams work across Latin, Devanagari, Tamil and romanized
+    Hinglish/Tanglish without a tokenizer; the model is a few MB of float32.
+    """
+    def __init__(self, labels: List[str], n_features: int = 2 ** 16, ngram_range: Tuple[int, int] = (2, 4)):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.weights = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse (indices, values) of the L2-normalized hashed feature vector"""
+        text = normalize_text(text)
+        counts: Dict[int, float] = {}
+
+        padded = f" {text} "
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                index = zlib.crc32(padded[i:i + n].encode("utf-8")) % self.n_features
+                counts[index] = counts.get(index, 0.0) + 1.0
+
+        for word in text.split():
+            index = zlib.crc32(b"w:" + word.encode("utf-8")) % self.n_features
+            counts[index] = counts.get(index, 0.0) + 1.0
+
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        values /= np.linalg.norm(values)
+        return indices, values
+
+    def _probabilities(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        logits = values @ self.weights[indices] + self.bias
+        logits -= logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """Probability per label"""
+        probabilities = self._probabilities(*self._features(text))
+        return {label: float(p) for label, p in zip(self.labels, probabilities)}
+
+    def predict_proba_many(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Probability per label for a batch, scored in one gather and segmented sum"""
+        if not texts:
+            return []
+        features = [self._features(text) for text in texts]
+        lengths = np.array([len(indices) for indices, _ in features], dtype=np.int64)
+        logits = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        if lengths.sum():
+            indices = np.concatenate([indices for indices, _ in features])
+            values = np.concatenate([values for _, values in features])
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            nonempty = lengths > 0
+            logits[nonempty] = np.add.reduceat(self.weights[indices] * values[:, None], offsets[nonempty], axis=0)
+        logits += self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        probabilities = exp / exp.sum(axis=1, keepdims=True)
+        return [{label: float(p) for label, p in zip(self.labels, row)} for row in probabilities]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely label and its probability"""
+        probabilities = self._probabilities(*self._features(text))
+        best = int(np.argmax(probabilities))
+        return self.labels[best], float(probabilities[best])
+
+    def fit(self, texts: List[str], labels: List[str], epochs: int = 20, learning_rate: float = 0.5,
+            l2: float = 1e-5, seed: int = 13) -> List[float]:
+        """Train with sparse SGD; returns mean loss per epoch"""
+        features = [self._features(text) for text in texts]
+        targets = [self.labels.index(label) for label in labels]
+        order = list(range(len(texts)))
+        rng = random.Random(seed)
+        losses = []
+
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            rate = learning_rate / (1.0 + epoch * 0.1)
+            total = 0.0
+            for i in order:
+                indices, values = features[i]
+                probabilities = self._probabilities(indices, values)
+                total -= math.log(max(float(probabilities[targets[i]]), 1e-12))
+                gradient = probabilities
+                gradient[targets[i]] -= 1.0
+                self.weights[indices] -= rate * (np.outer(values, gradient) + l2 * self.weights[indices])
+                self.bias -= rate * gradient
+            losses.append(total / max(len(order), 1))
+
+        return losses
+
+    def save(self, path: str):
+        """Write the model as a compressed .npz"""
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            labels=np.array(self.labels),
+            n_features=np.array(self.n_features),
+            ngram_range=np.array(self.ngram_range)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramClassifier":
+        data = np.load(path, allow_pickle=False)
+        model = cls(
+            labels=[str(label) for label in data["labels"]],
+            n_features=int(data["n_features"]),
+            ngram_range=tuple(int(n) for n in data["ngram_range"])
+        )
+        model.weights = data["weights"].astype(np.float32)
+        model.bias = data["bias"].astype(np.float32)
+        return model
+
+
+def load_classifier(path: Optional[str]) -> Optional[HashedNgramClassifier]:
+    """Load a classifier if a path is configured; None (with a warning) otherwise"""
+    if not path:
+        return None
+    try:
+        model = HashedNgramClassifier.load(path)
+        print(f"✅ Loaded text classifier {path} ({', '.join(model.labels)})")
+        return model
+    except Exception as e:
+        print(f"⚠️ Could not load text classifier {path}: {e}")
+        return None
@@ -0,0 +1,108 @@
+"""
+Turn budget module for AI Psychologist service
+End-to-end latency budget for a voice turn (utterance end → first audio) and
+the per-stage degradations chosen when the remaining budget gets tight
+"""
+from typing import Dict, List, Optional, Any
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Target time from utterance end to first audio (0 disables budgeting)
+TURN_BUDGET_MS = float(os.getenv("TURN_BUDGET_MS", "2500"))
+
+# Time held back for the stages that still have to run
+TURN_BUDGET_LLM_RESERVE_MS = float(os.getenv("TURN_BUDGET_LLM_RESERVE_MS", "1200"))
+TURN_BUDGET_TTS_RESERVE_MS = float(os.getenv("TURN_BUDGET_TTS_RESERVE_MS", "400"))
+
+# Risk: the Gemini check only runs with at least this much to spare, else patterns only
+RISK_LLM_MIN_MS = float(os.getenv("TURN_BUDGET_RISK_LLM_MIN_MS", "500"))
+
+# LLM: below this a short reply from the fast models is requested
+LLM_FULL_MIN_MS = float(os.getenv("TURN_BUDGET_LLM_FULL_MIN_MS", "1500"))
+DEGRADED_MAX_OUTPUT_TOKENS = int(os.getenv("TURN_BUDGET_MAX_OUTPUT_TOKENS", "100"))
+DEGRADED_MODELS = [m.strip() for m in os.getenv(
+    "GEMINI_FAST_MODELS", "gemini-2.0-flash-lite"
+).split(",") if m.strip()]
+
+# Stage timeouts never drop below these, even once the budget is spent:
+# STT has no cheaper fallback, and a reply or audio arriving late beats none
+STT_MIN_TIMEOUT_MS = float(os.getenv("TURN_BUDGET_STT_MIN_TIMEOUT_MS", "5000"))
+STT_MAX_TIMEOUT_MS = float(os.getenv("TURN_BUDGET_STT_MAX_TIMEOUT_MS", "30000"))
+LLM_MIN_TIMEOUT_MS = float(os.getenv("TURN_BUDGET_LLM_MIN_TIMEOUT_MS", "800"))
+TTS_MIN_TIMEOUT_MS = float(os.getenv("TURN_BUDGET_TTS_MIN_TIMEOUT_MS", "1500"))
+
+# Spoken when the LLM misses its deadline
+HOLDING_REPLIES = {
+    "en-IN": "I'm here with you. Take your time, and tell me a little more about what's on your mind.",
+    "hi-IN": "मैं आपके साथ हूँ। आराम से, मुझे थोड़ा और बताइए कि आपके मन में क्या चल रहा है।",
+    "ta-IN": "நான் உங்களுடன் இருக்கிறேன். நிதானமாக, உங்கள் மனதில் என்ன இருக்கிறது என்று இன்னும் கொஞ்சம் சொல்லுங்கள்."
+}
+
+
+class TurnBudget:
+    """
+    Deadline for one voice turn
+    Stages ask how much time they may spend once later stages' reserves are
+    held back, and record the degradations they fall back to.
+    """
+    def __init__(self, budget_ms: float = TURN_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.enabled = budget_ms > 0
+        self.started = time.monotonic()
+        self.degradations: List[str] = []
+        self.checkpoints: Dict[str, float] = {}
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started) * 1000
+
+    def remaining_ms(self) -> float:
+        if not self.enabled:
+            return float("inf")
+        return self.budget_ms - self.elapsed_ms()
+
+    def available_ms(self, reserve_ms: float = 0.0) -> float:
+        """Time this stage may use, keeping reserve_ms for the stages after it"""
+        return self.remaining_ms() - reserve_ms
+
+    def timeout(self, reserve_ms: float = 0.0, min_ms: float = 0.0, max_ms: Optional[float] = None) -> Optional[float]:
+        """Stage timeout in seconds (None when budgeting is disabled and no cap applies)"""
+        if not self.enabled:
+            return max_ms / 1000.0 if max_ms else None
+        timeout_ms = max(self.available_ms(reserve_ms), min_ms)
+        if max_ms:
+            timeout_ms = min(timeout_ms, max_ms)
+        return timeout_ms / 1000.0
+
+    def deadline(self, timeout: Optional[float]) -> Optional[float]:
+        """Absolute time.monotonic() deadline for a stage timeout"""
+        return time.monotonic() + timeout if timeout is not None else None
+
+    def checkpoint(self, stage: str):
+        """Record the remaining budget as a stage starts"""
+        if self.enabled:
+            self.checkpoints[stage] = round(self.remaining_ms(), 1)
+
+    def degrade(self, name: str):
+        if name not in self.degradations:
+            print(f"⏳ Turn budget: {name} ({self.remaining_ms():.0f}ms left)")
+            self.degradations.append(name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "budget_ms": self.budget_ms,
+            "remaining_ms": self.checkpoints,
+            "degradations": list(self.degradations)
+        }
+
+
+def fast_model_order(models: List[str]) -> List[str]:
+    """Fast models first, then the rest in their usual order as fallbacks"""
+    return DEGRADED_MODELS + [m for m in models if m not in DEGRADED_MODELS]
+
+
+def holding_reply(lang: str) -> str:
+    """Short reply used when the LLM misses the turn deadline"""
+    return HOLDING_REPLIES.get(lang, HOLDING_REPLIES["en-IN"])
@@ -0,0 +1,152 @@
+"""
+Turn metrics module for AI Psychologist service
+Per-turn stage latency (and process CPU per turn) for the voice pipeline
+"""
+from typing import Dict, List, Optional, Any
+from collections import deque
+from contextlib import contextmanager
+import math
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Number of completed turns kept in memory for stats and benchmarking
+TURN_HISTORY_SIZE = int(os.getenv("TURN_HISTORY_SIZE", "500"))
+
+
+class TurnMetrics:
+    """
+    Timing record for one voice turn (utterance end → TTS complete)
+    Stages are timed with wall clock only: their awaits let other sessions
+    run, so a CPU delta would charge them for that work. The turn total also
+    carries process_cpu_ms, the whole worker's CPU over the turn.
+    """
+    def __init__(self, session_id: str, turn_index: int):
+        self.session_id = session_id
+        self.turn_index = turn_index
+        self.started_at = time.time()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.marks: Dict[str, float] = {}
+        self.extra: Dict[str, Any] = {}
+        self.total: Dict[str, float] = {}
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a pipeline stage; works around awaits inside the block"""
+        wall = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = {"wall_ms": round((time.perf_counter() - wall) * 1000, 2)}
+
+    def mark(self, name: str):
+        """Record the time since turn start for a point event (first mark wins)"""
+        if name not in self.marks:
+            self.marks[name] = round((time.perf_counter() - self._wall_start) * 1000, 2)
+
+    def finish(self) -> Dict[str, Any]:
+        """Close the turn and return its record"""
+        if not self.total:
+            self.total = {
+                "wall_ms": round((time.perf_counter() - self._wall_start) * 1000, 2),
+                # Process-wide: includes every other session served meanwhile
+                "process_cpu_ms": round((time.process_time() - self._cpu_start) * 1000, 2)
+            }
+        return self.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "turn_index": self.turn_index,
+            "started_at": self.started_at,
+            "stages": self.stages,
+            "marks": self.marks,
+            "total": self.total,
+            **self.extra
+        }
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize_turns(turns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate per-stage p50/p95/p99 wall times (and process CPU per turn) over turn records"""
+    stage_names = []
+    for turn in turns:
+        for name in turn.get("stages", {}):
+            if name not in stage_names:
+                stage_names.append(name)
+
+    summary: Dict[str, Any] = {"turns": len(turns), "stages": {}}
+    series = {name: [t["stages"][name] for t in turns if name in t.get("stages", {})] for name in stage_names}
+    series["total"] = [t["total"] for t in turns if t.get("total")]
+
+    for name, records in series.items():
+        wall = [r["wall_ms"] for r in records]
+        summary["stages"][name] = {
+            "count": len(records),
+            "wall_ms": {"p50": percentile(wall, 50), "p95": percentile(wall, 95), "p99": percentile(wall, 99)}
+        }
+        cpu = [r["process_cpu_ms"] for r in records if "process_cpu_ms" in r]
+        if cpu:
+            summary["stages"][name]["process_cpu_ms"] = {
+                "p50": percentile(cpu, 50), "p95": percentile(cpu, 95), "p99": percentile(cpu, 99)
+            }
+
+    first_audio = [t["marks"]["first_audio"] for t in turns if "first_audio" in t.get("marks", {})]
+    if first_audio:
+        summary["first_audio_ms"] = {
+            "p50": percentile(first_audio, 50),
+            "p95": percentile(first_audio, 95),
+            "p99": percentile(first_audio, 99)
+        }
+
+    prompt_tokens = [t["prompt_tokens"] for t in turns if t.get("prompt_tokens") is not None]
+    if prompt_tokens:
+        summary["prompt_tokens"] = {
+            "p50": percentile(prompt_tokens, 50),
+            "p95": percentile(prompt_tokens, 95),
+            "p99": percentile(prompt_tokens, 99)
+        }
+
+    degradation_counts: Dict[str, int] = {}
+    degraded_turns = 0
+    for turn in turns:
+        if turn.get("degradations"):
+            degraded_turns += 1
+            for name in turn["degradations"]:
+                degradation_counts[name] = degradation_counts.get(name, 0) + 1
+    if degraded_turns:
+        summary["degradations"] = {
+            "turns": degraded_turns,
+            "rate": round(degraded_turns / len(turns), 3),
+            "counts": degradation_counts
+        }
+
+    return summary
+
+
+class TurnHistory:
+    """Bounded in-memory history of completed turns"""
+    def __init__(self, max_turns: int = TURN_HISTORY_SIZE):
+        self.turns = deque(maxlen=max_turns)
+
+    def add(self, record: Dict[str, Any]):
+        self.turns.append(record)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        turns = list(self.turns)
+        return turns[-limit:] if limit else turns
+
+    def summary(self) -> Dict[str, Any]:
+        return summarize_turns(list(self.turns))
@@ -5,10 +5,10 @@ Separate WebSocket from Django emotion monitoring for real-time efficiency
 """
 import json
 import asyncio
+import functools
 import uuid
 import jwt
-import requests
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 import base64
 from datetime import datetime, timezone, timedelta
@@ -16,6 +16,8 @@ import os
 from dotenv import load_dotenv
 import io
 import hashlib
+import time
+from collections import OrderedDict
 
 # Import directly since this may be run as a script, not a package
 import sys
@@ -28,19 +30,49 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 try:
-    from core.agents import get_agent
-    from core.llm import generate_reply
-    from core.risk import classify_risk, generate_safety_reply
+    from core.agents import get_agent, get_all_agents
+    from core.llm import generate_reply_with_metadata
+    from core.chat_session import cleanup_session_chat, get_active_chats_count, get_session_chat
+    from core.intent_router import route_intent, get_intent_stats
+    from core.reply_cache import reply_cache
+    from core.risk import classify_risk, generate_safety_reply, get_risk_stats
+    from core.risk_tracker import RiskTracker, RISK_TRACKING_ENABLED, export_risk_trajectory
     from core.memory import MemoryManager
+    from core.outbox import enqueue_event, PRIORITY_ALERT
     from core.emotion_integration import EmotionIntegrator
+    from core.segmenter import split_sentences, chunk_sentences
+    from core.turn_metrics import TurnMetrics, TurnHistory
+    from core.turn_budget import (
+        TurnBudget, TURN_BUDGET_LLM_RESERVE_MS, TURN_BUDGET_TTS_RESERVE_MS, RISK_LLM_MIN_MS, LLM_FULL_MIN_MS,
+        DEGRADED_MAX_OUTPUT_TOKENS, STT_MIN_TIMEOUT_MS, STT_MAX_TIMEOUT_MS, LLM_MIN_TIMEOUT_MS,
+        TTS_MIN_TIMEOUT_MS, fast_model_order, holding_reply
+    )
+    from core.model_router import model_router
+    from core.safety_stream import LLM_STREAMING_ENABLED
+    from core.session_recorder import session_recorder
 except ImportError:
     print("❌ Failed to import core modules with absolute paths, trying relative imports...")
     try:
-        from .agents import get_agent
-        from .llm import generate_reply
-        from .risk import classify_risk, generate_safety_reply
+        from .agents import get_agent, get_all_agents
+        from .llm import generate_reply_with_metadata
+        from .chat_session import cleanup_session_chat, get_active_chats_count, get_session_chat
+        from .intent_router import route_intent, get_intent_stats
+        from .reply_cache import reply_cache
+        from .risk import classify_risk, generate_safety_reply, get_risk_stats
+        from .risk_tracker import RiskTracker, RISK_TRACKING_ENABLED, export_risk_trajectory
         from .memory import MemoryManager
+        from .outbox import enqueue_event, PRIORITY_ALERT
         from .emotion_integration import EmotionIntegrator
+        from .segmenter import split_sentences, chunk_sentences
+        from .turn_metrics import TurnMetrics, TurnHistory
+        from .turn_budget import (
+            TurnBudget, TURN_BUDGET_LLM_RESERVE_MS, TURN_BUDGET_TTS_RESERVE_MS, RISK_LLM_MIN_MS, LLM_FULL_MIN_MS,
+            DEGRADED_MAX_OUTPUT_TOKENS, STT_MIN_TIMEOUT_MS, STT_MAX_TIMEOUT_MS, LLM_MIN_TIMEOUT_MS,
+            TTS_MIN_TIMEOUT_MS, fast_model_order, holding_reply
+        )
+        from .model_router import model_router
+        from .safety_stream import LLM_STREAMING_ENABLED
+        from .session_recorder import session_recorder
     except ImportError as e:
         print(f"❌ Import error: {e}")
         print("Please run this from the ai_service directory with Python package context.")
@@ -71,8 +103,44 @@ print(f"🎤 Real STT enabled: {ENABLE_REAL_SPEECH_TO_TEXT}")
 print(f"🔊 Real TTS enabled: {ENABLE_REAL_TEXT_TO_SPEECH}")
 print(f"🎭 Demo voice fallback: {FALLBACK_TO_DEMO_VOICE}")
 
+# Session reaper settings - reclaim sessions whose client vanished
+SESSION_IDLE_TIMEOUT_SECONDS = float(os.getenv("SESSION_IDLE_TIMEOUT_SECONDS", "300"))
+SESSION_MAX_DURATION_SECONDS = float(os.getenv("SESSION_MAX_DURATION_SECONDS", "3600"))
+SESSION_REAPER_INTERVAL_SECONDS = float(os.getenv("SESSION_REAPER_INTERVAL_SECONDS", "30"))
+
+# Synthesized TTS chunks kept per worker for repeated phrases without user content (0 disables)
+TTS_CACHE_SIZE = int(os.getenv("TTS_CACHE_SIZE", "128"))
+
 load_dotenv()
 
+# Canned transcripts for demo STT; they carry no user detail, so replies to
+# them may be shared through the reply cache
+DEMO_STT_TEST_TRANSCRIPT = "Testing speech recognition system"
+DEMO_TRANSCRIPTS = {
+    'en-IN': [
+        "I'm feeling stressed about my upcoming exams",
+        "I need help managing my anxiety",
+        "Work is really overwhelming right now",
+        "I feel depressed and don't know what to do"
+    ],
+    'hi-IN': [
+        "मुझे अपनी परीक्षाओं पर बहुत दबाव महसूस हो रहा है",
+        "मैंने बहुत तनाव महसूस कर रहा हूँ",
+        "मुझे मदद चाहिए मानसिक स्वास्थ्य से संबंधित",
+        "काम बहुत ज्यादा कठिन हो गया है"
+    ],
+    'ta-IN': [
+        "எனக்கு வரவிருக்கும் தேர்வுகளில் அதிக அழுத்தம் உள்ளது",
+        "நான் மன அழுத்தம் உணர்ந்தேன்",
+        "எனக்கு உளவியல் ஆலோசனை தேவை",
+        "வேலை மிகவும் கடினமானது"
+    ]
+}
+reply_cache.allow_utterances(
+    [DEMO_STT_TEST_TRANSCRIPT] + [text for texts in DEMO_TRANSCRIPTS.values() for text in texts]
+)
+
+
 class WebSocketVoiceHandler:
     """
     AI Psychologist WebSocket Handler - FastAPI Service (Port 8001)
@@ -84,8 +152,26 @@ class WebSocketVoiceHandler:
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
         self.audio_buffers: Dict[str, List[bytes]] = {}
         self.memory_managers: Dict[str, MemoryManager] = {}
+        self.risk_trackers: Dict[str, RiskTracker] = {}
         self.emotion_integrators: Dict[str, EmotionIntegrator] = {}
         self.tts_active: Dict[str, bool] = {}  # For barge-in functionality
+        self.greeting_tasks: Dict[str, asyncio.Task] = {}
+        # Pre-rendered greeting audio keyed by (agent_id, lang)
+        self.greeting_audio: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Synthesized chunks keyed by (lang, voice, text) - safety, holding and template replies repeat
+        self.tts_cache: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+
+        # Resource accounting for the idle-session reaper
+        self.websockets: Dict[str, WebSocket] = {}
+        self.session_activity: Dict[str, Dict[str, float]] = {}
+        self.audio_buffer_bytes: Dict[str, int] = {}
+        self.reaper_task: Optional[asyncio.Task] = None
+        self.reaped_sessions = {"idle": 0, "max_duration": 0, "orphaned": 0}
+
+        # Per-turn stage timings (see core.turn_metrics)
+        self.turn_counters: Dict[str, int] = {}
+        self.current_turns: Dict[str, TurnMetrics] = {}
+        self.turn_history = TurnHistory()
 
         # Secret key for JWT validation (should match Django)
         self.secret_key = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -159,6 +245,7 @@ class WebSocketVoiceHandler:
                     timeout=10.0
                 )
                 print(f"📩 Received init message: {init_message}")
+                session_recorder.inbound(session_id, init_message)
 
                 # Validate the init message
                 token = init_message.get('token')
@@ -201,51 +288,9 @@ class WebSocketVoiceHandler:
                         })
                         return
 
-                # Store session data with agent info
-                self.active_sessions[session_id] = {
-                    **payload,
-                    'agent_id': agent_id,
-                    'lang': lang,
-                    'consent': True
-                }
-
-                # Initialize session components with FastAPI-managed agent
-                session_data = self.active_sessions[session_id]
-                agent_config = get_agent(session_data['agent_id'])
-                print(f"🎯 Loaded AI agent: {agent_config.name} (Domain: {agent_config.domain})")
-
-                # Initialize memory manager for this session
-                self.memory_managers[session_id] = MemoryManager(
-                    session_id=session_id,
-                    consent_store=session_data['consent']
-                )
-
-                # Initialize emotion integrator if available
-                if os.getenv("ENABLE_EMOTION_INTEGRATION", "true").lower() == "true" and EmotionIntegrator:
-                    self.emotion_integrators[session_id] = EmotionIntegrator(session_data['user_id'])
-
-                # Send connection confirmation with agent details
-                await websocket.send_json({
-                    "type": "connection_established",
-                    "agent_name": agent_config.name,
-                    "agent_domain": agent_config.domain,
-                    "agent_languages": agent_config.languages,
-                    "voice_prefs": agent_config.voice_prefs,
-                    "demo_mode": DEMO_MODE
-                })
-
-                print(f"🎉 AI Conference session initialized: {agent_config.name}")
-
-                # Send initial greeting from AI agent (AI speaks first in video call)
-                greetings = {
-                    'en-IN': f"Hello! I'm {agent_config.name}, your AI {agent_config.domain} specialist. I'm here to support you today. How are you feeling?",
-                    'hi-IN': f"नमस्ते! मैं {agent_config.name} हूँ। मैं आज आपकी मदद करने के लिए यहाँ हूँ। आप कैसा महसूस कर रहे हैं?",
-                    'ta-IN': f"வணக்கம்! நான் {agent_config.name}. இன்று உங்களுக்கு உதவ நான் இங்கு இருக்கிறேன். நீங்கள் எப்படி உணர்கிறீர்கள்?"
-                }
-                initial_greeting = getattr(agent_config, 'initial_greeting', None) or greetings.get(lang, greetings['en-IN'])
-
-                print(f"🎤 AI Agent speaking first: {initial_greeting[:50]}...")
-                await self._generate_ai_response_and_stream(websocket, session_id, initial_greeting)
+                # Set up session components concurrently and start the greeting
+                # in the background so the receive loop begins immediately
+                await self._initialize_session(websocket, session_id, payload, agent_id, lang, DEMO_MODE)
 
             except asyncio.TimeoutError:
                 await websocket.send_json({
@@ -264,12 +309,14 @@ class WebSocketVoiceHandler:
                         # Handle JSON text message
                         try:
                             data = json.loads(message["text"])
+                            session_recorder.inbound(session_id, data)
                             await self._handle_json_message(websocket, session_id, data)
                         except json.JSONDecodeError:
                             print(f"⚠️ Received invalid JSON: {message['text'][:50]}...")
                             
                     elif "bytes" in message:
                         # Handle binary audio message
+                        session_recorder.inbound_binary(session_id, message["bytes"])
                         await self._handle_binary_audio(websocket, session_id, message["bytes"])
                         
                     elif message.get("type") == "websocket.disconnect":
@@ -308,6 +355,7 @@ class WebSocketVoiceHandler:
                     timeout=10.0
                 )
                 print(f"📩 Received init message: {init_message}")
+                session_recorder.inbound(session_id, init_message)
 
                 # Validate the init message
                 token = init_message.get('token')
@@ -349,51 +397,9 @@ class WebSocketVoiceHandler:
                         })
                         return
 
-                # Store session data with agent info
-                self.active_sessions[session_id] = {
-                    **payload,
-                    'agent_id': agent_id,
-                    'lang': lang,
-                    'consent': True
-                }
-
-                # Initialize session components with FastAPI-managed agent
-                session_data = self.active_sessions[session_id]
-                agent_config = get_agent(session_data['agent_id'])
-                print(f"🎯 Loaded AI agent: {agent_config.name} (Domain: {agent_config.domain})")
-
-                # Initialize memory manager for this session
-                self.memory_managers[session_id] = MemoryManager(
-                    session_id=session_id,
-                    consent_store=session_data['consent']
-                )
-
-                # Initialize emotion integrator if available
-                if os.getenv("ENABLE_EMOTION_INTEGRATION", "true").lower() == "true" and EmotionIntegrator:
-                    self.emotion_integrators[session_id] = EmotionIntegrator(session_data['user_id'])
-
-                # Send connection confirmation with agent details
-                await websocket.send_json({
-                    "type": "connection_established",
-                    "agent_name": agent_config.name,
-                    "agent_domain": agent_config.domain,
-                    "agent_languages": agent_config.languages,
-                    "voice_prefs": agent_config.voice_prefs,
-                    "demo_mode": DEMO_MODE
-                })
-
-                print(f"🎉 AI Conference session initialized: {agent_config.name}")
-
-                # Send initial greeting from AI agent (AI speaks first in video call)
-                greetings = {
-                    'en-IN': f"Hello! I'm {agent_config.name}, your AI {agent_config.domain} specialist. I'm here to support you today. How are you feeling?",
-                    'hi-IN': f"नमस्ते! मैं {agent_config.name} हूँ। मैं आज आपकी मदद करने के लिए यहाँ हूँ। आप कैसा महसूस कर रहे हैं?",
-                    'ta-IN': f"வணக்கம்! நான் {agent_config.name}. இன்று உங்களுக்கு உதவ நான் இங்கு இருக்கிறேன். நீங்கள் எப்படி உணர்கிறீர்கள்?"
-                }
-                initial_greeting = getattr(agent_config, 'initial_greeting', None) or greetings.get(lang, greetings['en-IN'])
-
-                print(f"🎤 AI Agent speaking first: {initial_greeting[:50]}...")
-                await self._generate_ai_response_and_stream(websocket, session_id, initial_greeting)
+                # Set up session components concurrently and start the greeting
+                # in the background so the receive loop begins immediately
+                await self._initialize_session(websocket, session_id, payload, agent_id, lang, DEMO_MODE)
 
             except asyncio.TimeoutError:
                 await websocket.send_json({
@@ -408,27 +414,188 @@ class WebSocketVoiceHandler:
                     # Try to receive as JSON first
                     try:
                         message = await asyncio.wait_for(websocket.receive_json(), timeout=0.1)
+                        session_recorder.inbound(session_id, message)
                         await self._handle_json_message(websocket, session_id, message)
                     except asyncio.TimeoutError:
                         # No JSON message, try binary audio
                         audio_chunk = await websocket.receive_bytes()
+                        session_recorder.inbound_binary(session_id, audio_chunk)
                         await self._handle_binary_audio(websocket, session_id, audio_chunk)
                 except WebSocketDisconnect:
                     break
 
-        except WebSocketDisconnect:
-            print(f"WebSocket disconnected for session: {session_id}")
-            await self._cleanup_session(session_id)
         except WebSocketDisconnect:
             print(f"WebSocket disconnected for session: {session_id}")
         except Exception as e:
             print(f"❌ Error in voice session handler: {e}")
         finally:
-            # Clean up any resources if needed
-            pass
+            # Always release session state, whichever path ended the loop
+            await self._cleanup_session(session_id)
+
+    async def _initialize_session(
+        self,
+        websocket: WebSocket,
+        session_id: str,
+        payload: Dict[str, Any],
+        agent_id: str,
+        lang: str,
+        demo_mode: bool
+    ):
+        """Run session setup stages concurrently, confirm the connection and start the greeting"""
+        # Store session data with agent info
+        self.active_sessions[session_id] = {
+            **payload,
+            'agent_id': agent_id,
+            'lang': lang,
+            'consent': True
+        }
+        session_data = self.active_sessions[session_id]
+        self.websockets[session_id] = websocket
+        now = time.monotonic()
+        self.session_activity[session_id] = {'created_at': now, 'last_activity': now}
+
+        enable_emotion = os.getenv("ENABLE_EMOTION_INTEGRATION", "true").lower() == "true" and EmotionIntegrator
+
+        # Agent load, memory manager and emotion integrator are independent -
+        # run them side by side instead of one after another
+        loop = asyncio.get_event_loop()
+        agent_config, memory_manager, emotion_integrator = await asyncio.gather(
+            loop.run_in_executor(None, get_agent, agent_id),
+            loop.run_in_executor(
+                None,
+                lambda: MemoryManager(session_id=session_id, consent_store=session_data['consent'])
+            ),
+            loop.run_in_executor(
+                None,
+                lambda: EmotionIntegrator(session_data['user_id']) if enable_emotion else None
+            )
+        )
+        print(f"🎯 Loaded AI agent: {agent_config.name} (Domain: {agent_config.domain})")
+
+        self.memory_managers[session_id] = memory_manager
+        if RISK_TRACKING_ENABLED:
+            self.risk_trackers[session_id] = RiskTracker(session_id)
+        if emotion_integrator:
+            self.emotion_integrators[session_id] = emotion_integrator
+
+        # Send connection confirmation with agent details
+        await websocket.send_json({
+            "type": "connection_established",
+            "agent_name": agent_config.name,
+            "agent_domain": agent_config.domain,
+            "agent_languages": agent_config.languages,
+            "voice_prefs": agent_config.voice_prefs,
+            "demo_mode": demo_mode
+        })
+
+        print(f"🎉 AI Conference session initialized: {agent_config.name}")
+
+        # AI speaks first in video call - stream the greeting in the background
+        # so audio the user sends meanwhile is read (and can barge in)
+        self.greeting_tasks[session_id] = asyncio.create_task(
+            self._stream_greeting(websocket, session_id, agent_config, lang)
+        )
+
+    def _get_greeting_text(self, agent_config, lang: str) -> str:
+        """Initial greeting spoken by the agent in the session language"""
+        greetings = {
+            'en-IN': f"Hello! I'm {agent_config.name}, your AI {agent_config.domain} specialist. I'm here to support you today. How are you feeling?",
+            'hi-IN': f"नमस्ते! मैं {agent_config.name} हूँ। मैं आज आपकी मदद करने के लिए यहाँ हूँ। आप कैसा महसूस कर रहे हैं?",
+            'ta-IN': f"வணக்கம்! நான் {agent_config.name}. இன்று உங்களுக்கு உதவ நான் இங்கு இருக்கிறேன். நீங்கள் எப்படி உணர்கிறீர்கள்?"
+        }
+        return getattr(agent_config, 'initial_greeting', None) or greetings.get(lang, greetings['en-IN'])
+
+    async def prerender_greetings(self):
+        """Pre-render greeting audio for every built-in agent and language"""
+        loop = asyncio.get_event_loop()
+        for agent_config in get_all_agents().values():
+            for lang in agent_config.languages:
+                key = (agent_config.agent_id, lang)
+                if key in self.greeting_audio:
+                    continue
+                try:
+                    text = self._get_greeting_text(agent_config, lang)
+                    voice_name = agent_config.voice_prefs.get(lang, lang)
+                    chunks = await loop.run_in_executor(None, self._render_tts_chunks, text, lang, voice_name)
+                    if chunks:
+                        self.greeting_audio[key] = {"text": text, "chunks": chunks}
+                except Exception as e:
+                    print(f"⚠️ Could not pre-render greeting for {key}: {e}")
+
+        print(f"🎤 Pre-rendered {len(self.greeting_audio)} greeting assets")
+
+    async def _stream_greeting(self, websocket: WebSocket, session_id: str, agent_config, lang: str):
+        """Stream the greeting from its pre-rendered asset, rendering it once on a miss"""
+        try:
+            if websocket.client_state.name != 'CONNECTED':
+                return
+
+            key = (agent_config.agent_id, lang)
+            asset = self.greeting_audio.get(key)
+            text = asset["text"] if asset else self._get_greeting_text(agent_config, lang)
+
+            print(f"🎤 AI Agent speaking first: {text[:50]}...")
+            self.tts_active[session_id] = True
+
+            await websocket.send_json({
+                "type": "ai_text",
+                "data": {"text": text}
+            })
+
+            if not asset:
+                await websocket.send_json({
+                    "type": "generating_tts",
+                    "message": "Generating voice response..."
+                })
+                voice_name = agent_config.voice_prefs.get(lang, lang)
+                chunks = await asyncio.get_event_loop().run_in_executor(
+                    None, self._render_tts_chunks, text, lang, voice_name
+                )
+                asset = {"text": text, "chunks": chunks}
+                if chunks:
+                    self.greeting_audio[key] = asset
+
+            sent = 0
+            for chunk in asset["chunks"]:
+                if not self.tts_active.get(session_id, False):
+                    break  # Barge-in interrupt
+                if websocket.client_state.name != 'CONNECTED':
+                    break
+                await websocket.send_json({
+                    "type": "ai_audio_chunk",
+                    "data": chunk
+                })
+                sent += 1
+                await asyncio.sleep(0)
+
+            if websocket.client_state.name == 'CONNECTED':
+                await websocket.send_json({
+                    "type": "tts_complete",
+                    "total_chunks": sent
+                })
+
+            self.tts_active[session_id] = False
+
+        except asyncio.CancelledError:
+            # Cancelled by barge-in, a new utterance or cleanup - the caller
+            # owns the TTS state from here on
+            raise
+        except Exception as e:
+            print(f"Error streaming greeting for session {session_id}: {e}")
+            self.tts_active[session_id] = False
+        finally:
+            if self.greeting_tasks.get(session_id) is asyncio.current_task():
+                del self.greeting_tasks[session_id]
+
+    def _cancel_greeting(self, session_id: str):
+        """Stop a greeting that is still playing (user spoke or session ended)"""
+        task = self.greeting_tasks.pop(session_id, None)
+        if task and not task.done():
+            task.cancel()
 
     async def _handle_json_message(self, websocket: WebSocket, session_id: str, message: Dict[str, Any]):
         """Handle incoming JSON WebSocket messages"""
+        self._touch_session(session_id)
         message_type = message.get('type')
 
         if message_type == 'audio_chunk':
@@ -443,6 +610,7 @@ class WebSocketVoiceHandler:
                 except Exception as e:
                     print(f"❌ Error decoding base64 audio: {e}")
         elif message_type == 'user_utterance_end':
+            self._cancel_greeting(session_id)
             await self._process_utterance(websocket, session_id)
         elif message_type == 'no_speech_detected':
             await self._handle_no_speech(websocket, session_id)
@@ -456,10 +624,13 @@ class WebSocketVoiceHandler:
     async def _handle_binary_audio(self, websocket: WebSocket, session_id: str, audio_chunk: bytes):
         """Handle incoming binary audio chunk"""
         try:
+            self._touch_session(session_id)
+
             # Store binary audio chunk directly
             if session_id not in self.audio_buffers:
                 self.audio_buffers[session_id] = []
             self.audio_buffers[session_id].append(audio_chunk)
+            self.audio_buffer_bytes[session_id] = self.audio_buffer_bytes.get(session_id, 0) + len(audio_chunk)
 
             print(f"Binary audio chunk received for session {session_id} ({len(audio_chunk)} bytes)")
 
@@ -468,6 +639,12 @@ class WebSocketVoiceHandler:
 
     async def _process_utterance(self, websocket: WebSocket, session_id: str):
         """Process user utterance after receiving end signal"""
+        turn_index = self.turn_counters.get(session_id, 0) + 1
+        self.turn_counters[session_id] = turn_index
+        turn = TurnMetrics(session_id, turn_index)
+        self.current_turns[session_id] = turn
+        budget = TurnBudget()
+
         try:
             # Send processing notification to frontend
             await websocket.send_json({
@@ -494,9 +671,22 @@ class WebSocketVoiceHandler:
 
             # Clear buffer for next utterance
             self.audio_buffers[session_id] = []
-
-            # Step 1: Speech-to-Text
-            user_text = await self._speech_to_text(combined_audio, lang)
+            self.audio_buffer_bytes[session_id] = 0
+
+            # Step 1: Speech-to-Text (no cheaper fallback, so its timeout has a floor)
+            budget.checkpoint("stt")
+            with turn.stage("stt"):
+                user_text = await self._speech_to_text(
+                    combined_audio, lang,
+                    timeout=budget.timeout(
+                        TURN_BUDGET_LLM_RESERVE_MS + TURN_BUDGET_TTS_RESERVE_MS,
+                        min_ms=STT_MIN_TIMEOUT_MS, max_ms=STT_MAX_TIMEOUT_MS
+                    )
+                )
+            session_recorder.upstream(
+                session_id, "stt", turn.stages["stt"]["wall_ms"],
+                lang=lang, audio_bytes=len(combined_audio), text=user_text
+            )
 
             if not user_text:
                 await websocket.send_json({
@@ -511,8 +701,33 @@ class WebSocketVoiceHandler:
                 "data": {"text": user_text}
             })
 
+            # Replies are shared across sessions only while every utterance of the
+            # session is generic (greetings, demo transcripts)
+            session_data["reply_cache_generic"] = (
+                session_data.get("reply_cache_generic", True) and reply_cache.is_generic(user_text)
+            )
+
             # Step 2: Risk Classification
-            risk_result = classify_risk(user_text)
+            budget.checkpoint("risk")
+            risk_tracker = self.risk_trackers.get(session_id)
+            # Stable low-risk sessions skip most Gemini risk calls
+            stable_session = bool(risk_tracker and risk_tracker.should_skip_llm())
+            with turn.stage("risk"):
+                risk_result = await self._classify_risk_within_budget(
+                    user_text, budget,
+                    session_context=risk_tracker.prompt_context() if risk_tracker else None,
+                    pattern_only=stable_session
+                )
+            session_recorder.upstream(
+                session_id, "risk", turn.stages["risk"]["wall_ms"], text=user_text, result=risk_result
+            )
+            turn.extra["risk_level"] = risk_result['risk_level']
+            turn.extra["risk_source"] = risk_result.get('source')
+            risk_trend = risk_tracker.update(risk_result['risk_level'], risk_result.get('source')) if risk_tracker else None
+            if risk_trend:
+                turn.extra["risk_trend"] = {"score": risk_trend.score, "peak": risk_trend.peak, "slope": risk_trend.slope}
+                if stable_session:
+                    turn.extra["risk_stable_session"] = True
 
             # Step 3: Handle safety if needed
             if risk_result['risk_level'] in ['medium', 'high']:
@@ -526,17 +741,53 @@ class WebSocketVoiceHandler:
                 })
 
                 # Generate TTS (placeholder)
-                await self._text_to_speech_and_stream(websocket, safety_reply, lang, agent_config.voice_prefs.get(lang))
+                with turn.stage("tts"):
+                    await self._text_to_speech_and_stream(
+                        websocket, safety_reply, lang, agent_config.voice_prefs.get(lang),
+                        session_id=session_id, budget=budget, cache_audio=True
+                    )
 
                 # Send safety alert to Django backend
                 await self._send_safety_alert(
                     session_id,
                     risk_result['risk_level'],
                     f"Safety response triggered: {risk_result['reason']}"
+                    + (f". {risk_trend.alert_reason}" if risk_trend and risk_trend.alert else "")
                 )
 
                 return  # Skip normal reply flow
 
+            if risk_trend and risk_trend.alert:
+                # Sustained rise below the safety-reply threshold: counselors are alerted, the reply continues
+                await self._send_safety_alert(session_id, risk_trend.level, risk_trend.alert_reason)
+
+            if "system_prompt" not in session_data:
+                session_data["system_prompt"] = agent_config.build_prompt(lang)
+
+            # Step 3b: Local fast path for exercise requests (no LLM round trip),
+            # only while neither this turn nor the session has shown any risk
+            session_risk = risk_result['risk_level']
+            if risk_trend and risk_trend.peak != "none":
+                session_risk = risk_trend.peak
+            local = route_intent(user_text, lang, risk_level=session_risk)
+            if local:
+                ai_reply, intent_match = local
+                turn.extra["served_locally"] = intent_match.intent
+                self.memory_managers[session_id].add_turn(user_text, ai_reply)
+                get_session_chat(session_id, session_data["system_prompt"]).append(user_text, ai_reply)
+
+                await websocket.send_json({
+                    "type": "ai_text",
+                    "data": {"text": ai_reply, "intent": intent_match.intent}
+                })
+
+                with turn.stage("tts"):
+                    await self._text_to_speech_and_stream(
+                        websocket, ai_reply, lang, agent_config.voice_prefs.get(lang),
+                        session_id=session_id, budget=budget, cache_audio=True
+                    )
+                return
+
             # Step 4: Get emotion snapshot if available
             emotion_snapshot = None
             if session_id in self.emotion_integrators:
@@ -546,13 +797,54 @@ class WebSocketVoiceHandler:
             memory_manager = self.memory_managers[session_id]
             conversation_history = memory_manager.get_context()
 
-            # Step 6: Generate LLM response
-            ai_reply = generate_reply(
-                system_prompt=agent_config.build_prompt(lang, emotion_snapshot),
-                user_text=user_text,
-                memory_turns=conversation_history,
-                emotion_snapshot=emotion_snapshot
-            )
+            # Step 6a: Reply cache (opt-in, shared across sessions in this worker)
+            agent_id = session_data['agent_id']
+            cache_key = None
+            ai_reply = None
+            reply_metadata: Dict[str, Any] = {}
+            if reply_cache.eligible(memory_manager.consent_store, session_data["reply_cache_generic"]):
+                cache_key = reply_cache.make_key(agent_id, lang, user_text, conversation_history, emotion_snapshot)
+                ai_reply = reply_cache.get(agent_id, cache_key)
+
+            if ai_reply:
+                turn.extra["reply_cache"] = "hit"
+                # Keep the session chat in step with what the user heard
+                get_session_chat(session_id, session_data["system_prompt"]).append(user_text, ai_reply)
+            else:
+                # Step 6b: Generate LLM response (session chat keeps the system
+                # instruction and history; emotion context goes with the user turn)
+                budget.checkpoint("llm")
+                with turn.stage("llm"):
+                    ai_reply, reply_metadata = await self._generate_reply_within_budget(
+                        budget,
+                        lang,
+                        websocket=websocket,
+                        system_prompt=session_data["system_prompt"],
+                        user_text=user_text,
+                        memory_turns=conversation_history,
+                        emotion_snapshot=emotion_snapshot,
+                        session_id=session_id,
+                        token_budget=agent_config.context_token_budget,
+                        speech_target_seconds=agent_config.speech_target_seconds
+                    )
+                if reply_metadata.get("response_type") == "holding":
+                    get_session_chat(session_id, session_data["system_prompt"]).append(user_text, ai_reply)
+                turn.extra["prompt_tokens"] = reply_metadata.get("prompt_tokens", {}).get("total")
+                turn.extra["history_turns"] = reply_metadata.get("prompt_tokens", {}).get("history_turns")
+                if reply_metadata.get("safety_categories"):
+                    turn.extra["reply_safety"] = reply_metadata["safety_categories"]
+                if reply_metadata.get("speech"):
+                    turn.extra["reply_seconds"] = reply_metadata["speech"]["estimated_seconds"]
+                    turn.extra["reply_truncated"] = reply_metadata["speech"]["truncated"]
+                session_recorder.upstream(
+                    session_id, "llm", turn.stages["llm"]["wall_ms"], user_text=user_text, reply=ai_reply,
+                    model=reply_metadata.get("model"), prompt_tokens=reply_metadata.get("prompt_tokens")
+                )
+
+                # Only normal replies of eligible turns (consent, generic session) are cached
+                if cache_key and reply_metadata.get("response_type") == "normal":
+                    reply_cache.set(agent_id, cache_key, ai_reply)
+                    turn.extra["reply_cache"] = "stored"
 
             if not ai_reply:
                 ai_reply = "I'm sorry, I couldn't generate a response. Please try again."
@@ -566,8 +858,15 @@ class WebSocketVoiceHandler:
                 "data": {"text": ai_reply}
             })
 
-            # Step 9: Generate and stream TTS
-            await self._text_to_speech_and_stream(websocket, ai_reply, lang, agent_config.voice_prefs.get(lang))
+            # Step 9: Generate and stream TTS. Audio is shared across sessions
+            # only for text without user content: holding replies, and replies
+            # of turns eligible for the reply cache (consent, generic session)
+            with turn.stage("tts"):
+                await self._text_to_speech_and_stream(
+                    websocket, ai_reply, lang, agent_config.voice_prefs.get(lang),
+                    session_id=session_id, budget=budget,
+                    cache_audio=cache_key is not None or reply_metadata.get("response_type") == "holding"
+                )
 
         except Exception as e:
             print(f"Error processing utterance: {e}")
@@ -576,11 +875,88 @@ class WebSocketVoiceHandler:
                 "message": "Error processing your message"
             })
 
+        finally:
+            self.current_turns.pop(session_id, None)
+            if budget.enabled:
+                turn.extra["budget_remaining_ms"] = budget.checkpoints
+            turn.extra["degradations"] = budget.degradations
+            record = turn.finish()
+            self.turn_history.add(record)
+            session_recorder.turn(session_id, record)
+
+    async def _classify_risk_within_budget(
+        self, text: str, budget: TurnBudget, session_context: Optional[str] = None, pattern_only: bool = False
+    ) -> Dict[str, Any]:
+        """Gemini risk check off the event loop; patterns only when the budget can't cover it"""
+        if pattern_only:
+            return classify_risk(text, pattern_only=True)
+
+        reserve_ms = TURN_BUDGET_LLM_RESERVE_MS + TURN_BUDGET_TTS_RESERVE_MS
+        if budget.available_ms(reserve_ms) < RISK_LLM_MIN_MS:
+            budget.degrade("risk_pattern_only")
+            return classify_risk(text, pattern_only=True)
+
+        loop = asyncio.get_event_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(None, lambda: classify_risk(text, session_context=session_context)),
+                timeout=budget.timeout(reserve_ms)
+            )
+        except asyncio.TimeoutError:
+            budget.degrade("risk_timeout")
+            return classify_risk(text, pattern_only=True)
+
+    async def _generate_reply_within_budget(
+        self, budget: TurnBudget, lang: str, websocket: Optional[WebSocket] = None, **reply_kwargs
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        LLM reply off the event loop, bounded by the turn budget
+        A tight budget asks the fast models for a short reply; a missed deadline
+        answers with a holding reply (the late reply is discarded). With
+        streaming enabled, each screened sentence is sent as ai_text_partial.
+        """
+        if budget.available_ms(TURN_BUDGET_TTS_RESERVE_MS) < LLM_FULL_MIN_MS:
+            budget.degrade("llm_short_reply")
+            reply_kwargs["max_output_tokens"] = DEGRADED_MAX_OUTPUT_TOKENS
+            models = fast_model_order(model_router.models)
+            if models != model_router.models:
+                budget.degrade("llm_fast_model")
+                reply_kwargs["models"] = models
+
+        timeout = budget.timeout(TURN_BUDGET_TTS_RESERVE_MS, min_ms=LLM_MIN_TIMEOUT_MS)
+        deadline = budget.deadline(timeout)
+        loop = asyncio.get_event_loop()
+
+        if websocket and LLM_STREAMING_ENABLED:
+            def send_partial(sentence):
+                # Called from the executor thread; nothing is sent once the turn has moved on
+                if deadline is None or time.monotonic() <= deadline:
+                    asyncio.run_coroutine_threadsafe(websocket.send_json({
+                        "type": "ai_text_partial",
+                        "data": {"text": sentence.text}
+                    }), loop)
+            reply_kwargs["on_sentence"] = send_partial
+
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(
+                    None,
+                    functools.partial(
+                        generate_reply_with_metadata, deadline=deadline, lang=lang, **reply_kwargs
+                    )
+                ),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            budget.degrade("llm_timeout")
+            return holding_reply(lang), {"response_type": "holding"}
+
     async def _handle_barge_in(self, websocket: WebSocket, session_id: str):
         """Handle user interrupting current response"""
         try:
             # Stop backend TTS loop
             self.tts_active[session_id] = False
+            self._cancel_greeting(session_id)
             
             # Clear any ongoing audio
             await websocket.send_json({
@@ -589,6 +965,7 @@ class WebSocketVoiceHandler:
 
             # Clear audio buffer to prevent processing
             self.audio_buffers[session_id] = []
+            self.audio_buffer_bytes[session_id] = 0
 
             print(f"Barge-in handled for session {session_id}")
 
@@ -615,6 +992,9 @@ class WebSocketVoiceHandler:
     async def _cleanup_session(self, session_id: str):
         """Clean up session resources"""
         try:
+            # Stop a greeting that may still be streaming
+            self._cancel_greeting(session_id)
+
             # Remove from active sessions
             if session_id in self.active_sessions:
                 del self.active_sessions[session_id]
@@ -627,15 +1007,168 @@ class WebSocketVoiceHandler:
             if session_id in self.memory_managers:
                 del self.memory_managers[session_id]
 
+            # Queue the session's risk trajectory for the backend
+            risk_tracker = self.risk_trackers.pop(session_id, None)
+            if risk_tracker:
+                export_risk_trajectory(risk_tracker, os.getenv("DJANGO_URL", "http://localhost:8000"))
+
             if session_id in self.emotion_integrators:
                 del self.emotion_integrators[session_id]
 
+            # Drop barge-in flag and resource accounting
+            self.tts_active.pop(session_id, None)
+            self.audio_buffer_bytes.pop(session_id, None)
+            self.session_activity.pop(session_id, None)
+            self.websockets.pop(session_id, None)
+            self.turn_counters.pop(session_id, None)
+            self.current_turns.pop(session_id, None)
+            cleanup_session_chat(session_id)
+            session_recorder.close(session_id)
+
             print(f"Session {session_id} cleaned up")
 
         except Exception as e:
             print(f"Error cleaning up session {session_id}: {e}")
 
-    async def _speech_to_text(self, audio_data: bytes, language: str) -> Optional[str]:
+    def _touch_session(self, session_id: str):
+        """Record client activity for the idle-session reaper"""
+        activity = self.session_activity.get(session_id)
+        if activity:
+            activity['last_activity'] = time.monotonic()
+
+    def start_reaper(self):
+        """Start the background task that reclaims idle and abandoned sessions"""
+        if self.reaper_task is None or self.reaper_task.done():
+            self.reaper_task = asyncio.create_task(self._reaper_loop())
+            print(f"🧹 Session reaper started (idle: {SESSION_IDLE_TIMEOUT_SECONDS}s, max: {SESSION_MAX_DURATION_SECONDS}s)")
+
+    async def stop_reaper(self):
+        """Stop the background reaper task"""
+        if self.reaper_task and not self.reaper_task.done():
+            self.reaper_task.cancel()
+            try:
+                await self.reaper_task
+            except asyncio.CancelledError:
+                pass
+        self.reaper_task = None
+
+    async def _reaper_loop(self):
+        """Periodically reap sessions until cancelled"""
+        while True:
+            await asyncio.sleep(SESSION_REAPER_INTERVAL_SECONDS)
+            try:
+                await self.reap_sessions()
+            except Exception as e:
+                print(f"Error in session reaper: {e}")
+
+    async def reap_sessions(self) -> List[str]:
+        """
+        Reclaim sessions that exceeded the idle or absolute timeout, plus
+        orphaned per-session entries left behind without any activity record
+        """
+        now = time.monotonic()
+        reaped = []
+
+        known = (
+            set(self.active_sessions) | set(self.audio_buffers) | set(self.memory_managers)
+            | set(self.emotion_integrators) | set(self.tts_active)
+        )
+
+        for session_id in known:
+            activity = self.session_activity.get(session_id)
+            if activity is None:
+                # Some per-session entry survived without its session - a greeting
+                # or utterance still running owns it, so leave those alone
+                if session_id in self.greeting_tasks:
+                    continue
+                reason = "orphaned"
+            elif now - activity['created_at'] > SESSION_MAX_DURATION_SECONDS:
+                reason = "max_duration"
+            elif now - activity['last_activity'] > SESSION_IDLE_TIMEOUT_SECONDS:
+                reason = "idle"
+            else:
+                continue
+
+            websocket = self.websockets.get(session_id)
+            if websocket is not None:
+                try:
+                    if websocket.client_state.name == 'CONNECTED':
+                        await websocket.send_json({
+                            "type": "session_ended",
+                            "reason": reason
+                        })
+                        await websocket.close(code=1001)
+                except Exception as e:
+                    print(f"Error closing reaped session {session_id}: {e}")
+
+            await self._cleanup_session(session_id)
+            self.reaped_sessions[reason] += 1
+            reaped.append(session_id)
+            print(f"🧹 Reaped session {session_id} ({reason})")
+
+        return reaped
+
+    def get_turn_stats(self, limit: int = 20) -> Dict[str, Any]:
+        """Per-stage latency percentiles (process CPU per turn) and the most recent turn records"""
+        return {
+            "summary": self.turn_history.summary(),
+            "local_intents": get_intent_stats(),
+            "local_risk": get_risk_stats(),
+            "reply_cache": reply_cache.get_stats(),
+            "recent": self.turn_history.recent(limit)
+        }
+
+    def get_resource_stats(self) -> Dict[str, Any]:
+        """Per-session memory accounting and totals for the stats endpoint"""
+        now = time.monotonic()
+        sessions = {}
+
+        for session_id, session_data in self.active_sessions.items():
+            activity = self.session_activity.get(session_id, {})
+            memory_manager = self.memory_managers.get(session_id)
+            memory_turns = len(memory_manager.memory) if memory_manager else 0
+            memory_chars = sum(
+                len(turn.user_text) + len(turn.assistant_response)
+                for turn in memory_manager.memory
+            ) if memory_manager else 0
+
+            sessions[session_id] = {
+                "agent_id": session_data.get('agent_id'),
+                "lang": session_data.get('lang'),
+                "age_sec": round(now - activity['created_at'], 1) if activity else None,
+                "idle_sec": round(now - activity['last_activity'], 1) if activity else None,
+                "buffer_bytes": self.audio_buffer_bytes.get(session_id, 0),
+                "buffer_chunks": len(self.audio_buffers.get(session_id, [])),
+                "memory_turns": memory_turns,
+                "memory_chars": memory_chars,
+                "tts_active": self.tts_active.get(session_id, False)
+            }
+
+        return {
+            "totals": {
+                "active_sessions": len(self.active_sessions),
+                "audio_buffers": len(self.audio_buffers),
+                "memory_managers": len(self.memory_managers),
+                "session_chats": get_active_chats_count(),
+                "emotion_integrators": len(self.emotion_integrators),
+                "tts_flags": len(self.tts_active),
+                "greeting_tasks": len(self.greeting_tasks),
+                "buffer_bytes": sum(self.audio_buffer_bytes.values()),
+                "memory_turns": sum(s["memory_turns"] for s in sessions.values()),
+                "memory_chars": sum(s["memory_chars"] for s in sessions.values()),
+                "greeting_assets": len(self.greeting_audio),
+                "tts_cache_entries": len(self.tts_cache)
+            },
+            "reaped": dict(self.reaped_sessions),
+            "config": {
+                "idle_timeout_sec": SESSION_IDLE_TIMEOUT_SECONDS,
+                "max_duration_sec": SESSION_MAX_DURATION_SECONDS,
+                "reaper_interval_sec": SESSION_REAPER_INTERVAL_SECONDS
+            },
+            "sessions": sessions
+        }
+
+    async def _speech_to_text(self, audio_data: bytes, language: str, timeout: Optional[float] = 30.0) -> Optional[str]:
         """Google Speech-to-Text processing with utterance-based recognition"""
         try:
             print(f"🎤 Processing audio: {len(audio_data)} bytes, lang: {language}, demo: {FALLBACK_TO_DEMO_VOICE}")
@@ -645,30 +1178,10 @@ class WebSocketVoiceHandler:
                 print(f"🎤 Using demo STT mode (real STT: {ENABLE_REAL_SPEECH_TO_TEXT}, Google Cloud: {GOOGLE_CLOUD_AVAILABLE})")
 
                 if len(audio_data) < 500:
-                    return "Testing speech recognition system"
+                    return DEMO_STT_TEST_TRANSCRIPT
 
                 # Return different sample responses based on audio length and language
-                sample_responses = {
-                    'en-IN': [
-                        "I'm feeling stressed about my upcoming exams",
-                        "I need help managing my anxiety",
-                        "Work is really overwhelming right now",
-                        "I feel depressed and don't know what to do"
-                    ],
-                    'hi-IN': [
-                        "मुझे अपनी परीक्षाओं पर बहुत दबाव महसूस हो रहा है",
-                        "मैंने बहुत तनाव महसूस कर रहा हूँ",
-                        "मुझे मदद चाहिए मानसिक स्वास्थ्य से संबंधित",
-                        "काम बहुत ज्यादा कठिन हो गया है"
-                    ],
-                    'ta-IN': [
-                        "எனக்கு வரவிருக்கும் தேர்வுகளில் அதிக அழுத்தம் உள்ளது",
-                        "நான் மன அழுத்தம் உணர்ந்தேன்",
-                        "எனக்கு உளவியல் ஆலோசனை தேவை",
-                        "வேலை மிகவும் கடினமானது"
-                    ]
-                }
-
+                sample_responses = DEMO_TRANSCRIPTS
                 responses_for_lang = sample_responses.get(language, sample_responses['en-IN'])
                 sample_text = responses_for_lang[hash(audio_data[:50]) % len(responses_for_lang)]
 
@@ -706,7 +1219,7 @@ class WebSocketVoiceHandler:
                         None,
                         lambda: client.recognize(config=config, audio=audio)
                     ),
-                    timeout=30.0  # 30 second timeout for STT
+                    timeout=timeout  # 30 seconds, or what the turn budget allows
                 )
             except asyncio.TimeoutError:
                 print("⚠️ STT request timed out")
@@ -756,16 +1269,99 @@ class WebSocketVoiceHandler:
             
         return buf.getvalue()
 
-    async def _text_to_speech_and_stream(self, websocket: WebSocket, text: str, lang: str, specific_voice: str = None):
+    def _get_cached_tts(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        audio = self.tts_cache.get(key)
+        if audio is not None:
+            self.tts_cache.move_to_end(key)
+        return audio
+
+    def _put_cached_tts(self, key: Tuple[str, str, str], audio: bytes):
+        if TTS_CACHE_SIZE <= 0:
+            return
+        self.tts_cache[key] = audio
+        self.tts_cache.move_to_end(key)
+        while len(self.tts_cache) > TTS_CACHE_SIZE:
+            self.tts_cache.popitem(last=False)
+
+    def _mark_first_audio(self, session_id: Optional[str]):
+        """Mark the first audio chunk of the session's current turn"""
+        turn = self.current_turns.get(session_id) if session_id else None
+        if turn:
+            turn.mark("first_audio")
+
+    def _create_tts_client(self):
+        """Create a Google TTS client, setting up bundled credentials if present"""
+        creds_path = os.path.join(os.path.dirname(__file__), '..', 'hip-wharf-473408-m8-5c0e43084eef.json')
+        if os.path.exists(creds_path):
+            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = creds_path
+            print(f"✅ Google Cloud credentials set: {creds_path}")
+
+        return texttospeech.TextToSpeechClient()
+
+    def _render_tts_chunks(self, text: str, lang: str, voice_name: str) -> List[Dict[str, Any]]:
+        """
+        Synthesize text into ready-to-send audio chunk payloads (blocking)
+        Used for pre-rendered assets such as the session greeting
+        """
+        chunks = self._chunk_sentences(self._split_into_sentences(text), max_chunks=3)
+        payloads = []
+
+        if ENABLE_REAL_TEXT_TO_SPEECH and GOOGLE_CLOUD_AVAILABLE:
+            client = self._create_tts_client()
+            voice = texttospeech.VoiceSelectionParams(language_code=lang, name=voice_name)
+            audio_config = texttospeech.AudioConfig(
+                audio_encoding=texttospeech.AudioEncoding.MP3,
+                speaking_rate=0.9,
+                pitch=0.0,
+            )
+            for i, chunk_text in enumerate(chunks):
+                response = client.synthesize_speech(
+                    input=texttospeech.SynthesisInput(text=chunk_text),
+                    voice=voice,
+                    audio_config=audio_config
+                )
+                payloads.append({
+                    "audio_base64": base64.b64encode(response.audio_content).decode('utf-8'),
+                    "chunk_index": i,
+                    "total_chunks": len(chunks),
+                    "text": chunk_text
+                })
+        else:
+            for i, chunk_text in enumerate(chunks):
+                duration = max(1.0, len(chunk_text.split()) * 0.3)
+                payloads.append({
+                    "audio_base64": base64.b64encode(self._create_wav_chunk(duration)).decode('utf-8'),
+                    "chunk_index": i,
+                    "total_chunks": len(chunks),
+                    "text": chunk_text,
+                    "simulation": True
+                })
+
+        return payloads
+
+    async def _text_to_speech_and_stream(
+        self,
+        websocket: WebSocket,
+        text: str,
+        lang: str,
+        specific_voice: str = None,
+        session_id: Optional[str] = None,
+        budget: Optional[TurnBudget] = None,
+        cache_audio: bool = False
+    ):
         """
         Google Text-to-Text processing with sentence-level chunking (1-3 MP3 chunks)
         Stream MP3 chunks for fast perceived response time
+        With cache_audio (text carrying no user content: safety, holding and
+        intent replies) chunks go through the worker-wide TTS cache; with a turn
+        budget, a first chunk that can't be synthesized in time leaves the turn
+        text-only.
         """
-        session_id = None
-        for sid, data in self.active_sessions.items():
-            if data.get('agent_id'):
-                session_id = sid
-                break
+        if session_id is None:
+            for sid, data in self.active_sessions.items():
+                if data.get('agent_id'):
+                    session_id = sid
+                    break
 
         try:
             if session_id and self.active_sessions.get(session_id):
@@ -794,14 +1390,7 @@ class WebSocketVoiceHandler:
                 print("✅ Using Real Google Cloud TTS")
                 # Use Google TTS for production
                 try:
-                    # Set up Google Cloud credentials
-                    import os
-                    creds_path = os.path.join(os.path.dirname(__file__), '..', 'hip-wharf-473408-m8-5c0e43084eef.json')
-                    if os.path.exists(creds_path):
-                        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = creds_path
-                        print(f"✅ Google Cloud credentials set: {creds_path}")
-                    
-                    client = texttospeech.TextToSpeechClient()
+                    client = self._create_tts_client()
                     print("✅ Google TTS client created successfully")
                 except Exception as e:
                     print(f"❌ Failed to create TTS client: {e}")
@@ -814,6 +1403,7 @@ class WebSocketVoiceHandler:
                         audio_base64 = base64.b64encode(mock_audio).decode('utf-8')
                         
                         if websocket.client_state.name == 'CONNECTED':
+                            self._mark_first_audio(session_id)
                             await websocket.send_json({
                                 "type": "ai_audio_chunk",
                                 "data": {
@@ -857,29 +1447,52 @@ class WebSocketVoiceHandler:
                         print(f"WebSocket disconnected during TTS generation")
                         break
 
-                    # Generate TTS for this chunk
-                    try:
-                        synthesis_input = texttospeech.SynthesisInput(text=chunk_text)
-                        print(f"🎵 Synthesizing chunk {i+1}/{len(chunks)}: '{chunk_text[:30]}...'")
-                        
-                        response = await asyncio.get_event_loop().run_in_executor(
-                            None,
-                            lambda: client.synthesize_speech(
-                                input=synthesis_input,
-                                voice=tts_config,
-                                audio_config=audio_config
+                    cache_key = (lang, voice_name, chunk_text) if cache_audio else None
+                    audio_content = self._get_cached_tts(cache_key) if cache_key else None
+                    if audio_content is not None:
+                        audio_base64 = base64.b64encode(audio_content).decode('utf-8')
+                    else:
+                        # Generate TTS for this chunk
+                        try:
+                            synthesis_input = texttospeech.SynthesisInput(text=chunk_text)
+                            print(f"🎵 Synthesizing chunk {i+1}/{len(chunks)}: '{chunk_text[:30]}...'")
+
+                            # Only the first chunk is on the first-audio critical path
+                            timeout = budget.timeout(min_ms=TTS_MIN_TIMEOUT_MS) if budget and i == 0 else None
+                            synth_start = time.perf_counter()
+                            response = await asyncio.wait_for(
+                                asyncio.get_event_loop().run_in_executor(
+                                    None,
+                                    lambda: client.synthesize_speech(
+                                        input=synthesis_input,
+                                        voice=tts_config,
+                                        audio_config=audio_config
+                                    )
+                                ),
+                                timeout=timeout
+                            )
+                            print(f"✅ Chunk {i+1} synthesized successfully ({len(response.audio_content)} bytes)")
+
+                        except asyncio.TimeoutError:
+                            # Reply text is already on screen; don't hold the turn for late audio
+                            budget.degrade("tts_text_only")
+                            break
+                        except Exception as e:
+                            print(f"❌ TTS synthesis failed for chunk {i+1}: {e}")
+                            # Skip this chunk and continue
+                            continue
+
+                        # Convert to base64 for WebSocket transport
+                        audio_content = response.audio_content
+                        if cache_key:
+                            self._put_cached_tts(cache_key, audio_content)
+                        audio_base64 = base64.b64encode(audio_content).decode('utf-8')
+                        if session_id:
+                            session_recorder.upstream(
+                                session_id, "tts", (time.perf_counter() - synth_start) * 1000,
+                                text=chunk_text, voice=voice_name, audio_bytes=len(audio_content),
+                                audio_base64=audio_base64
                             )
-                        )
-                        print(f"✅ Chunk {i+1} synthesized successfully ({len(response.audio_content)} bytes)")
-                        
-                    except Exception as e:
-                        print(f"❌ TTS synthesis failed for chunk {i+1}: {e}")
-                        # Skip this chunk and continue
-                        continue
-
-                    # Convert to base64 for WebSocket transport
-                    audio_content = response.audio_content
-                    audio_base64 = base64.b64encode(audio_content).decode('utf-8')
 
                     # Check again before sending
                     if websocket.client_state.name != 'CONNECTED':
@@ -887,6 +1500,7 @@ class WebSocketVoiceHandler:
                         break
 
                     # Stream chunk to client
+                    self._mark_first_audio(session_id)
                     await websocket.send_json({
                         "type": "ai_audio_chunk",
                         "data": {
@@ -913,6 +1527,8 @@ class WebSocketVoiceHandler:
                     mock_audio = self._create_wav_chunk(duration)
                     audio_base64 = base64.b64encode(mock_audio).decode('utf-8')
 
+                    self._mark_first_audio(session_id)
+
                     await websocket.send_json({
                         "type": "ai_audio_chunk",
                         "data": {
@@ -952,53 +1568,16 @@ class WebSocketVoiceHandler:
                 self.tts_active[session_id] = False
 
     def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences for natural chunking"""
-        # Simple sentence splitting - could be enhanced with NLTK
-        sentences = []
-        current = ""
-
-        for char in text:
-            current += char
-            if char in '.!?\n':
-                if current.strip():
-                    sentences.append(current.strip())
-                    current = ""
-                elif char == '\n':
-                    continue
-
-        if current.strip():
-            sentences.append(current.strip())
-
+        """Split text into sentences for natural chunking (Indic-aware, linear time)"""
+        sentences = split_sentences(text)
         return sentences if sentences else [text]
 
     def _chunk_sentences(self, sentences: List[str], max_chunks: int = 3) -> List[str]:
-        """Combine sentences into chunks (1-3 maximum)"""
-        if not sentences:
-            return []
-
-        if len(sentences) <= max_chunks:
-            # If we have fewer sentences than max chunks, use each sentence as a chunk
-            return sentences
-
-        # Combine sentences into balanced chunks
-        total_sentences = len(sentences)
-        base_chunk_size = total_sentences // max_chunks
-        remainder = total_sentences % max_chunks
-
-        chunks = []
-        start_idx = 0
-
-        for i in range(max_chunks):
-            chunk_size = base_chunk_size + (1 if i < remainder else 0)
-            end_idx = start_idx + chunk_size
-            chunk_sentences = sentences[start_idx:end_idx]
-            chunks.append(' '.join(chunk_sentences))
-            start_idx = end_idx
-
-        return chunks
+        """Combine sentences into chunks (1-3 maximum) with a short first chunk for fast first audio"""
+        return chunk_sentences(sentences, max_chunks=max_chunks)
 
     async def _send_safety_alert(self, session_id: str, risk_level: str, summary: str):
-        """Send safety alert to Django backend"""
+        """Queue a safety alert for the Django backend (delivered first by the outbox)"""
         try:
             session_data = self.active_sessions[session_id]
             django_url = os.getenv("DJANGO_URL", "http://localhost:8000")
@@ -1010,20 +1589,11 @@ class WebSocketVoiceHandler:
                 "summary": summary
             }
 
-            response = requests.post(
-                f"{django_url}/api/alerts/",
-                json=alert_data,
-                headers={'X-Internal-Token': os.getenv('INTERNAL_AI_TOKEN', 'your-secret-token-here')},
-                timeout=5
-            )
-
-            if response.status_code == 200:
-                print(f"Safety alert sent for session {session_id}")
-            else:
-                print(f"Failed to send safety alert: {response.status_code}")
+            enqueue_event(f"{django_url}/api/ai/alerts/", alert_data, priority=PRIORITY_ALERT)
+            print(f"Safety alert queued for session {session_id}")
 
         except Exception as e:
-            print(f"Error sending safety alert: {e}")
+            print(f"Error queueing safety alert: {e}")
 
     async def _generate_ai_response_and_stream(self, websocket: WebSocket, session_id: str, text: str):
         """Generate AI response and stream it to the client"""
@@ -1059,7 +1629,8 @@ class WebSocketVoiceHandler:
                 websocket, 
                 text, 
                 lang,
-                agent_config.voice_prefs.get(lang, lang)
+                agent_config.voice_prefs.get(lang, lang),
+                session_id=session_id
             )
 
         except Exception as e:
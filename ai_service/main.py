@@ -2,6 +2,7 @@
 """
 FastAPI service for AI Psychologist voice interactions
 """
+import asyncio
 import uvicorn
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
@@ -121,6 +122,103 @@ async def test_websocket():
 # WebSocket routes
 ws_handler = WebSocketVoiceHandler()
 
+@app.on_event("startup")
+async def prerender_greetings():
+    """Render greeting audio in the background so sessions start with instant audio"""
+    if os.getenv("PRERENDER_GREETINGS", "true").lower() == "true":
+        app.state.greeting_prerender_task = asyncio.create_task(ws_handler.prerender_greetings())
+
+@app.on_event("startup")
+async def start_session_reaper():
+    """Reclaim voice sessions whose clients vanished without a clean close"""
+    ws_handler.start_reaper()
+
+@app.on_event("shutdown")
+async def stop_session_reaper():
+    await ws_handler.stop_reaper()
+
+@app.on_event("startup")
+async def start_model_catalog():
+    """Discover available Gemini models off the request path, then refresh in the background"""
+    from core.model_catalog import model_catalog
+    model_catalog.start()
+
+@app.on_event("shutdown")
+async def stop_model_catalog():
+    from core.model_catalog import model_catalog
+    model_catalog.stop()
+
+@app.on_event("startup")
+async def start_outbox():
+    """Deliver backend writes left from a previous run, then keep flushing in the background"""
+    from core.outbox import outbox
+    outbox.start()
+    dead_alerts = outbox.get_stats()["dead_alert_events"]
+    if dead_alerts:
+        print(f"🚨🚨 {len(dead_alerts)} safety alert(s) were never delivered to the backend; see GET /stats/outbox")
+
+@app.on_event("shutdown")
+async def stop_outbox():
+    """Give pending backend writes one last delivery attempt; undelivered ones stay on disk"""
+    from core.outbox import outbox
+    await asyncio.get_event_loop().run_in_executor(None, outbox.stop)
+
+@app.get("/stats/sessions")
+async def session_stats():
+    """Voice session resource accounting (buffers, memory turns, reaped counts)"""
+    return ws_handler.get_resource_stats()
+
+@app.get("/stats/process")
+async def process_stats():
+    """Worker process CPU time and resident memory (used by the load tester)"""
+    import resource
+    rss_kb = None
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+                    break
+    except OSError:
+        pass
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        "pid": os.getpid(),
+        "cpu_user_sec": usage.ru_utime,
+        "cpu_system_sec": usage.ru_stime,
+        "rss_kb": rss_kb,
+        "max_rss_kb": usage.ru_maxrss,
+        "active_sessions": len(ws_handler.active_sessions)
+    }
+
+@app.get("/stats/models")
+async def model_stats():
+    """Gemini model health (circuit state, success rate, latency), LLM hedging and quota headroom"""
+    from core.model_router import model_router
+    from core.rate_limiter import gemini_rate_limiter
+    return {
+        **model_router.stats(),
+        "hedging": llm.get_hedge_stats(),
+        "rate_limit": gemini_rate_limiter.get_stats()
+    }
+
+@app.get("/stats/outbox")
+async def outbox_stats():
+    """Backend write outbox: pending and dead events, deliveries, retries, undelivered safety alerts"""
+    from core.outbox import get_outbox_stats
+    return get_outbox_stats()
+
+@app.get("/diagnostics/models")
+async def model_diagnostics():
+    """Discovered Gemini models and the reply/risk/summary chains (also read by the backend)"""
+    from core.model_catalog import model_catalog
+    return model_catalog.to_dict()
+
+@app.get("/stats/turns")
+async def turn_stats(limit: int = 20):
+    """Per-stage voice turn latency (p50/p95/p99), process CPU per turn, and recent turn records"""
+    return ws_handler.get_turn_stats(limit)
+
 # Simple test WebSocket endpoint
 @app.websocket("/ws/test")
 async def websocket_test_endpoint(websocket: WebSocket):
@@ -349,6 +447,35 @@ async def risk_classify(payload: dict = Body(...)):
     result = classify_risk(text)
     return result
 
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from typing import Optional
+import json
+
+@app.post("/risk-classify/batch")
+async def risk_classify_batch(request: Request, concurrency: Optional[int] = None):
+    """
+    Classify a batch of texts for transcript audits.
+    Expects: a JSON array of texts or {"id", "text"} objects, {"texts": [...]}, or NDJSON
+    Returns: NDJSON, one {"index", "id", "risk_level", ...} line per text as it completes,
+    then a {"summary": {...}} line
+    """
+    from core.risk_batch import RISK_BATCH_CONCURRENCY, RISK_BATCH_MAX_ITEMS, classify_batch, parse_batch
+    try:
+        items = parse_batch((await request.body()).decode("utf-8"))
+    except (ValueError, UnicodeDecodeError) as e:
+        return JSONResponse({"error": f"invalid batch: {e}"}, status_code=400)
+    if len(items) > RISK_BATCH_MAX_ITEMS:
+        return JSONResponse({"error": f"batch exceeds {RISK_BATCH_MAX_ITEMS} texts"}, status_code=413)
+
+    concurrency = max(1, min(concurrency or RISK_BATCH_CONCURRENCY, RISK_BATCH_CONCURRENCY))
+
+    async def lines():
+        async for record in classify_batch(items, concurrency):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @app.post("/session-summary")
 async def session_summary(payload: dict = Body(...)):
     """
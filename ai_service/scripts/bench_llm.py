@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+LLM benchmark for the Gemini fallback chain
+
+Replays a corpus of anonymized prompts through each model. Every prompt is
+built like a live turn: the agent's AgentConfig.build_prompt as the system
+instruction, the prior exchanges, then the user message. Each reply is
+streamed, and the harness records time-to-first-token, total latency, output
+tokens and reply length. Results are reported per model and per
+model/agent/language, with a suggested GEMINI_MODELS order.
+
+Usage:
+    # offline against the in-process mock (no network or quota)
+    python scripts/bench_llm.py --backend mock --repeat 3
+
+    # real Gemini, comparing models under a GenerationConfig variant
+    python scripts/bench_llm.py --models gemini-2.0-flash,gemini-2.0-flash-lite \\
+        --max-output-tokens 150 --repeat 3 --output bench.json
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from upstream_fixtures import AI_SERVICE_DIR, FixtureGenerativeModel, FixtureStore, offline_environment
+
+DEFAULT_CORPUS = os.path.join(AI_SERVICE_DIR, "scripts", "data", "llm_bench_prompts.jsonl")
+
+# A model is only suggested for the fallback order if it answers this share of prompts
+MIN_SUCCESS_RATE = 0.95
+
+
+def load_corpus(path):
+    with open(path, "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def build_request(item):
+    """System instruction and contents exactly as a live (non-session) turn builds them"""
+    from core.agents import get_agent
+    from core.context_builder import exchanges_from_turns, exchanges_to_messages
+
+    agent = get_agent(item["agent_id"])
+    messages = exchanges_to_messages(exchanges_from_turns(item.get("history", [])))
+    messages.append({"role": "user", "parts": [item["user_text"]]})
+    return agent.build_prompt(item["lang"]), messages
+
+
+def run_one(model_name, item, generation_config, stream):
+    """One timed request; returns its measurement record"""
+    from core.context_builder import estimate_tokens
+    from core.model_router import model_router
+
+    system_instruction, messages = build_request(item)
+    record = {"id": item.get("id"), "model": model_name, "agent_id": item["agent_id"], "lang": item["lang"]}
+    started = time.perf_counter()
+    try:
+        model = model_router.get_model(model_name, system_instruction)
+        response = model.generate_content(messages, generation_config=generation_config, stream=stream)
+        chunks = response if stream else [response]
+
+        text = ""
+        ttft_ms = None
+        usage = None
+        for chunk in chunks:
+            piece = chunk.text if chunk.candidates and chunk.candidates[0].content.parts else ""
+            if piece and ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started) * 1000
+            text += piece
+            usage = getattr(chunk, "usage_metadata", None) or usage
+    except Exception as e:
+        record["error"] = str(e)[:200]
+        record["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return record
+
+    total_ms = (time.perf_counter() - started) * 1000
+    output_tokens = getattr(usage, "candidates_token_count", None) if usage else None
+    record.update({
+        "ttft_ms": round(ttft_ms, 2) if ttft_ms is not None else None,
+        "total_ms": round(total_ms, 2),
+        "output_tokens": output_tokens if output_tokens is not None else estimate_tokens(text),
+        "reply_chars": len(text),
+        "empty": not text.strip()
+    })
+    return record
+
+
+def summarize(records):
+    from core.turn_metrics import percentile
+
+    ok = [r for r in records if "error" not in r]
+    ttft = [r["ttft_ms"] for r in ok if r.get("ttft_ms") is not None]
+    total = [r["total_ms"] for r in ok]
+    tokens = [r["output_tokens"] for r in ok]
+    generation_sec = sum(
+        (r["total_ms"] - r["ttft_ms"]) / 1000.0 for r in ok if r.get("ttft_ms") is not None
+    )
+    return {
+        "requests": len(records),
+        "errors": len(records) - len(ok),
+        "empty": sum(1 for r in ok if r["empty"]),
+        "success_rate": round(len(ok) / len(records), 3) if records else 0.0,
+        "ttft_ms": {"p50": percentile(ttft, 50), "p95": percentile(ttft, 95)},
+        "total_ms": {"p50": percentile(total, 50), "p95": percentile(total, 95)},
+        "output_tokens_mean": round(sum(tokens) / len(tokens), 1) if tokens else None,
+        "reply_chars_mean": round(sum(r["reply_chars"] for r in ok) / len(ok), 1) if ok else None,
+        "tokens_per_sec": round(sum(tokens) / generation_sec, 1) if generation_sec > 0 else None
+    }
+
+
+def suggested_order(by_model):
+    """Reliable models by p95 time-to-first-token, then the rest"""
+    reliable = [m for m, s in by_model.items() if s["success_rate"] >= MIN_SUCCESS_RATE and s["ttft_ms"]["p95"] is not None]
+    reliable.sort(key=lambda m: by_model[m]["ttft_ms"]["p95"])
+    return reliable + [m for m in by_model if m not in reliable]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Gemini fallback chain on a prompt corpus")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL of {agent_id, lang, user_text, history?}")
+    parser.add_argument("--backend", choices=["gemini", "mock"], default="gemini")
+    parser.add_argument("--models", default=None, help="Comma-separated models (default: GEMINI_MODELS)")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per model")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight")
+    parser.add_argument("--no-stream", action="store_true", help="Unary calls (TTFT equals total latency)")
+    parser.add_argument("--temperature", type=float, default=None)
+    parser.add_argument("--max-output-tokens", type=int, default=None)
+    parser.add_argument("--top-p", type=float, default=None)
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--mock-ttft-ms", type=float, default=400.0, help="Mock backend: time to first chunk")
+    parser.add_argument("--mock-chunk-ms", type=float, default=40.0, help="Mock backend: gap between chunks")
+    parser.add_argument("--output", help="Write results and summary as JSON")
+    args = parser.parse_args()
+
+    if args.backend == "mock":
+        offline_environment()
+
+    import google.generativeai as genai
+    from core.llm import LLMHandler
+    from core.model_router import DEFAULT_MODELS, model_router
+    from google.generativeai.types import GenerationConfig
+
+    if args.backend == "mock":
+        FixtureGenerativeModel.store = FixtureStore(
+            default_latency_ms={"llm": args.mock_ttft_ms, "llm_chunk": args.mock_chunk_ms}
+        )
+        genai.GenerativeModel = FixtureGenerativeModel
+        model_router.clear()
+
+    defaults = LLMHandler().generation_config
+    generation_config = GenerationConfig(
+        temperature=args.temperature if args.temperature is not None else defaults.temperature,
+        max_output_tokens=args.max_output_tokens or defaults.max_output_tokens,
+        top_p=args.top_p if args.top_p is not None else defaults.top_p,
+        top_k=args.top_k if args.top_k is not None else defaults.top_k
+    )
+    models = [m.strip() for m in args.models.split(",") if m.strip()] if args.models else DEFAULT_MODELS
+    corpus = load_corpus(args.corpus)
+    jobs = [(model, item) for model in models for _ in range(args.repeat) for item in corpus]
+    print(f"🧪 {len(jobs)} requests: {len(corpus)} prompts x {args.repeat} pass(es) x {len(models)} model(s) "
+          f"on {args.backend}")
+
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        records = list(pool.map(
+            lambda job: run_one(job[0], job[1], generation_config, not args.no_stream), jobs
+        ))
+
+    grouped = defaultdict(list)
+    for record in records:
+        grouped[record["model"]].append(record)
+    by_model = {model: summarize(grouped[model]) for model in models}
+
+    breakdown = defaultdict(list)
+    for record in records:
+        breakdown[f'{record["model"]}/{record["agent_id"]}/{record["lang"]}'].append(record)
+
+    report = {
+        "backend": args.backend,
+        "generation_config": {
+            "temperature": generation_config.temperature,
+            "max_output_tokens": generation_config.max_output_tokens,
+            "top_p": generation_config.top_p,
+            "top_k": generation_config.top_k
+        },
+        "stream": not args.no_stream,
+        "models": by_model,
+        "breakdown": {key: summarize(group) for key, group in sorted(breakdown.items())},
+        "suggested_models": suggested_order(by_model)
+    }
+
+    print(json.dumps({k: report[k] for k in ("generation_config", "models", "suggested_models")},
+                     indent=2, ensure_ascii=False))
+    print(f"💡 GEMINI_MODELS={','.join(report['suggested_models'])}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({**report, "results": records}, fh, indent=2, ensure_ascii=False)
+        print(f"💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
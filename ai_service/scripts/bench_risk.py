@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Risk classification benchmark: accuracy and latency per stage
+
+Runs a labeled multilingual test set through the pattern stage, the Gemini
+stage on its own, and the combined RiskClassifier.classify (patterns, local
+model, then Gemini). Each stage reports per-class precision/recall, the
+false-negative rate on high (and on medium-or-above), latency percentiles
+and, for the combined path, the share of texts that needed a Gemini call.
+Results are broken down by language, with the rate of Gemini replies that
+were not a valid verdict.
+
+The Gemini stage can run against real Gemini, the stand-in server
+(GEMINI_API_ENDPOINT, see gemini_standin.py), or recorded verdicts. --record
+saves Gemini verdicts in the session-recording format, and --backend fixture
+replays them with their latency.
+
+Usage:
+    # pattern stage only (no network)
+    python scripts/bench_risk.py --stages pattern
+
+    # Gemini, recording the verdicts; then replay them offline
+    python scripts/bench_risk.py --record risk_verdicts.jsonl
+    python scripts/bench_risk.py --backend fixture --fixture risk_verdicts.jsonl
+
+    # a GenerationConfig variant with the local model in front
+    RISK_CLASSIFIER_PATH=models/risk.npz python scripts/bench_risk.py \\
+        --temperature 0 --max-output-tokens 80 --output risk_bench.json
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from upstream_fixtures import AI_SERVICE_DIR, FixtureGenerativeModel, FixtureStore, offline_environment
+
+DEFAULT_DATASET = os.path.join(AI_SERVICE_DIR, "scripts", "data", "risk_bench.jsonl")
+LEVELS = ["none", "low", "medium", "high"]
+STAGES = ["pattern", "llm", "combined"]
+
+
+def load_jsonl(path):
+    with open(path, "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def run_one(stage, item, classifier):
+    """One timed classification; returns its measurement record"""
+    record = {"id": item.get("id"), "lang": item.get("lang"), "label": item["label"], "stage": stage}
+    started = time.perf_counter()
+    try:
+        if stage == "pattern":
+            result = classifier._quick_pattern_check(item["text"])
+        elif stage == "llm":
+            result = classifier.classify_llm(item["text"], classifier._quick_pattern_check(item["text"]))
+        else:
+            result = classifier.classify(item["text"])
+    except Exception as e:
+        record["error"] = str(e)[:200]
+        record["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return record
+
+    record.update({
+        "predicted": result["risk_level"],
+        "reason": result.get("reason"),
+        "source": result.get("source", "pattern" if stage == "pattern" else None),
+        "latency_ms": round((time.perf_counter() - started) * 1000, 3)
+    })
+    if stage == "llm" and record["source"] != "llm":
+        # No model answered; the verdict is the pattern fallback
+        record["fallback"] = True
+    return record
+
+
+def summarize(records):
+    from core.turn_metrics import percentile
+
+    ok = [r for r in records if "error" not in r]
+    counts = {level: {"tp": 0, "fp": 0, "fn": 0} for level in LEVELS}
+    for r in ok:
+        if r["predicted"] == r["label"]:
+            counts[r["label"]]["tp"] += 1
+        else:
+            counts[r["predicted"]]["fp"] += 1
+            counts[r["label"]]["fn"] += 1
+
+    per_class = {}
+    for level, c in counts.items():
+        support = c["tp"] + c["fn"]
+        per_class[level] = {
+            "support": support,
+            "precision": round(c["tp"] / (c["tp"] + c["fp"]), 3) if c["tp"] + c["fp"] else None,
+            "recall": round(c["tp"] / support, 3) if support else None
+        }
+
+    high = [r for r in ok if r["label"] == "high"]
+    serious = [r for r in ok if LEVELS.index(r["label"]) >= LEVELS.index("medium")]
+    latency = [r["latency_ms"] for r in ok]
+    return {
+        "items": len(records),
+        "errors": len(records) - len(ok),
+        "accuracy": round(sum(1 for r in ok if r["predicted"] == r["label"]) / len(ok), 3) if ok else None,
+        "per_class": per_class,
+        # Missed crises: high predicted below high, and medium/high predicted below medium
+        "high_false_negative_rate": round(
+            sum(1 for r in high if r["predicted"] != "high") / len(high), 3) if high else None,
+        "serious_false_negative_rate": round(
+            sum(1 for r in serious if LEVELS.index(r["predicted"]) < LEVELS.index("medium")) / len(serious), 3
+        ) if serious else None,
+        "latency_ms": {
+            "p50": percentile(latency, 50), "p95": percentile(latency, 95), "p99": percentile(latency, 99)
+        },
+        "llm_share": round(sum(1 for r in ok if r.get("source") == "llm") / len(ok), 3) if ok else None,
+        "fallbacks": sum(1 for r in ok if r.get("fallback"))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark risk classification accuracy and latency")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="JSONL of {id, lang, label, text}")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated: {', '.join(STAGES)}")
+    parser.add_argument("--backend", choices=["gemini", "fixture"], default="gemini",
+                        help="Gemini (or the stand-in via GEMINI_API_ENDPOINT), or recorded verdicts")
+    parser.add_argument("--fixture", help="Fixture backend: JSONL of recorded risk verdicts (--record output "
+                                          "or a session recording)")
+    parser.add_argument("--record", help="Write the Gemini stage's verdicts as fixture JSONL")
+    parser.add_argument("--models", default=None, help="Comma-separated risk models (default: GEMINI_RISK_MODELS)")
+    parser.add_argument("--temperature", type=float, default=None)
+    parser.add_argument("--max-output-tokens", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=1, help="Classifications in flight")
+    parser.add_argument("--output", help="Write results and summary as JSON")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    if args.backend == "fixture":
+        if not args.fixture:
+            parser.error("--backend fixture needs --fixture")
+        # Recorded verdicts have no quota to protect; the limiter would only add waits
+        offline_environment(GEMINI_RATE_LIMIT_RPM="0")
+
+    import google.generativeai as genai
+    import core.risk as risk
+    from core.model_router import model_router
+
+    if args.backend == "fixture":
+        events = [e for e in load_jsonl(args.fixture) if e.get("stage") == "risk"]
+        # Each replayed verdict is used once, so every stage that calls Gemini gets its own copy
+        FixtureGenerativeModel.store = FixtureStore(events * sum(1 for s in stages if s != "pattern"))
+        genai.GenerativeModel = FixtureGenerativeModel
+        model_router.clear()
+    if args.models:
+        risk.RISK_MODELS = [m.strip() for m in args.models.split(",") if m.strip()]
+
+    classifier = risk.RiskClassifier()
+    if args.temperature is not None:
+        classifier.generation_config.temperature = args.temperature
+    if args.max_output_tokens is not None:
+        classifier.generation_config.max_output_tokens = args.max_output_tokens
+
+    dataset = load_jsonl(args.dataset)
+    print(f"🧪 {len(dataset)} labeled texts x {len(stages)} stage(s) on {args.backend}"
+          f" (local model: {'yes' if classifier.local_model else 'no'})")
+
+    records = []
+    for stage in stages:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            records.extend(pool.map(lambda item: run_one(stage, item, classifier), dataset))
+
+    by_stage = {stage: summarize([r for r in records if r["stage"] == stage]) for stage in stages}
+    breakdown = defaultdict(list)
+    for record in records:
+        breakdown[f'{record["stage"]}/{record["lang"]}'].append(record)
+
+    report = {
+        "backend": args.backend,
+        "models": risk.RISK_MODELS,
+        "generation_config": {
+            "temperature": classifier.generation_config.temperature,
+            "max_output_tokens": classifier.generation_config.max_output_tokens,
+            "structured_output": risk.RISK_STRUCTURED_OUTPUT
+        },
+        "local_model": classifier.local_model is not None,
+        "stages": by_stage,
+        "parse": classifier.get_stats()["parse"],
+        "breakdown": {key: summarize(group) for key, group in sorted(breakdown.items())}
+    }
+
+    for stage, summary in by_stage.items():
+        recalls = ", ".join(f"{level} {c['recall']}" for level, c in summary["per_class"].items())
+        print(f"📊 {stage:<9} acc {summary['accuracy']}  high FN {summary['high_false_negative_rate']}  "
+              f"p50/p95 {summary['latency_ms']['p50']}/{summary['latency_ms']['p95']}ms  "
+              f"LLM share {summary['llm_share']}  recall: {recalls}")
+    parse = report["parse"]
+    if parse["responses"]:
+        print(f"🧾 Gemini verdicts: {parse['responses']} read, parse failure rate {parse['failure_rate']} "
+              f"({parse['recovered']} recovered on retry, {parse['fallbacks']} pattern fallbacks), "
+              f"{parse['output_tokens_mean']} output tokens on average")
+
+    if args.record:
+        texts = {item.get("id"): item["text"] for item in dataset}
+        with open(args.record, "w", encoding="utf-8") as fh:
+            for r in records:
+                if r["stage"] == "llm" and r.get("source") == "llm":
+                    fh.write(json.dumps({
+                        "kind": "upstream", "stage": "risk", "latency_ms": r["latency_ms"], "text": texts[r["id"]],
+                        "result": {"risk_level": r["predicted"], "reason": r["reason"], "urgent": r["predicted"] == "high"}
+                    }, ensure_ascii=False) + "\n")
+        print(f"📼 Gemini verdicts recorded to {args.record}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({**report, "results": records}, fh, indent=2, ensure_ascii=False)
+        print(f"💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
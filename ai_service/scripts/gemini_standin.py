@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Gemini-compatible stand-in server for offline performance testing
+
+Serves the REST surface google-generativeai uses (models list,
+generateContent, streamGenerateContent). The real client code in core/llm.py,
+core/risk.py and the backend summary can therefore run against it without
+network or quota. Select it with GEMINI_API_ENDPOINT=http://127.0.0.1:8090.
+
+- Latency: time to first chunk is lognormal around --ttft-ms (--jitter is the
+  sigma, 0 = fixed), then --chunk-ms between streamed chunks. --model-latency
+  overrides the median per model.
+- Injected errors: quota (429), server errors (500), safety blocks and empty
+  candidates, each at a configurable rate, and cut-off JSON in risk verdicts
+  (--malformed-json-rate).
+- Deterministic replies: the same request gets the same reply. Risk prompts
+  are answered with the service's own pattern verdict as JSON (only the
+  schema fields when responseMimeType is JSON), summary prompts with a
+  summary in the expected format.
+
+Usage:
+    python scripts/gemini_standin.py --port 8090 --ttft-ms 400 --jitter 0.3 \\
+        --model-latency gemini-2.0-flash-lite=250 --quota-error-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+from collections import defaultdict
+
+from upstream_fixtures import DEFAULT_REPLIES
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MODELS = ["gemini-2.0-flash", "gemini-2.0-flash-lite", "gemini-1.5-flash", "gemini-pro", "gemini-2.5-flash"]
+
+REPLIES_BY_SCRIPT = {
+    "latin": DEFAULT_REPLIES,
+    "devanagari": [
+        "यह सच में मुश्किल लग रहा है। अभी सबसे ज़्यादा भारी क्या लग रहा है?",
+        "मुझसे साझा करने के लिए धन्यवाद। चलिए साथ मिलकर एक छोटा कदम उठाते हैं।",
+        "ऐसा महसूस करना स्वाभाविक है। क्या आप मुझे थोड़ा और बता सकते हैं?"
+    ],
+    "tamil": [
+        "இது உண்மையில் கடினமாக இருக்கிறது. இப்போது எது அதிகம் பாரமாக இருக்கிறது?",
+        "என்னுடன் பகிர்ந்ததற்கு நன்றி. ஒன்றாக ஒரு சிறிய அடி எடுப்போம்.",
+        "நீங்கள் இப்படி உணர்வது இயல்பானது. இன்னும் கொஞ்சம் சொல்ல முடியுமா?"
+    ]
+}
+
+SUMMARY_REPLY = """**Main Themes:**
+- Academic pressure
+- Sleep difficulties
+- Self-criticism
+
+**Key Insights:**
+- Stress peaks before deadlines
+- Support from friends helps
+- Small routines improve mood
+
+**Action Items:**
+- Practice a nightly wind-down routine
+- Break study sessions into short blocks
+- Note one positive moment each day
+
+**Next Session Goals:**
+- Review the sleep routine
+- Explore self-compassion exercises
+- Plan for the upcoming exam week"""
+
+_RISK_PROMPT_PREFIX = "Analyze the following user message for mental health risk"
+_RISK_MESSAGE_RE = re.compile(r'Message: "(.*)"', re.DOTALL)
+_SUMMARY_MARKER = "Analyze the following therapy session notes"
+
+
+def _script(text):
+    if re.search(r"[\u0900-\u097F]", text):
+        return "devanagari"
+    if re.search(r"[\u0B80-\u0BFF]", text):
+        return "tamil"
+    return "latin"
+
+
+def _digest(*parts):
+    return int(hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest(), 16)
+
+
+def _tokens(text):
+    from core.context_builder import estimate_tokens
+    return estimate_tokens(text)
+
+
+def _texts(content):
+    return [part.get("text", "") for part in (content or {}).get("parts", []) if isinstance(part, dict)]
+
+
+class StandIn:
+    """Reply, latency and error decisions for one server"""
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.model_latency = {}
+        for item in args.model_latency or []:
+            name, _, value = item.partition("=")
+            self.model_latency[name.strip()] = float(value)
+        self.stats = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def count(self, model, key):
+        with self._lock:
+            self.stats[model][key] += 1
+
+    def ttft_seconds(self, model):
+        median = self.model_latency.get(model, self.args.ttft_ms)
+        with self._lock:
+            factor = math.exp(self.rng.gauss(0.0, self.args.jitter)) if self.args.jitter > 0 else 1.0
+        return median * factor / 1000.0
+
+    def injected(self):
+        """Error to inject for this request, if any"""
+        with self._lock:
+            roll = self.rng.random()
+        for name, rate in (("quota", self.args.quota_error_rate), ("server", self.args.server_error_rate),
+                           ("safety_block", self.args.safety_block_rate), ("empty", self.args.empty_rate)):
+            if roll < rate:
+                return name
+            roll -= rate
+        return None
+
+    def reply(self, model, body):
+        """Deterministic reply text for a generateContent body"""
+        contents = body.get("contents") or []
+        user_texts = [t for c in contents if c.get("role", "user") == "user" for t in _texts(c)]
+        last = user_texts[-1] if user_texts else ""
+
+        if last.startswith(_RISK_PROMPT_PREFIX):
+            from core.risk import RiskClassifier
+            match = _RISK_MESSAGE_RE.search(last)
+            verdict = RiskClassifier()._quick_pattern_check(match.group(1) if match else last)
+            if (body.get("generationConfig") or {}).get("responseMimeType") == "application/json":
+                verdict = {key: verdict[key] for key in ("risk_level", "reason", "urgent")}
+            reply = json.dumps(verdict)
+            with self._lock:
+                malformed = self.rng.random() < self.args.malformed_json_rate
+            if malformed:
+                self.count(model, "malformed_json")
+                return reply[:len(reply) // 2]
+            return reply
+        if _SUMMARY_MARKER in last:
+            return SUMMARY_REPLY
+
+        pool = REPLIES_BY_SCRIPT[_script(last)]
+        return pool[_digest(self.args.seed_text, last) % len(pool)]
+
+
+def _truncate(text, max_tokens):
+    """Cut a reply to max_output_tokens; returns (text, finish reason)"""
+    if not max_tokens or _tokens(text) <= max_tokens:
+        return text, "STOP"
+    words = text.split(" ")
+    while len(words) > 1 and _tokens(" ".join(words)) > max_tokens:
+        words.pop()
+    return " ".join(words), "MAX_TOKENS"
+
+
+def _chunks(text):
+    words = text.split(" ")
+    return [" ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "") for i in range(0, len(words), 4)]
+
+
+def _candidate(text, finish_reason):
+    return {"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": finish_reason, "index": 0}
+
+
+def _error(code, status, message):
+    return JSONResponse(status_code=code, content={"error": {"code": code, "status": status, "message": message}})
+
+
+def create_app(standin):
+    app = FastAPI(title="Gemini stand-in")
+
+    @app.get("/v1beta/models")
+    async def list_models():
+        return {"models": [{
+            "name": f"models/{name}",
+            "displayName": name,
+            "supportedGenerationMethods": ["generateContent", "countTokens"],
+            "inputTokenLimit": 1048576,
+            "outputTokenLimit": 8192
+        } for name in MODELS]}
+
+    @app.get("/standin/stats")
+    async def stats():
+        return {model: dict(counts) for model, counts in standin.stats.items()}
+
+    @app.post("/v1beta/models/{action:path}")
+    async def generate(action: str, request: Request):
+        model, _, method = action.partition(":")
+        if method not in ("generateContent", "streamGenerateContent"):
+            return _error(404, "NOT_FOUND", f"Method {method} is not supported by the stand-in")
+        if model not in MODELS:
+            return _error(404, "NOT_FOUND", f"models/{model} is not found for API version v1beta")
+
+        body = await request.json()
+        standin.count(model, "requests")
+        injected = standin.injected()
+        await asyncio.sleep(standin.ttft_seconds(model))
+
+        if injected == "quota":
+            standin.count(model, "quota")
+            return _error(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota).")
+        if injected == "server":
+            standin.count(model, "server_error")
+            return _error(500, "INTERNAL", "An internal error has occurred.")
+
+        chunk_count = 1
+        prompt_tokens = sum(_tokens(t) for c in body.get("contents") or [] for t in _texts(c))
+        prompt_tokens += sum(_tokens(t) for t in _texts(body.get("systemInstruction")))
+
+        if injected == "safety_block":
+            standin.count(model, "safety_block")
+            payloads = [{"promptFeedback": {"blockReason": "SAFETY"},
+                         "usageMetadata": {"promptTokenCount": prompt_tokens, "totalTokenCount": prompt_tokens}}]
+        elif injected == "empty":
+            standin.count(model, "empty")
+            payloads = [{"candidates": [{"finishReason": "OTHER", "index": 0}],
+                         "usageMetadata": {"promptTokenCount": prompt_tokens, "totalTokenCount": prompt_tokens}}]
+        else:
+            max_tokens = (body.get("generationConfig") or {}).get("maxOutputTokens")
+            text, finish_reason = _truncate(standin.reply(model, body), max_tokens)
+            chunk_count = len(_chunks(text))
+            pieces = _chunks(text) if method == "streamGenerateContent" else [text]
+            output_tokens = _tokens(text)
+            payloads = []
+            for index, piece in enumerate(pieces):
+                last = index == len(pieces) - 1
+                payload = {"candidates": [_candidate(piece, finish_reason if last else None)]}
+                if not payload["candidates"][0]["finishReason"]:
+                    del payload["candidates"][0]["finishReason"]
+                if last:
+                    payload["usageMetadata"] = {
+                        "promptTokenCount": prompt_tokens,
+                        "candidatesTokenCount": output_tokens,
+                        "totalTokenCount": prompt_tokens + output_tokens
+                    }
+                payloads.append(payload)
+
+        if method == "generateContent":
+            # Unary calls wait for the whole reply to be generated
+            await asyncio.sleep(standin.args.chunk_ms * (chunk_count - 1) / 1000.0)
+            return payloads[0]
+
+        async def stream():
+            # The REST transport reads a streamed JSON array
+            yield "["
+            for index, payload in enumerate(payloads):
+                if index:
+                    await asyncio.sleep(standin.args.chunk_ms / 1000.0)
+                    yield ",\n"
+                yield json.dumps(payload, ensure_ascii=False)
+            yield "]"
+
+        return StreamingResponse(stream(), media_type="application/json")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Gemini-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--ttft-ms", type=float, default=400.0, help="Median time to first chunk")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Lognormal sigma of the first-chunk latency")
+    parser.add_argument("--chunk-ms", type=float, default=40.0, help="Gap between streamed chunks")
+    parser.add_argument("--model-latency", action="append", metavar="MODEL=MS",
+                        help="Per-model median first-chunk latency (repeatable)")
+    parser.add_argument("--quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--safety-block-rate", type=float, default=0.0)
+    parser.add_argument("--empty-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-json-rate", type=float, default=0.0,
+                        help="Share of risk verdicts cut off mid-JSON")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for latency and error injection")
+    args = parser.parse_args()
+    args.seed_text = str(args.seed)
+
+    import uvicorn
+
+    print(f"🧪 Gemini stand-in on http://{args.host}:{args.port} (ttft {args.ttft_ms}ms, jitter {args.jitter}, "
+          f"chunk {args.chunk_ms}ms) - set GEMINI_API_ENDPOINT=http://{args.host}:{args.port}")
+    uvicorn.run(create_app(StandIn(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Concurrent voice-session load generator
+
+Opens N simultaneous /ws/voice/{session_id} connections against an instance
+running in DEMO_MODE, each following a scripted conversation (audio chunks,
+user_utterance_end, occasional barge_in). Reports connect-to-greeting,
+utterance-end-to-first-audio and turn completion as p50/p95/p99 together with
+server CPU and RSS sampled from /stats/process.
+
+Usage:
+    # against a local instance with stubbed upstreams (started for you)
+    python scripts/load_test.py --spawn --sweep 5,10,20,40 --turns 3
+
+    # against an already running DEMO_MODE instance
+    python scripts/load_test.py --url http://127.0.0.1:8001 --sessions 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+import requests
+import websockets
+
+from upstream_fixtures import AI_SERVICE_DIR
+from core.turn_metrics import percentile
+
+AGENTS = ["alice_johnson_academic", "carol_white_relationships", "eve_black_career"]
+LANGS = ["en-IN", "hi-IN", "ta-IN"]
+
+
+def _pcts(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99)
+    }
+
+
+async def _receive_until(ws, types, timeout, on_message=None):
+    """Read messages until one whose type is in types; return that message"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise asyncio.TimeoutError(f"waiting for {sorted(types)}")
+        message = json.loads(await asyncio.wait_for(ws.recv(), timeout=remaining))
+        if on_message:
+            on_message(message)
+        if message.get("type") in types:
+            return message
+
+
+async def run_client(index: int, args, rng: random.Random, results: dict):
+    """One scripted voice session"""
+    session_id = f"load-{uuid.uuid4().hex[:12]}"
+    ws_url = args.url.replace("http://", "ws://").replace("https://", "wss://")
+
+    try:
+        connect_start = time.perf_counter()
+        async with websockets.connect(f"{ws_url}/ws/voice/{session_id}", max_size=None) as ws:
+            await _receive_until(ws, {"connection_ready"}, args.timeout)
+            await ws.send(json.dumps({
+                "agent_id": AGENTS[index % len(AGENTS)],
+                "lang": LANGS[index % len(LANGS)] if args.mixed_langs else "en-IN"
+            }))
+
+            greeting = {}
+
+            def on_greeting(message):
+                if message.get("type") == "ai_audio_chunk" and "first_audio" not in greeting:
+                    greeting["first_audio"] = time.perf_counter()
+
+            await _receive_until(ws, {"tts_complete", "error"}, args.timeout, on_greeting)
+            if "first_audio" in greeting:
+                results["connect_to_greeting_ms"].append((greeting["first_audio"] - connect_start) * 1000)
+
+            for _ in range(args.turns):
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_time)
+
+                # Stream the utterance as a sequence of audio chunks
+                for _ in range(args.chunks):
+                    await ws.send(os.urandom(args.chunk_bytes))
+                    await asyncio.sleep(args.chunk_interval)
+
+                utterance_end = time.perf_counter()
+                await ws.send(json.dumps({"type": "user_utterance_end"}))
+
+                turn = {"barge_in": rng.random() < args.barge_in_rate}
+
+                def track(message):
+                    message_type = message.get("type")
+                    if message_type == "ai_audio_chunk" and "first_audio" not in turn:
+                        turn["first_audio"] = time.perf_counter()
+                    elif message_type == "error":
+                        turn["error"] = message.get("message")
+
+                if turn["barge_in"]:
+                    await _receive_until(ws, {"ai_audio_chunk", "error"}, args.timeout, track)
+                    await ws.send(json.dumps({"type": "barge_in"}))
+                    results["barge_ins"] += 1
+                    await _receive_until(ws, {"stop_tts"}, args.timeout, track)
+                else:
+                    await _receive_until(ws, {"tts_complete", "error"}, args.timeout, track)
+
+                done = time.perf_counter()
+                if turn.get("error"):
+                    results["turn_errors"] += 1
+                    continue
+                if "first_audio" in turn:
+                    results["utterance_to_first_audio_ms"].append((turn["first_audio"] - utterance_end) * 1000)
+                if not turn["barge_in"]:
+                    results["turn_completion_ms"].append((done - utterance_end) * 1000)
+
+            await ws.send(json.dumps({"type": "end_session"}))
+            try:
+                await _receive_until(ws, {"session_ended"}, 5)
+            except (asyncio.TimeoutError, websockets.ConnectionClosed):
+                pass
+
+        results["sessions_completed"] += 1
+
+    except Exception as e:
+        results["session_errors"] += 1
+        results["error_samples"].append(f"{type(e).__name__}: {e}")
+
+
+def _fetch_process_stats(base_url: str):
+    try:
+        return requests.get(f"{base_url}/stats/process", timeout=2).json()
+    except Exception:
+        return None
+
+
+async def sample_server(base_url: str, stop: asyncio.Event, samples: list, interval: float):
+    """Sample server CPU time and RSS until stopped"""
+    while not stop.is_set():
+        stats = await asyncio.to_thread(_fetch_process_stats, base_url)
+        if stats:
+            samples.append((time.perf_counter(), stats))
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _server_usage(samples):
+    if len(samples) < 2:
+        return {}
+    cpu_percents = []
+    for (t0, s0), (t1, s1) in zip(samples, samples[1:]):
+        cpu = (s1["cpu_user_sec"] + s1["cpu_system_sec"]) - (s0["cpu_user_sec"] + s0["cpu_system_sec"])
+        cpu_percents.append(100.0 * cpu / max(t1 - t0, 1e-6))
+    rss = [s["rss_kb"] for _, s in samples if s.get("rss_kb")]
+    return {
+        "cpu_percent_avg": round(sum(cpu_percents) / len(cpu_percents), 1),
+        "cpu_percent_peak": round(max(cpu_percents), 1),
+        "rss_mb_start": round(rss[0] / 1024, 1) if rss else None,
+        "rss_mb_peak": round(max(rss) / 1024, 1) if rss else None,
+        "rss_mb_end": round(rss[-1] / 1024, 1) if rss else None
+    }
+
+
+async def run_level(sessions: int, args) -> dict:
+    """Run one concurrency level and summarize it"""
+    rng = random.Random(args.seed + sessions)
+    results = {
+        "connect_to_greeting_ms": [],
+        "utterance_to_first_audio_ms": [],
+        "turn_completion_ms": [],
+        "sessions_completed": 0,
+        "session_errors": 0,
+        "turn_errors": 0,
+        "barge_ins": 0,
+        "error_samples": []
+    }
+
+    stop = asyncio.Event()
+    samples = []
+    sampler = asyncio.create_task(sample_server(args.url, stop, samples, args.sample_interval))
+
+    started = time.perf_counter()
+    clients = []
+    for i in range(sessions):
+        clients.append(asyncio.create_task(run_client(i, args, random.Random(rng.random()), results)))
+        if args.ramp > 0:
+            await asyncio.sleep(args.ramp / sessions)
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await sampler
+
+    summary = {
+        "sessions": sessions,
+        "duration_sec": round(elapsed, 2),
+        "sessions_completed": results["sessions_completed"],
+        "session_errors": results["session_errors"],
+        "turn_errors": results["turn_errors"],
+        "barge_ins": results["barge_ins"],
+        "connect_to_greeting_ms": _pcts(results["connect_to_greeting_ms"]),
+        "utterance_to_first_audio_ms": _pcts(results["utterance_to_first_audio_ms"]),
+        "turn_completion_ms": _pcts(results["turn_completion_ms"]),
+        "server": _server_usage(samples),
+        "error_samples": results["error_samples"][:5]
+    }
+
+    first_audio_p95 = summary["utterance_to_first_audio_ms"]["p95"]
+    summary["saturated"] = bool(
+        results["session_errors"]
+        or (first_audio_p95 is not None and first_audio_p95 > args.slo_ms)
+        or summary["server"].get("cpu_percent_avg", 0) >= args.cpu_saturation
+    )
+    return summary
+
+
+def spawn_stub_server(args):
+    """Start scripts/stub_server.py and wait until it answers /health"""
+    port = args.url.rsplit(":", 1)[-1].strip("/")
+    command = [
+        sys.executable, os.path.join(AI_SERVICE_DIR, "scripts", "stub_server.py"),
+        "--port", port,
+        "--stt-ms", str(args.stt_ms), "--risk-ms", str(args.risk_ms),
+        "--llm-ms", str(args.llm_ms), "--tts-ms", str(args.tts_ms)
+    ]
+    if args.gemini_endpoint:
+        command += ["--gemini-endpoint", args.gemini_endpoint]
+    process = subprocess.Popen(command, cwd=AI_SERVICE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{args.url}/health", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("stub server exited during startup")
+        time.sleep(0.5)
+
+    process.terminate()
+    raise RuntimeError("stub server did not become healthy")
+
+
+def _print_level(level):
+    def fmt(m):
+        return f"p50={m['p50'] and round(m['p50'])} p95={m['p95'] and round(m['p95'])} p99={m['p99'] and round(m['p99'])}"
+    server = level["server"]
+    print(f"\n👥 {level['sessions']} sessions ({level['sessions_completed']} ok, "
+          f"{level['session_errors']} failed, {level['turn_errors']} turn errors)"
+          f"{'  ⚠️ SATURATED' if level['saturated'] else ''}")
+    print(f"   connect→greeting      {fmt(level['connect_to_greeting_ms'])} ms")
+    print(f"   utterance→first audio {fmt(level['utterance_to_first_audio_ms'])} ms")
+    print(f"   turn completion       {fmt(level['turn_completion_ms'])} ms")
+    if server:
+        print(f"   server cpu avg={server['cpu_percent_avg']}% peak={server['cpu_percent_peak']}%  "
+              f"rss peak={server['rss_mb_peak']} MB")
+
+
+async def main_async(args):
+    levels = [int(n) for n in args.sweep.split(",")] if args.sweep else [args.sessions]
+    report = {"url": args.url, "levels": []}
+
+    for sessions in levels:
+        level = await run_level(sessions, args)
+        report["levels"].append(level)
+        _print_level(level)
+        if level["saturated"] and args.stop_on_saturation:
+            break
+
+    saturated = [level["sessions"] for level in report["levels"] if level["saturated"]]
+    report["saturation_sessions"] = saturated[0] if saturated else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent voice-session load generator")
+    parser.add_argument("--url", default="http://127.0.0.1:8011", help="Base URL of the AI service")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent sessions")
+    parser.add_argument("--sweep", help="Comma-separated session counts to run in turn, e.g. 5,10,20,40")
+    parser.add_argument("--turns", type=int, default=3, help="Utterances per session")
+    parser.add_argument("--chunks", type=int, default=8, help="Audio chunks per utterance")
+    parser.add_argument("--chunk-bytes", type=int, default=4000)
+    parser.add_argument("--chunk-interval", type=float, default=0.1, help="Seconds between audio chunks")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean pause before each utterance (s)")
+    parser.add_argument("--barge-in-rate", type=float, default=0.1, help="Probability a turn is interrupted")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which sessions are opened")
+    parser.add_argument("--mixed-langs", action="store_true", help="Rotate en-IN / hi-IN / ta-IN sessions")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-step receive timeout (s)")
+    parser.add_argument("--slo-ms", type=float, default=2500.0,
+                        help="p95 utterance→first audio above this marks the level saturated")
+    parser.add_argument("--cpu-saturation", type=float, default=90.0,
+                        help="Average server CPU%% at or above this marks the level saturated")
+    parser.add_argument("--stop-on-saturation", action="store_true")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--spawn", action="store_true", help="Start a local stubbed-upstream instance")
+    parser.add_argument("--stt-ms", type=float, default=300.0)
+    parser.add_argument("--risk-ms", type=float, default=250.0)
+    parser.add_argument("--llm-ms", type=float, default=600.0)
+    parser.add_argument("--tts-ms", type=float, default=150.0)
+    parser.add_argument("--gemini-endpoint", help="With --spawn: real Gemini client against this endpoint")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    process = spawn_stub_server(args) if args.spawn else None
+    try:
+        report = asyncio.run(main_async(args))
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\n📊 Load test report written to {args.output}")
+
+    if report["saturation_sessions"]:
+        print(f"\n🔥 Worker saturated at {report['saturation_sessions']} concurrent sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Deterministic replay of recorded voice sessions for pipeline benchmarking
+
+Drives WebSocketVoiceHandler through FastAPI's test client with the inbound
+frames of a recording (see core/session_recorder.py), serving STT, LLM and
+TTS from the recorded upstream fixtures. Prints per-turn stage latency and
+process CPU so releases can be compared on identical traffic offline.
+
+Usage:
+    python scripts/replay_session.py recordings/*.jsonl --speed 4 --output replay.json
+"""
+import argparse
+import base64
+import json
+import time
+import sys
+
+from upstream_fixtures import FixtureStore, install_fixtures, offline_environment
+
+TURN_END_TYPES = {"tts_complete", "error"}
+
+
+def _drain(ws, until_types, timings, started):
+    """Receive server messages until one of until_types, noting first audio"""
+    while True:
+        message = ws.receive_json()
+        message_type = message.get("type")
+        if message_type == "ai_audio_chunk" and "first_audio_ms" not in timings:
+            timings["first_audio_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if message_type in until_types:
+            timings["end_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            timings["end_type"] = message_type
+            return message
+
+
+def replay_recording(client, ws_handler, recording, speed: float):
+    """Replay one recording and return client- and server-side turn timings"""
+    header = recording.get("header") or {}
+    session_id = f"{header.get('session_id', 'session')}-replay-{int(time.time() * 1000)}"
+    client_turns = []
+
+    with client.websocket_connect(f"/ws/voice/{session_id}") as ws:
+        ws.receive_json()  # connection_ready
+        replay_start = time.perf_counter()
+        greeting = {}
+
+        for event in recording["inbound"]:
+            if speed > 0:
+                delay = replay_start + event["t"] / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            if event["kind"] == "inbound_binary":
+                ws.send_bytes(base64.b64decode(event["data"]))
+                continue
+
+            frame = event["frame"]
+            frame_type = frame.get("type")
+            sent_at = time.perf_counter()
+            ws.send_json(frame)
+
+            if frame_type in (None, "init") and not greeting:
+                # Init frame: connection_established, then the greeting
+                _drain(ws, {"connection_established", "error"}, greeting, sent_at)
+                greeting["established_ms"] = greeting.pop("end_ms")
+                _drain(ws, TURN_END_TYPES, greeting, sent_at)
+            elif frame_type in ("user_utterance_end", "no_speech_detected"):
+                timings = {"type": frame_type}
+                _drain(ws, TURN_END_TYPES, timings, sent_at)
+                client_turns.append(timings)
+            elif frame_type == "barge_in":
+                _drain(ws, {"stop_tts", "error"}, {}, sent_at)
+            elif frame_type == "end_session":
+                _drain(ws, {"session_ended", "error"}, {}, sent_at)
+                break
+
+    server_turns = [t for t in ws_handler.turn_history.recent() if t["session_id"] == session_id]
+    return {
+        "source_session": header.get("session_id"),
+        "replay_session": session_id,
+        "greeting": greeting,
+        "client_turns": client_turns,
+        "server_turns": server_turns,
+        "recorded_turns": recording.get("turns", [])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded voice sessions against the local pipeline")
+    parser.add_argument("recordings", nargs="+", help="Session recording files (JSONL)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Inbound frame pacing: 1 = real time, 4 = 4x faster, 0 = as fast as possible")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiplier on recorded upstream latency (0 = instant upstreams)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    offline_environment()
+
+    from fastapi.testclient import TestClient
+    from core.session_recorder import load_recording
+    from core.turn_metrics import summarize_turns
+    import main as service
+
+    results = []
+    with TestClient(service.app) as client:
+        for path in args.recordings:
+            recording = load_recording(path)
+            store = FixtureStore(recording["upstream"], latency_scale=args.latency_scale)
+            install_fixtures(store)
+            result = replay_recording(client, service.ws_handler, recording, args.speed)
+            result["recording"] = path
+            result["fixtures"] = store.stats()
+            results.append(result)
+
+    all_server_turns = [t for r in results for t in r["server_turns"]]
+    all_recorded_turns = [t for r in results for t in r["recorded_turns"]]
+    report = {
+        "speed": args.speed,
+        "latency_scale": args.latency_scale,
+        "sessions": results,
+        "summary": summarize_turns(all_server_turns),
+        "recorded_summary": summarize_turns(all_recorded_turns)
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(output)
+        print(f"📊 Replay report written to {args.output}")
+    else:
+        print(output)
+
+    for name, stage in report["summary"]["stages"].items():
+        cpu = f" process cpu p50={stage['process_cpu_ms']['p50']}ms" if "process_cpu_ms" in stage else ""
+        print(f"  {name:>6}: wall p50={stage['wall_ms']['p50']}ms p95={stage['wall_ms']['p95']}ms{cpu}",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
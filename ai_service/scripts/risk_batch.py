@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Batch risk classification for transcript audits
+
+Input is NDJSON or a JSON array of texts or {"id": ..., "text": ...}
+objects (files, or - for stdin). Patterns and the local risk model run over
+the whole batch first; the remaining texts go to Gemini with bounded
+concurrency at audit priority. Results are written as NDJSON as they
+complete, and a summary goes to stderr.
+
+Usage:
+    # in-process
+    python scripts/risk_batch.py transcripts.ndjson --output verdicts.ndjson
+
+    # against a running service (POST /risk-classify/batch)
+    python scripts/risk_batch.py transcripts.ndjson --url http://localhost:8001 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import sys
+import os
+
+AI_SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AI_SERVICE_DIR not in sys.path:
+    sys.path.insert(0, AI_SERVICE_DIR)
+
+
+def read_inputs(paths):
+    bodies = []
+    for path in paths:
+        if path == "-":
+            bodies.append(sys.stdin.read())
+        else:
+            with open(path, "r", encoding="utf-8") as fh:
+                bodies.append(fh.read())
+    return bodies
+
+
+def run_remote(url, body, concurrency):
+    import requests
+
+    params = {"concurrency": concurrency} if concurrency else {}
+    with requests.post(
+        f"{url.rstrip('/')}/risk-classify/batch",
+        data=body.encode("utf-8"),
+        params=params,
+        headers={"Content-Type": "application/x-ndjson"},
+        stream=True,
+        timeout=(10, None)
+    ) as response:
+        if response.status_code != 200:
+            raise SystemExit(f"❌ {response.status_code}: {response.text}")
+        for line in response.iter_lines(decode_unicode=True):
+            if line:
+                yield json.loads(line)
+
+
+async def _collect_local(items, concurrency, handle):
+    from core.risk_batch import classify_batch
+
+    async for record in classify_batch(items, concurrency):
+        handle(record)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify a batch of texts for risk")
+    parser.add_argument("inputs", nargs="+", help="NDJSON or JSON array files (- for stdin)")
+    parser.add_argument("--url", help="Service URL; classifies in-process when omitted")
+    parser.add_argument("--concurrency", type=int, help="Concurrent Gemini calls (default RISK_BATCH_CONCURRENCY)")
+    parser.add_argument("--output", help="NDJSON output path (default stdout)")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    summaries = []
+
+    def handle(record):
+        if "summary" in record:
+            summaries.append(record["summary"])
+            return
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    try:
+        for body in read_inputs(args.inputs):
+            if args.url:
+                for record in run_remote(args.url, body, args.concurrency):
+                    handle(record)
+            else:
+                from core.risk_batch import RISK_BATCH_CONCURRENCY, parse_batch
+                items = parse_batch(body)
+                asyncio.run(_collect_local(items, args.concurrency or RISK_BATCH_CONCURRENCY, handle))
+    finally:
+        if args.output:
+            out.close()
+
+    for summary in summaries:
+        print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+        if summary.get("degraded"):
+            print(f"⚠️ {summary['degraded']} item(s) got pattern-only verdicts "
+                  f"({summary.get('shed', 0)} shed by the rate limiter); re-run them", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Local AI service instance with stubbed upstreams for load testing
+
+Runs the real FastAPI app in DEMO_MODE with STT, Gemini and TTS replaced by
+synthetic fixtures (see upstream_fixtures.py) with configurable latency, so a
+single worker can be pushed to saturation without network or quota. With
+--gemini-endpoint the real Gemini client is used against a Gemini-compatible
+server such as scripts/gemini_standin.py.
+
+Usage:
+    python scripts/stub_server.py --port 8011 --llm-ms 600 --risk-ms 250
+    python scripts/stub_server.py --port 8011 --gemini-endpoint http://127.0.0.1:8090
+"""
+import argparse
+
+from upstream_fixtures import FixtureStore, install_fixtures, offline_environment
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AI service with stubbed upstreams")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--stt-ms", type=float, default=300.0, help="Simulated STT latency")
+    parser.add_argument("--risk-ms", type=float, default=250.0, help="Simulated Gemini risk latency")
+    parser.add_argument("--llm-ms", type=float, default=600.0, help="Simulated Gemini reply latency")
+    parser.add_argument("--tts-ms", type=float, default=150.0, help="Simulated TTS latency per chunk")
+    parser.add_argument("--gemini-endpoint", help="Use the real Gemini client against this endpoint")
+    args = parser.parse_args()
+
+    # Greetings are pre-rendered at startup as in production, so connect-to-greeting is realistic
+    overrides = {"PRERENDER_GREETINGS": "true"}
+    if args.gemini_endpoint:
+        overrides["GEMINI_API_ENDPOINT"] = args.gemini_endpoint
+    offline_environment(**overrides)
+
+    import uvicorn
+    import main as service
+
+    store = FixtureStore(default_latency_ms={
+        "stt": args.stt_ms,
+        "risk": args.risk_ms,
+        "llm": args.llm_ms,
+        "tts": args.tts_ms
+    })
+    install_fixtures(store, gemini=not args.gemini_endpoint)
+
+    gemini = f"gemini {args.gemini_endpoint}" if args.gemini_endpoint else f"risk {args.risk_ms}ms, llm {args.llm_ms}ms"
+    print(f"🧪 Stubbed AI service on {args.host}:{args.port} (stt {args.stt_ms}ms, {gemini}, tts {args.tts_ms}ms)")
+    uvicorn.run(service.app, host=args.host, port=args.port, log_level="warning", ws="websockets")
+
+
+if __name__ == "__main__":
+    main()
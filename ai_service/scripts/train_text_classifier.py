@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Train a hashed n-gram text classifier (core/text_classifier.py)
+
+Input is JSONL with one {"text": ..., "label": ...} object per line. The
+model is written as .npz and loaded through INTENT_CLASSIFIER_PATH (exercise
+intents) or RISK_CLASSIFIER_PATH (risk levels none/low/medium/high).
+
+Usage:
+    python scripts/train_text_classifier.py scripts/data/intent_examples.jsonl --output models/intent.npz
+    python scripts/train_text_classifier.py scripts/data/risk_examples.jsonl --output models/risk.npz
+"""
+import argparse
+import json
+import random
+import sys
+import os
+
+AI_SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AI_SERVICE_DIR not in sys.path:
+    sys.path.insert(0, AI_SERVICE_DIR)
+
+from core.text_classifier import HashedNgramClassifier
+
+
+def load_examples(paths):
+    examples = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    example = json.loads(line)
+                    examples.append((example["text"], example["label"]))
+    return examples
+
+
+def evaluate(model, examples):
+    """Accuracy and per-label precision/recall"""
+    counts = {label: {"tp": 0, "fp": 0, "fn": 0} for label in model.labels}
+    correct = 0
+    for text, label in examples:
+        predicted, _ = model.predict(text)
+        if predicted == label:
+            correct += 1
+            counts[label]["tp"] += 1
+        else:
+            counts[predicted]["fp"] += 1
+            counts[label]["fn"] += 1
+
+    per_label = {}
+    for label, c in counts.items():
+        precision = c["tp"] / (c["tp"] + c["fp"]) if c["tp"] + c["fp"] else None
+        recall = c["tp"] / (c["tp"] + c["fn"]) if c["tp"] + c["fn"] else None
+        per_label[label] = {"precision": precision, "recall": recall}
+    return {"accuracy": correct / len(examples) if examples else None, "labels": per_label}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a hashed n-gram text classifier")
+    parser.add_argument("examples", nargs="+", help="JSONL files of {text, label}")
+    parser.add_argument("--output", required=True, help="Model path (.npz)")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--n-features", type=int, default=2 ** 16)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    examples = load_examples(args.examples)
+    random.Random(args.seed).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout)) if args.holdout > 0 else len(examples)
+    train, holdout = examples[:split], examples[split:]
+
+    labels = sorted({label for _, label in examples})
+    model = HashedNgramClassifier(labels, n_features=args.n_features)
+    losses = model.fit([t for t, _ in train], [l for _, l in train], epochs=args.epochs,
+                       learning_rate=args.learning_rate, seed=args.seed)
+    print(f"🧠 Trained on {len(train)} examples ({', '.join(labels)}), final loss {losses[-1]:.4f}")
+
+    if holdout:
+        print(json.dumps({"holdout": len(holdout), **evaluate(model, holdout)}, indent=2))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    model.save(args.output)
+    print(f"💾 Model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
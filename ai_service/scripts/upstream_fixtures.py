@@ -0,0 +1,280 @@
+"""
+Upstream fixtures for offline voice pipeline runs
+Stand-ins for Google STT, Google TTS and Gemini that serve recorded (or
+synthetic) responses with recorded (or configured) latency, so the real
+WebSocketVoiceHandler code paths run without network or quota.
+"""
+from typing import Dict, List, Optional, Any
+from collections import defaultdict, deque
+from types import SimpleNamespace
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+import os
+import sys
+
+AI_SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AI_SERVICE_DIR not in sys.path:
+    sys.path.insert(0, AI_SERVICE_DIR)
+
+# Synthetic transcripts and replies used when no recorded fixture matches
+DEFAULT_TRANSCRIPTS = [
+    "I'm feeling stressed about my upcoming exams",
+    "I need help managing my anxiety",
+    "Work is really overwhelming right now",
+    "I can't sleep because I keep worrying"
+]
+
+DEFAULT_REPLIES = [
+    "That sounds really difficult. What feels heaviest right now?",
+    "Thank you for sharing that with me. Let's take one small step together.",
+    "It makes sense that you feel this way. Can you tell me a little more?",
+    "You're not alone in this. What would help you feel a bit calmer today?"
+]
+
+_RISK_MESSAGE_RE = re.compile(r'Message: "(.*)"', re.DOTALL)
+
+
+class FixtureStore:
+    """
+    Upstream responses indexed for lookup during replay
+    STT is served in recorded order; risk, LLM and TTS are matched by text
+    """
+    def __init__(self, upstream_events: Optional[List[Dict[str, Any]]] = None, latency_scale: float = 1.0,
+                 default_latency_ms: Optional[Dict[str, float]] = None):
+        self.latency_scale = latency_scale
+        # "llm" is the time to the first chunk; "llm_chunk" the gap between streamed chunks
+        self.default_latency_ms = default_latency_ms or {"stt": 0.0, "risk": 0.0, "llm": 0.0, "tts": 0.0}
+        self.stt: deque = deque()
+        self.risk: Dict[str, deque] = defaultdict(deque)
+        self.llm: Dict[str, deque] = defaultdict(deque)
+        self.tts: Dict[str, deque] = defaultdict(deque)
+        self.calls = defaultdict(int)
+        self.misses = defaultdict(int)
+        self._lock = threading.Lock()
+
+        for event in upstream_events or []:
+            stage = event.get("stage")
+            if stage == "stt":
+                self.stt.append(event)
+            elif stage == "risk":
+                self.risk[event.get("text", "")].append(event)
+            elif stage == "llm":
+                self.llm[event.get("user_text", "")].append(event)
+            elif stage == "tts":
+                self.tts[event.get("text", "")].append(event)
+
+    def _sleep(self, stage: str, event: Optional[Dict[str, Any]]):
+        latency_ms = event.get("latency_ms") if event else None
+        if latency_ms is None:
+            latency_ms = self.default_latency_ms.get(stage, 0.0)
+        delay = latency_ms * self.latency_scale / 1000.0
+        if delay > 0:
+            time.sleep(delay)
+
+    def next_stt(self) -> Optional[str]:
+        with self._lock:
+            self.calls["stt"] += 1
+            event = self.stt.popleft() if self.stt else None
+            if event is None:
+                self.misses["stt"] += 1
+        self._sleep("stt", event)
+        if event is None:
+            return DEFAULT_TRANSCRIPTS[self.calls["stt"] % len(DEFAULT_TRANSCRIPTS)]
+        return event.get("text")
+
+    def risk_for(self, text: str) -> Dict[str, Any]:
+        with self._lock:
+            self.calls["risk"] += 1
+            queue = self.risk.get(text)
+            event = queue.popleft() if queue else None
+            if event is None:
+                self.misses["risk"] += 1
+        self._sleep("risk", event)
+        if event is None:
+            return {"risk_level": "none", "reason": "fixture default", "urgent": False}
+        return event.get("result")
+
+    def reply_for(self, user_text: str) -> str:
+        with self._lock:
+            self.calls["llm"] += 1
+            queue = self.llm.get(user_text)
+            if queue:
+                event = queue.popleft()
+            else:
+                event = None
+                # Prompt construction may wrap the user text - try a containment match
+                for text, candidates in self.llm.items():
+                    if candidates and text and text in user_text:
+                        event = candidates.popleft()
+                        break
+            if event is None:
+                self.misses["llm"] += 1
+        self._sleep("llm", event)
+        if event is None:
+            digest = int(hashlib.sha1(user_text.encode("utf-8")).hexdigest(), 16)
+            return DEFAULT_REPLIES[digest % len(DEFAULT_REPLIES)]
+        return event.get("reply") or ""
+
+    def audio_for(self, text: str) -> bytes:
+        with self._lock:
+            self.calls["tts"] += 1
+            queue = self.tts.get(text)
+            event = queue[0] if queue else None
+            if queue and len(queue) > 1:
+                queue.popleft()
+            if event is None:
+                self.misses["tts"] += 1
+        self._sleep("tts", event)
+        if event and event.get("audio_base64"):
+            return base64.b64decode(event["audio_base64"])
+        size = event.get("audio_bytes") if event else len(text.encode("utf-8")) * 120
+        return b"\x00" * int(size)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": dict(self.calls), "misses": dict(self.misses)}
+
+
+# --- Google Cloud Speech stand-in -------------------------------------------
+
+class _FixtureSpeechClient:
+    def __init__(self, store: FixtureStore):
+        self._store = store
+
+    def recognize(self, config=None, audio=None):
+        text = self._store.next_stt()
+        if not text:
+            return SimpleNamespace(results=[])
+        alternative = SimpleNamespace(transcript=text, confidence=1.0)
+        return SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative])])
+
+
+def make_speech_module(store: FixtureStore) -> SimpleNamespace:
+    """Object exposing the subset of google.cloud.speech_v1 used by ws_voice"""
+    recognition_config = lambda **kwargs: SimpleNamespace(**kwargs)
+    recognition_config.AudioEncoding = SimpleNamespace(WEBM_OPUS="WEBM_OPUS", LINEAR16="LINEAR16")
+    return SimpleNamespace(
+        SpeechClient=lambda *args, **kwargs: _FixtureSpeechClient(store),
+        RecognitionAudio=lambda **kwargs: SimpleNamespace(**kwargs),
+        RecognitionConfig=recognition_config
+    )
+
+
+# --- Google Cloud Text-to-Speech stand-in -----------------------------------
+
+class _FixtureTTSClient:
+    def __init__(self, store: FixtureStore):
+        self._store = store
+
+    def synthesize_speech(self, input=None, voice=None, audio_config=None, **kwargs):
+        return SimpleNamespace(audio_content=self._store.audio_for(input.text))
+
+
+def make_tts_module(store: FixtureStore) -> SimpleNamespace:
+    """Object exposing the subset of google.cloud.texttospeech_v1 used by ws_voice"""
+    return SimpleNamespace(
+        TextToSpeechClient=lambda *args, **kwargs: _FixtureTTSClient(store),
+        SynthesisInput=lambda **kwargs: SimpleNamespace(**kwargs),
+        VoiceSelectionParams=lambda **kwargs: SimpleNamespace(**kwargs),
+        AudioConfig=lambda **kwargs: SimpleNamespace(**kwargs),
+        AudioEncoding=SimpleNamespace(MP3="MP3", LINEAR16="LINEAR16")
+    )
+
+
+# --- Gemini stand-in ---------------------------------------------------------
+
+def _make_response(text: str, usage: Optional[SimpleNamespace] = None) -> SimpleNamespace:
+    part = SimpleNamespace(text=text)
+    candidate = SimpleNamespace(content=SimpleNamespace(parts=[part]), finish_reason=1)
+    return SimpleNamespace(text=text, candidates=[candidate], prompt_feedback=None, usage_metadata=usage)
+
+
+def _usage(text: str) -> SimpleNamespace:
+    from core.context_builder import estimate_tokens
+    return SimpleNamespace(candidates_token_count=estimate_tokens(text))
+
+
+def _stream_response(text: str, chunk_delay_ms: float):
+    """Yield a reply as word-group chunks like a streamed generate_content call"""
+    words = text.split(" ")
+    pieces = [" ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "") for i in range(0, len(words), 4)]
+    for index, piece in enumerate(pieces):
+        if index and chunk_delay_ms > 0:
+            time.sleep(chunk_delay_ms / 1000.0)
+        yield _make_response(piece, _usage(text) if index == len(pieces) - 1 else None)
+
+
+def _last_user_text(contents: Any) -> str:
+    if isinstance(contents, str):
+        return contents
+    for message in reversed(list(contents)):
+        if isinstance(message, dict) and message.get("role", "user") == "user":
+            parts = message.get("parts") or [""]
+            return str(parts[-1])
+    return ""
+
+
+class FixtureGenerativeModel:
+    """Drop-in for genai.GenerativeModel serving fixture replies"""
+    store: FixtureStore = None
+
+    def __init__(self, model_name: str = "fixture", system_instruction: Optional[str] = None, **kwargs):
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        if isinstance(contents, str) and contents.startswith("Analyze the following user message for mental health risk"):
+            match = _RISK_MESSAGE_RE.search(contents)
+            result = self.store.risk_for(match.group(1) if match else contents)
+            return _make_response(json.dumps(result))
+
+        reply = self.store.reply_for(_last_user_text(contents))
+        if kwargs.get("stream"):
+            chunk_delay = self.store.default_latency_ms.get("llm_chunk", 0.0) * self.store.latency_scale
+            return _stream_response(reply, chunk_delay)
+        return _make_response(reply, _usage(reply))
+
+
+def install_fixtures(store: FixtureStore, gemini: bool = True):
+    """
+    Route the voice handler's upstream clients to the fixture store
+    Must be called after core.ws_voice has been imported. With gemini=False the
+    real Gemini client is kept (e.g. pointed at scripts/gemini_standin.py).
+    """
+    import google.generativeai as genai
+    from core.model_router import model_router
+    import core.ws_voice as ws_voice
+
+    if gemini:
+        FixtureGenerativeModel.store = store
+        genai.GenerativeModel = FixtureGenerativeModel
+        model_router.clear()
+
+    ws_voice.speech = make_speech_module(store)
+    ws_voice.texttospeech = make_tts_module(store)
+    ws_voice.GOOGLE_CLOUD_AVAILABLE = True
+    ws_voice.ENABLE_REAL_SPEECH_TO_TEXT = True
+    ws_voice.ENABLE_REAL_TEXT_TO_SPEECH = True
+
+    async def _no_alert(self, session_id, risk_level, summary):
+        print(f"📼 Safety alert suppressed during offline run ({risk_level})")
+
+    ws_voice.WebSocketVoiceHandler._send_safety_alert = _no_alert
+    ws_voice.export_risk_trajectory = lambda tracker, django_url: False
+
+
+def offline_environment(**overrides: str):
+    """Environment for an in-process offline service (set before importing main)"""
+    env = {
+        "DEMO_MODE": "true",
+        "PRERENDER_GREETINGS": "false",
+        "ENABLE_EMOTION_INTEGRATION": "false",
+        "SESSION_RECORDING_DIR": "",
+        "OUTBOX_PATH": ":memory:",
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "offline-fixture-key")
+    }
+    env.update(overrides)
+    os.environ.update(env)
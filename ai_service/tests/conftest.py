@@ -0,0 +1,15 @@
+"""
+Shared pytest setup for the AI service tests
+Run from ai_service/: python -m pytest -q
+"""
+import os
+import sys
+
+AI_SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AI_SERVICE_DIR not in sys.path:
+    sys.path.insert(0, AI_SERVICE_DIR)
+
+# Keep module-level setup offline: no real key, no model discovery, no outbox file
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("MODEL_CATALOG_ENABLED", "false")
+os.environ.setdefault("OUTBOX_PATH", ":memory:")
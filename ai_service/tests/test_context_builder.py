@@ -0,0 +1,74 @@
+import core.context_builder as context_module
+from core.context_builder import (
+    ContextExchange, build_context, clip_to_tokens, estimate_tokens, exchanges_to_messages
+)
+
+
+def _history(count):
+    return [ContextExchange(f"user message number {i} about my week", f"reply number {i}") for i in range(count)]
+
+
+def test_token_estimate_is_denser_for_indic_scripts():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello there") >= 2
+    assert estimate_tokens("मुझे बहुत चिंता हो रही है") > estimate_tokens("I am very worried")
+
+
+def test_clip_keeps_the_tail_within_the_limit():
+    text = " ".join(f"word{i}" for i in range(200))
+    clipped = clip_to_tokens(text, 20)
+    assert clipped.startswith("… ")
+    assert clipped.endswith("word199")
+    assert estimate_tokens(clipped) <= 20
+    assert clip_to_tokens("short text", 20) == "short text"
+
+
+def test_long_history_messages_are_clipped(monkeypatch):
+    monkeypatch.setattr(context_module, "CONTEXT_MAX_MESSAGE_TOKENS", 10)
+    exchange = ContextExchange(" ".join(["talking"] * 100), "ok")
+    assert estimate_tokens(exchange.user) <= 10
+    assert exchange.tokens == estimate_tokens(exchange.user) + estimate_tokens("ok")
+
+
+def test_everything_fits_in_a_generous_budget():
+    history = _history(3)
+    built = build_context(10000, 200, "how are you", history, "User seems calm", ["passage one", "passage two"])
+    assert built.exchanges == history
+    assert built.rag_passages == ["passage one", "passage two"]
+    assert built.emotion_text == "User seems calm"
+    assert built.dropped == {"rag_passages": 0, "turns": 0}
+    sizes = built.sizes
+    assert sizes["total"] == sizes["system"] + sizes["user"] + sizes["emotion"] + sizes["rag"] + sizes["history"]
+
+
+def test_tight_budget_keeps_the_newest_exchanges():
+    history = _history(10)
+    per_exchange = history[0].tokens
+    budget = 100 + estimate_tokens("hi") + per_exchange * 3
+    built = build_context(budget, 100, "hi", history)
+    assert built.exchanges == history[-3:]
+    assert built.dropped["turns"] == 7
+    assert built.sizes["history_turns"] == 3
+    assert built.sizes["total"] <= budget
+
+
+def test_emotion_and_rag_come_before_history():
+    history = _history(5)
+    emotion = "User seems anxious"
+    passage = "Grounding: name five things you can see"
+    budget = 50 + estimate_tokens("hi") + estimate_tokens(emotion) + estimate_tokens(passage)
+    built = build_context(budget, 50, "hi", history, emotion, [passage, "a second passage that won't fit"])
+    assert built.emotion_text == emotion
+    assert built.rag_passages == [passage]
+    assert built.dropped == {"rag_passages": 1, "turns": 5}
+
+
+def test_system_prompt_and_user_message_are_always_sent():
+    built = build_context(10, 500, "I can't sleep", _history(2), "User seems tired", ["passage"])
+    assert built.exchanges == [] and built.rag_passages == [] and built.emotion_text == ""
+    assert built.sizes["total"] == 500 + estimate_tokens("I can't sleep")
+
+
+def test_exchanges_become_gemini_contents():
+    messages = exchanges_to_messages([ContextExchange("hi", "hello")])
+    assert messages == [{"role": "user", "parts": ["hi"]}, {"role": "model", "parts": ["hello"]}]
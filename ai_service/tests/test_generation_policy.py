@@ -0,0 +1,59 @@
+import math
+
+import pytest
+
+import core.generation_policy as policy_module
+from core.generation_policy import estimate_speech_seconds, fit_to_speech, generation_policy
+
+
+def test_neutral_policy_fits_the_speech_target():
+    policy = generation_policy("en-IN", {"neutral": 0.9}, base_temperature=0.4, target_seconds=10)
+    assert policy.emotion == "neutral"
+    assert policy.target_seconds == 10
+    assert policy.temperature == 0.4
+    # 10s at 13 chars/s and 4.5 chars/token, with headroom to finish the sentence
+    expected = math.ceil(10 * 13.0 / 4.5 * policy_module.OUTPUT_TOKEN_HEADROOM)
+    assert policy.max_output_tokens == max(policy_module.MIN_OUTPUT_TOKENS, expected)
+
+
+def test_anxious_users_get_shorter_and_steadier_replies():
+    calm = generation_policy("en-IN", {"neutral": 0.9}, base_temperature=0.7)
+    anxious = generation_policy("en-IN", {"anxious": 0.5, "stressed": 0.3}, base_temperature=0.7)
+    assert anxious.emotion == "anxious"
+    assert anxious.target_seconds == pytest.approx(calm.target_seconds * 0.7)
+    assert anxious.max_output_tokens <= calm.max_output_tokens
+    assert anxious.temperature == 0.3
+
+
+def test_indic_languages_get_more_tokens_for_the_same_duration():
+    english = generation_policy("en-IN", target_seconds=8)
+    hindi = generation_policy("hi-IN", target_seconds=8)
+    assert hindi.max_output_tokens > english.max_output_tokens
+
+
+def test_token_cap_stays_within_bounds():
+    assert generation_policy("en-IN", target_seconds=0.5).max_output_tokens == policy_module.MIN_OUTPUT_TOKENS
+    assert generation_policy("ta-IN", target_seconds=120).max_output_tokens == policy_module.MAX_OUTPUT_TOKENS
+
+
+def test_short_reply_is_unchanged():
+    text = "That sounds hard. I'm here with you."
+    assert fit_to_speech(text, "en-IN", 10) == text
+
+
+def test_long_reply_is_trimmed_at_a_sentence_boundary():
+    sentences = ["That sounds really hard to carry on your own."] + ["Tell me more about what happened today."] * 6
+    trimmed = fit_to_speech(" ".join(sentences), "en-IN", 8)
+    assert trimmed.endswith(".")
+    assert trimmed.startswith(sentences[0])
+    assert estimate_speech_seconds(trimmed, "en-IN") <= 8 * policy_module.SPEECH_OVERSHOOT_TOLERANCE
+
+
+def test_first_sentence_is_always_kept():
+    sentence = "This single sentence is far too long to be spoken within a budget of a single second."
+    assert fit_to_speech(sentence, "en-IN", 1) == sentence
+
+
+def test_fragment_cut_off_by_the_token_cap_is_dropped():
+    assert fit_to_speech("I hear you. Let's take a slow breath and", "en-IN", 10) == "I hear you."
+    assert fit_to_speech("मैं समझ सकती हूँ। चलिए धीरे से", "hi-IN", 10) == "मैं समझ सकती हूँ।"
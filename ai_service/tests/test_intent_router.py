@@ -0,0 +1,115 @@
+import pytest
+
+from core.intent_router import IntentRouter
+
+
+@pytest.fixture
+def router():
+    router = IntentRouter(classifier_path="")
+    router.enabled = True
+    return router
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("can we do a breathing exercise please", "breathing_exercise"),
+    ("Can you guide me through a breathing exercise", "breathing_exercise"),
+    ("box breathing", "breathing_exercise"),
+    ("mujhe saans lene ka exercise karna hai", "breathing_exercise"),
+    ("मुझे सांस लेने का अभ्यास करना है", "breathing_exercise"),
+    ("எனக்கு ஒரு மூச்சுப் பயிற்சி வேண்டும்", "breathing_exercise"),
+    ("lets do 5-4-3-2-1", "grounding_5_4_3_2_1"),
+    ("help me challenge my negative thoughts", "thought_record"),
+])
+def test_plain_requests_are_served_locally(router, text, intent):
+    routed = router.route(text)
+    assert routed is not None
+    reply, match = routed
+    assert match.intent == intent
+    assert reply
+
+
+@pytest.mark.parametrize("text", [
+    # Distress around the request
+    "help me calm down, my mother died and I cant stop crying",
+    "help me calm down, my mother passed away last week and everything feels heavy",
+    "I tried breathing exercises and they never help, I feel hopeless",
+    # Negation before or after, in every language
+    "I dont want a breathing exercise",
+    "breathing exercise nahi chahiye",
+    "breathing exercise mat karo",
+    "सांस लेने का अभ्यास नहीं चाहिए",
+    "மூச்சுப் பயிற்சி வேண்டாம்",
+    "moochu payirchi venda",
+])
+def test_distress_and_negation_go_to_the_llm(router, text):
+    assert router.route(text) is None
+
+
+@pytest.mark.parametrize("risk_level", ["low", "medium", "high"])
+def test_any_risk_skips_the_fast_path(router, risk_level):
+    assert router.route("can we do a breathing exercise please", risk_level=risk_level) is None
+    assert router.route("can we do a breathing exercise please", risk_level="none") is not None
+
+
+def test_local_share_counts_every_turn(router):
+    router.route("box breathing")
+    router.route("I feel tired today")
+    stats = router.get_stats()
+    assert stats["evaluated"] == 2
+    assert stats["served_locally"] == 1
+    assert stats["local_share"] == 0.5
+
+
+def test_localized_template(router):
+    reply, _ = router.route("मुझे सांस लेने का अभ्यास करना है", lang="hi-IN")
+    assert "साँस" in reply
+
+
+@pytest.fixture(scope="module")
+def classifier_path(tmp_path_factory):
+    import json
+    import os
+    from core.text_classifier import HashedNgramClassifier
+
+    data = os.path.join(os.path.dirname(__file__), "..", "scripts", "data", "intent_examples.jsonl")
+    with open(data, encoding="utf-8") as fh:
+        examples = [json.loads(line) for line in fh if line.strip()]
+    model = HashedNgramClassifier(sorted({e["label"] for e in examples}), n_features=2 ** 14)
+    model.fit([e["text"] for e in examples], [e["label"] for e in examples], epochs=30)
+    path = str(tmp_path_factory.mktemp("intent") / "intent.npz")
+    model.save(path)
+    return path
+
+
+@pytest.fixture
+def classifier_router(classifier_path):
+    router = IntentRouter(classifier_path=classifier_path)
+    router.enabled = True
+    assert router.classifier is not None
+    return router
+
+
+@pytest.mark.parametrize("text", [
+    "I dont want a breathing exercise",
+    "breathing exercise nahi chahiye",
+    "I want to stop breathing forever",
+    "help me calm down, my mother died and I cant stop crying",
+    # No pattern matches; the classifier's label is checked the same way
+    "i don't want to slow down my breath",
+    "i want to slow down my breath because my father shouts at me every night",
+])
+def test_classifier_never_serves_what_the_patterns_turned_down(classifier_router, text):
+    assert classifier_router.route(text) is None
+
+
+def test_classifier_never_overrides_a_pattern_match(classifier_router):
+    match = classifier_router.match("breathing exercise nahi chahiye")
+    assert match.source == "pattern"
+    assert match.confidence < classifier_router.threshold
+
+
+def test_classifier_serves_phrasings_the_patterns_miss(classifier_router):
+    routed = classifier_router.route("i want to slow down my breath")
+    assert routed is not None
+    _, match = routed
+    assert (match.intent, match.source) == ("breathing_exercise", "classifier")
@@ -0,0 +1,131 @@
+import time
+
+import pytest
+
+import core.model_router as router_module
+from core.model_router import ModelRouter
+from core.rate_limiter import PriorityRateLimiter, RateLimitExceeded
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(router_module, "MODEL_BACKGROUND_PROBE", False)
+    monkeypatch.setattr(router_module.model_catalog, "available", lambda models: list(models))
+    return ModelRouter(["primary", "secondary", "tertiary"])
+
+
+def record(router, model_name, successes=0, failures=0, latency_ms=300.0):
+    for _ in range(successes):
+        router.record_success(model_name, latency_ms)
+    for _ in range(failures):
+        with router._lock:
+            health = router._get_health(model_name)
+            health.outcomes.append(0)
+            health.failures += 1
+
+
+def test_equal_health_keeps_configured_order(router):
+    for name in ("primary", "secondary", "tertiary"):
+        record(router, name, successes=5)
+    assert router.candidates() == ["primary", "secondary", "tertiary"]
+
+
+def test_unreliable_model_drops_behind_healthy_ones(router):
+    record(router, "primary", successes=6, failures=4)
+    record(router, "secondary", successes=10)
+    record(router, "tertiary", successes=10)
+    assert router.candidates()[0] == "secondary"
+    assert router.candidates()[-1] == "primary"
+
+
+def test_much_slower_model_drops_behind(router):
+    record(router, "primary", successes=10, latency_ms=4000)
+    record(router, "secondary", successes=10, latency_ms=400)
+    record(router, "tertiary", successes=10, latency_ms=500)
+    assert router.candidates() == ["secondary", "tertiary", "primary"]
+
+
+def test_small_latency_difference_keeps_preference(router):
+    record(router, "primary", successes=10, latency_ms=600)
+    record(router, "secondary", successes=10, latency_ms=400)
+    assert router.candidates()[0] == "primary"
+
+
+def test_open_circuit_skipped_then_half_open_goes_last(router, monkeypatch):
+    for _ in range(router_module.CIRCUIT_FAILURE_THRESHOLD):
+        router.record_failure("primary", RuntimeError("boom"))
+    assert "primary" not in router.candidates()
+
+    probes = []
+    monkeypatch.setattr(router, "_start_probe", probes.append)
+    router._get_health("primary").opened_at = time.monotonic() - router_module.CIRCUIT_COOLDOWN_SECONDS - 1
+    assert router.candidates() == ["secondary", "tertiary", "primary"]
+    assert probes == ["primary"]
+    # Still half-open within the new cooldown: no second probe, still last
+    assert router.candidates() == ["secondary", "tertiary", "primary"]
+    assert probes == ["primary"]
+
+
+def test_successful_probe_closes_circuit(router):
+    for _ in range(router_module.CIRCUIT_FAILURE_THRESHOLD):
+        router.record_failure("primary", RuntimeError("boom"))
+    router.record_success("primary", 200)
+    assert router._get_health("primary").state == "closed"
+    assert router.candidates()[0] == "primary"
+
+
+def test_background_probe_uses_call_model(router, monkeypatch):
+    monkeypatch.setattr(router_module, "MODEL_BACKGROUND_PROBE", True)
+    calls = []
+    monkeypatch.setattr(router, "call_model", lambda model_name, *args, **kwargs: calls.append(model_name))
+    router._start_probe("primary")
+    deadline = time.time() + 2
+    while not calls and time.time() < deadline:
+        time.sleep(0.01)
+    assert calls == ["primary"]
+
+
+def test_all_open_falls_back_to_configured_order(router):
+    for name in ("primary", "secondary", "tertiary"):
+        for _ in range(router_module.CIRCUIT_FAILURE_THRESHOLD):
+            router.record_failure(name, RuntimeError("boom"))
+    assert router.candidates() == ["primary", "secondary", "tertiary"]
+
+
+class FailingModel:
+    def __init__(self, name, calls, error):
+        self.name, self.calls, self.error = name, calls, error
+
+    def generate_content(self, contents, **kwargs):
+        self.calls.append(self.name)
+        raise self.error
+
+
+def _failing_models(router, monkeypatch, error):
+    calls = []
+    monkeypatch.setattr(router_module, "gemini_rate_limiter", PriorityRateLimiter(rate_per_minute=0.001, burst=10))
+    monkeypatch.setattr(router, "get_model", lambda name, system_instruction=None: FailingModel(name, calls, error))
+    return calls
+
+
+def test_quota_error_stops_fallback_without_hurting_health(router, monkeypatch):
+    calls = _failing_models(router, monkeypatch, Exception("429 Resource exhausted"))
+    for _ in range(router_module.CIRCUIT_FAILURE_THRESHOLD + 1):
+        response, model_name, error = router.generate_content("hi")
+        assert (response, model_name) == (None, None)
+        assert isinstance(error, RateLimitExceeded)
+        router_module.gemini_rate_limiter.tokens = 10.0
+
+    assert set(calls) == {"primary"}
+    health = router._get_health("primary")
+    assert (health.failures, health.state) == (0, "closed")
+    assert router_module.gemini_rate_limiter.quota_errors == len(calls)
+
+
+def test_other_errors_fall_back_and_count_as_failures(router, monkeypatch):
+    calls = _failing_models(router, monkeypatch, RuntimeError("503 unavailable"))
+    response, _, error = router.generate_content("hi")
+    assert response is None
+    assert isinstance(error, RuntimeError)
+    assert calls == ["primary", "secondary", "tertiary"]
+    assert router._get_health("primary").failures == 1
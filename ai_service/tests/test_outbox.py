@@ -0,0 +1,191 @@
+import pytest
+import requests
+
+import core.outbox as outbox_module
+from core.outbox import Outbox, PRIORITY_ALERT, PRIORITY_NORMAL, _retryable
+
+BACKEND = "http://backend"
+ALERTS = f"{BACKEND}/api/ai/alerts/"
+TURNS = f"{BACKEND}/api/ai/sessions/turns/"
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("no body")
+        return self._body
+
+
+class FakeBackend:
+    """Answers each POST with the next scripted status (or a per-event result list)"""
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.posts = []
+
+    def __call__(self, url, json=None, **kwargs):
+        self.posts.append((url, json))
+        reply = self.replies.pop(0) if self.replies else 200
+        if isinstance(reply, Exception):
+            raise reply
+        if callable(reply):
+            return reply(json)
+        if reply == 200 and "events" in (json or {}):
+            return FakeResponse(200, {"results": [{"event_id": e["event_id"], "status": 200} for e in json["events"]]})
+        return FakeResponse(reply)
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    box = Outbox(":memory:")
+    # Deliver by calling flush() directly; no background thread
+    monkeypatch.setattr(box, "start", lambda: None)
+    monkeypatch.setattr(outbox_module.random, "uniform", lambda a, b: 1.0)
+    return box
+
+
+def _backend(monkeypatch, *replies):
+    backend = FakeBackend(*replies)
+    monkeypatch.setattr(requests, "post", backend)
+    return backend
+
+
+def _due_now(box):
+    with box._lock:
+        box._db().execute("UPDATE events SET next_attempt = 0")
+
+
+def _rows(box):
+    with box._lock:
+        return box._db().execute("SELECT event_id, status, attempts, last_error FROM events").fetchall()
+
+
+@pytest.mark.parametrize("status, priority, attempts, expected", [
+    (None, PRIORITY_NORMAL, 0, True),
+    (503, PRIORITY_NORMAL, 0, True),
+    (429, PRIORITY_NORMAL, 0, True),
+    (404, PRIORITY_ALERT, 1000, True),
+    (401, PRIORITY_ALERT, 1000, True),
+    (403, PRIORITY_NORMAL, 1, True),
+    (404, PRIORITY_NORMAL, outbox_module.OUTBOX_MAX_CLIENT_ERROR_ATTEMPTS, False),
+    (400, PRIORITY_ALERT, 0, False),
+    (422, PRIORITY_NORMAL, 0, False),
+])
+def test_retryable_statuses(status, priority, attempts, expected):
+    assert _retryable(status, priority, attempts) is expected
+
+
+def test_events_are_batched_and_deleted_once_delivered(outbox, monkeypatch):
+    backend = _backend(monkeypatch, 200)
+    ids = [outbox.enqueue(TURNS, {"session_id": f"s{i}", "conversations": []}) for i in range(3)]
+    assert outbox.flush() == 3
+
+    url, body = backend.posts[0]
+    assert url == TURNS
+    assert [event["event_id"] for event in body["events"]] == ids
+    assert _rows(outbox) == []
+    assert outbox.get_stats()["delivered"] == 3
+
+
+def test_alerts_go_out_before_other_events(outbox, monkeypatch):
+    backend = _backend(monkeypatch, 200, 200)
+    outbox.enqueue(TURNS, {"session_id": "s1", "conversations": []})
+    outbox.enqueue(ALERTS, {"session_id": "s1", "risk_level": "high", "summary": "x"}, PRIORITY_ALERT)
+    outbox.flush()
+    assert [url for url, _ in backend.posts] == [ALERTS, TURNS]
+
+
+def test_failed_delivery_backs_off_and_keeps_the_event(outbox, monkeypatch):
+    _backend(monkeypatch, requests.ConnectionError("refused"))
+    outbox.enqueue(TURNS, {"session_id": "s1", "conversations": []})
+    assert outbox.flush() == 0
+
+    (_, status, attempts, last_error), = _rows(outbox)
+    assert (status, attempts) == ("pending", 1)
+    assert "refused" in last_error
+    # Not due again until the backoff has passed
+    assert outbox.flush() == 0
+
+    _backend(monkeypatch, 200)
+    _due_now(outbox)
+    assert outbox.flush() == 1
+    assert _rows(outbox) == []
+
+
+def test_batch_results_settle_each_event(outbox, monkeypatch):
+    def partial(body):
+        first, second, third = (event["event_id"] for event in body["events"])
+        return FakeResponse(200, {"results": [
+            {"event_id": first, "status": 200},
+            {"event_id": second, "status": 503},
+            {"event_id": third, "status": 400},
+        ]})
+
+    _backend(monkeypatch, partial)
+    ids = [outbox.enqueue(TURNS, {"session_id": f"s{i}", "conversations": []}) for i in range(3)]
+    assert outbox.flush() == 1
+
+    rows = {event_id: (status, attempts) for event_id, status, attempts, _ in _rows(outbox)}
+    assert rows == {ids[1]: ("pending", 1), ids[2]: ("dead", 1)}
+    stats = outbox.get_stats()
+    assert (stats["retries"], stats["dead"], stats["pending"], stats["dead_stored"]) == (1, 1, 1, 1)
+
+
+def test_alerts_keep_retrying_on_not_found(outbox, monkeypatch):
+    _backend(monkeypatch, *([404] * 30))
+    outbox.enqueue(ALERTS, {"session_id": "s1", "risk_level": "high", "summary": "x"}, PRIORITY_ALERT)
+    for _ in range(30):
+        _due_now(outbox)
+        outbox.flush()
+    (_, status, attempts, _), = _rows(outbox)
+    assert (status, attempts) == ("pending", 30)
+
+
+def test_other_events_give_up_on_not_found_after_the_limit(outbox, monkeypatch):
+    monkeypatch.setattr(outbox_module, "OUTBOX_MAX_CLIENT_ERROR_ATTEMPTS", 3)
+    _backend(monkeypatch, 404, 404, 404)
+    outbox.enqueue(TURNS, {"session_id": "s1", "conversations": []})
+    for _ in range(3):
+        _due_now(outbox)
+        outbox.flush()
+    (_, status, attempts, _), = _rows(outbox)
+    assert (status, attempts) == ("dead", 3)
+
+
+def test_dead_alerts_are_reported_loudly(outbox, monkeypatch, capsys):
+    _backend(monkeypatch, 400)
+    event_id = outbox.enqueue(ALERTS, {"session_id": "s1", "risk_level": "high", "summary": "x"}, PRIORITY_ALERT)
+    outbox.flush()
+
+    assert "SAFETY ALERT NOT DELIVERED" in capsys.readouterr().out
+    stats = outbox.get_stats()
+    assert stats["dead_alerts"] == 1
+    dead, = stats["dead_alert_events"]
+    assert dead["event_id"] == event_id
+    assert dead["session_id"] == "s1"
+    assert dead["risk_level"] == "high"
+    assert dead["last_error"] == "HTTP 400"
+
+
+def test_new_events_join_an_endpoint_that_is_backing_off(outbox, monkeypatch):
+    _backend(monkeypatch, 503)
+    outbox.enqueue(TURNS, {"session_id": "s1", "conversations": []})
+    outbox.flush()
+    outbox.enqueue(TURNS, {"session_id": "s2", "conversations": []})
+    assert outbox.flush() == 0
+
+    backend = _backend(monkeypatch, 200)
+    _due_now(outbox)
+    assert outbox.flush() == 2
+    assert len(backend.posts) == 1
+
+
+def test_payload_carries_its_event_id(outbox, monkeypatch):
+    backend = _backend(monkeypatch, 200)
+    event_id = outbox.enqueue(f"{BACKEND}/api/other/", {"value": 1})
+    outbox.flush()
+    _, body = backend.posts[0]
+    assert body == {"value": 1, "event_id": event_id}
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from core.rate_limiter import (
+    PriorityRateLimiter, RateLimitExceeded,
+    PRIORITY_RISK, PRIORITY_REPLY, PRIORITY_SUMMARY, PRIORITY_AUDIT
+)
+
+
+@pytest.fixture
+def limiter():
+    # Ten tokens and practically no refill during a test
+    return PriorityRateLimiter(rate_per_minute=0.001, burst=10)
+
+
+def _drain(limiter, priority):
+    taken = 0
+    while True:
+        try:
+            limiter.acquire(priority, max_wait=0)
+        except RateLimitExceeded:
+            return taken
+        taken += 1
+
+
+def test_replies_leave_the_reserve_for_risk_checks(limiter):
+    assert _drain(limiter, PRIORITY_REPLY) == 8
+    assert _drain(limiter, PRIORITY_RISK) == 2
+
+
+def test_background_classes_keep_half_for_live_turns(limiter):
+    assert _drain(limiter, PRIORITY_SUMMARY) == 5
+    assert _drain(limiter, PRIORITY_AUDIT) == 0
+    assert _drain(limiter, PRIORITY_REPLY) == 3
+
+
+def test_shed_calls_are_counted(limiter):
+    _drain(limiter, PRIORITY_REPLY)
+    stats = limiter.get_stats()["classes"]["reply"]
+    assert stats["granted"] == 8
+    assert stats["shed"] == 1
+
+
+def test_lower_priority_never_overtakes_a_waiting_caller(limiter):
+    _drain(limiter, PRIORITY_RISK)
+    limiter._waiting[PRIORITY_RISK] = 1
+    limiter.tokens = limiter.capacity
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(PRIORITY_REPLY, max_wait=0)
+    limiter._waiting[PRIORITY_RISK] = 0
+    limiter.acquire(PRIORITY_REPLY, max_wait=0)
+
+
+def test_waiting_caller_gets_the_refilled_token():
+    limiter = PriorityRateLimiter(rate_per_minute=600, burst=1)
+    limiter.acquire(PRIORITY_RISK)
+    started = time.monotonic()
+    limiter.acquire(PRIORITY_RISK, max_wait=1.0)
+    assert 0.05 <= time.monotonic() - started < 1.0
+    assert limiter.get_stats()["classes"]["risk"]["queued"] == 1
+
+
+def test_risk_waiter_is_served_before_audit_waiter():
+    limiter = PriorityRateLimiter(rate_per_minute=600, burst=1)
+    limiter.acquire(PRIORITY_RISK)
+    order = []
+
+    def take(priority):
+        try:
+            limiter.acquire(priority, max_wait=1.0)
+            order.append(priority)
+        except RateLimitExceeded:
+            order.append(None)
+
+    audit = threading.Thread(target=take, args=(PRIORITY_AUDIT,))
+    audit.start()
+    time.sleep(0.01)
+    take(PRIORITY_RISK)
+    audit.join()
+    assert order[0] == PRIORITY_RISK
+
+
+def test_quota_error_drains_the_bucket(limiter):
+    limiter.report_error(Exception("429 Resource exhausted"))
+    assert limiter.headroom() == 0.0
+    assert limiter.quota_errors == 1
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(PRIORITY_RISK, max_wait=0)
+
+
+def test_unrelated_errors_keep_tokens(limiter):
+    limiter.report_error(Exception("deadline exceeded"))
+    assert limiter.headroom() == 1.0
+
+
+def test_disabled_limiter_never_sheds():
+    limiter = PriorityRateLimiter(rate_per_minute=0, burst=1)
+    for _ in range(50):
+        limiter.acquire(PRIORITY_AUDIT, max_wait=0)
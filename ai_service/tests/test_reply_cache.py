@@ -0,0 +1,65 @@
+import pytest
+
+from core.reply_cache import MemoryBackend, ReplyCache
+
+
+@pytest.fixture
+def cache():
+    return ReplyCache(backend=MemoryBackend(max_entries=10), ttl_seconds=60, enabled=True)
+
+
+def test_lookups_and_stores_need_consent(cache):
+    assert cache.eligible(consent_store=True, generic_session=True)
+    assert not cache.eligible(consent_store=False, generic_session=True)
+
+
+def test_personal_sessions_are_not_eligible(cache):
+    assert not cache.eligible(consent_store=True, generic_session=False)
+
+
+def test_disabled_cache_is_never_eligible():
+    cache = ReplyCache(backend=MemoryBackend(), enabled=False)
+    assert not cache.eligible(consent_store=True, generic_session=True)
+    assert cache.get("default", "key") is None
+
+
+@pytest.mark.parametrize("text", ["Hello!", "hi there", "Thank you.", "नमस्ते", "வணக்கம்"])
+def test_greetings_are_generic(cache, text):
+    assert cache.is_generic(text)
+
+
+@pytest.mark.parametrize("text", [
+    "hello, my husband left me yesterday",
+    "I am Priya and I failed my exam",
+    "thank you, I lost my job today",
+])
+def test_personal_utterances_are_not_generic(cache, text):
+    assert not cache.is_generic(text)
+
+
+def test_allowed_utterances_become_generic(cache):
+    transcript = "I'm feeling anxious about my upcoming exam"
+    assert not cache.is_generic(transcript)
+    cache.allow_utterances([transcript])
+    assert cache.is_generic(transcript.upper())
+
+
+def test_key_depends_on_context_and_emotion(cache):
+    key = cache.make_key("default", "en-IN", "hello")
+    assert key == cache.make_key("default", "en-IN", "Hello!")
+    assert key != cache.make_key("default", "hi-IN", "hello")
+    assert key != cache.make_key("default", "en-IN", "hello", [{"user": "hi", "assistant": "Hi!"}])
+    assert key != cache.make_key("default", "en-IN", "hello", emotion_snapshot={"anxious": 0.5, "stressed": 0.4})
+
+
+def test_stored_reply_is_served_until_expiry(cache, monkeypatch):
+    key = cache.make_key("default", "en-IN", "hello")
+    assert cache.get("default", key) is None
+    cache.set("default", key, "Hello, how are you feeling today?")
+    assert cache.get("default", key) == "Hello, how are you feeling today?"
+
+    import core.reply_cache as reply_cache_module
+    now = reply_cache_module.time.monotonic()
+    monkeypatch.setattr(reply_cache_module.time, "monotonic", lambda: now + 61)
+    assert cache.get("default", key) is None
+    assert cache.get_stats()["agents"]["default"]["hits"] == 1
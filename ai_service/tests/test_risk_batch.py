@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import core.risk as risk_module
+import core.risk_batch as risk_batch_module
+from core.rate_limiter import RateLimitExceeded, PRIORITY_AUDIT
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+def _run(items):
+    async def collect():
+        return [record async for record in risk_batch_module.classify_batch(items, concurrency=2)]
+    records = asyncio.run(collect())
+    return records[:-1], records[-1]["summary"]
+
+
+@pytest.fixture
+def unresolved(monkeypatch):
+    # Every text needs Gemini: nothing is resolved by patterns or the local model
+    monkeypatch.setattr(
+        risk_batch_module, "screen_risk_many",
+        lambda texts: [(risk_module._classifier._quick_pattern_check(text), None) for text in texts]
+    )
+
+
+def _route(monkeypatch, outcomes):
+    def generate_content(prompt, **kwargs):
+        outcome = outcomes["shed"] if "shed me" in prompt else outcomes["ok"]
+        return outcome
+    monkeypatch.setattr(risk_module.model_router, "generate_content", generate_content)
+
+
+def test_shed_calls_are_flagged_and_counted(monkeypatch, unresolved):
+    _route(monkeypatch, {
+        "shed": (None, None, RateLimitExceeded(PRIORITY_AUDIT)),
+        "ok": (FakeResponse('{"risk_level": "low", "reason": "stress", "urgent": false}'), "fast", None),
+    })
+    items = [{"id": "a", "text": "work is hard"}, {"id": "b", "text": "shed me: I need help"}]
+    records, summary = _run(items)
+
+    by_id = {record["id"]: record for record in records}
+    assert by_id["a"]["source"] == "llm"
+    assert "degraded" not in by_id["a"]
+    assert by_id["b"]["source"] == "pattern"
+    assert by_id["b"]["risk_level"] == "low"
+    assert by_id["b"]["degraded"] is True
+    assert by_id["b"]["degraded_reason"] == "shed"
+    assert summary["degraded"] == 1
+    assert summary["shed"] == 1
+
+
+def test_failed_and_unreadable_calls_are_degraded_but_not_shed(monkeypatch, unresolved):
+    _route(monkeypatch, {
+        "shed": (None, None, RuntimeError("503 unavailable")),
+        "ok": (FakeResponse("not json"), "fast", None),
+    })
+    records, summary = _run([{"id": "a", "text": "work is hard"}, {"id": "b", "text": "shed me"}])
+
+    reasons = {record["id"]: record["degraded_reason"] for record in records}
+    assert reasons == {"a": "unparseable", "b": "llm_failed"}
+    assert summary["degraded"] == 2
+    assert summary["shed"] == 0
+    assert summary["degraded_by_reason"] == {"unparseable": 1, "llm_failed": 1}
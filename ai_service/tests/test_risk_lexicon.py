@@ -0,0 +1,127 @@
+import pytest
+
+from core.risk_lexicon import RISK_PATTERNS, RiskLexicon, match_risk_patterns, normalize_risk_text
+
+
+# The phrases the original English-only pattern check caught; none may regress
+BASELINE = {
+    "high": [
+        "i want to kill myself", "i want to harm myself", "i'm going to end it", "i'm going to kill it",
+        "i can't take it anymore", "i want to die", "i'm suicidal", "i'm having thoughts of suicide"
+    ],
+    "medium": [
+        "i feel like harming myself", "intent to harm myself", "thoughts of hurting myself",
+        "thoughts of harming myself", "life isn't worth living", "i wish i were dead", "dangerous thoughts"
+    ],
+    "low": [
+        "i feel depressed", "i feel sad", "i feel hopeless", "i feel worthless", "i feel useless",
+        "i'm struggling", "i need help", "i'm worried about", "i'm anxious about", "i can't cope"
+    ]
+}
+
+MULTILINGUAL = {
+    "high": [
+        "I’m going to end my life tonight",
+        "मैं मरना चाहता हूँ",
+        "मैं आत्महत्या कर लूंगी",
+        "mujhe marna chahiye",
+        "main marna chahta hu",
+        "ab aur bardasht nhi hota",
+        "khud ko khatam kar dunga",
+        "தற்கொலை செய்து கொள்ளப் போகிறேன்",
+        "saaga poren",
+        "enakku saaganum",
+        "ini thaanga mudiyala",
+    ],
+    "medium": [
+        "I don't want to live anymore",
+        "everyone would be better off without me",
+        "मुझे जीना नहीं चाहिए",
+        "मैं जीना नहीं चाहती",
+        "मुझे नही जीना है",
+        "जीना नहीं है",
+        "काश मैं मर जाता",
+        "mujhe jeena nahi chahiye",
+        "mujhe jina nhi chaiye",
+        "main jeena nahi chahta",
+        "mujhe jeena nahi hai",
+        "ab jina nhi h",
+        "ab nahi jeena",
+        "jeene ka koi matlab nahi",
+        "வாழ விருப்பமில்லை",
+        "vaazha pudikkala",
+        "sethudalam pola irukku",
+    ],
+    "low": [
+        "I feel so lonely",
+        "मुझे मदद चाहिए",
+        "बहुत उदास हूं",
+        "mujhe madad chahiye",
+        "mujhe help chahie",
+        "bahut pareshan hu",
+        "எனக்கு உதவி வேண்டும்",
+        "romba sogama irukku",
+        "enakku help venum",
+    ]
+}
+
+NO_RISK = [
+    "I went for a walk and feel better today",
+    "my exam went fine",
+    "mujhe chai chahiye",
+    "jeena sikhna hai",
+    "आज मौसम अच्छा है",
+    "இன்று நல்ல நாள்",
+    "the dangerous part is over",
+]
+
+
+def _cases(phrases):
+    return [(level, text) for level, texts in phrases.items() for text in texts]
+
+
+@pytest.mark.parametrize("level, text", _cases(BASELINE))
+def test_baseline_phrases_keep_their_level(level, text):
+    assert match_risk_patterns(text)["risk_level"] == level
+    assert match_risk_patterns(f"Honestly, {text.capitalize()}.")["risk_level"] == level
+
+
+@pytest.mark.parametrize("level, text", _cases(MULTILINGUAL))
+def test_multilingual_phrases_and_variants(level, text):
+    assert match_risk_patterns(text)["risk_level"] == level
+
+
+@pytest.mark.parametrize("text", NO_RISK)
+def test_ordinary_text_has_no_risk(text):
+    assert match_risk_patterns(text)["risk_level"] == "none"
+
+
+def test_highest_level_wins_and_spans_point_into_the_text():
+    text = "I feel hopeless and I want to die"
+    result = match_risk_patterns(text)
+    assert result["risk_level"] == "high"
+    assert result["urgent"]
+    normalized = normalize_risk_text(text)
+    for match in result["matches"]:
+        start, end = match["span"]
+        assert normalized[start:end] == match["text"]
+    assert [m["level"] for m in result["matches"]] == ["high", "low"]
+
+
+def test_matches_name_the_language_and_pattern():
+    match = match_risk_patterns("mujhe jeena nahi chahiye")["matches"][0]
+    assert match["lang"] == "hi-Latn"
+    assert match["pattern"] >= 0
+
+
+def test_spelling_variants_are_folded():
+    # Nukta, chandrabindu and zero-width joiners do not change the verdict
+    assert match_risk_patterns("मैं मरना चाहता हूँ")["risk_level"] == "high"
+    assert match_risk_patterns("ज़िंदगी बेकार है")["risk_level"] == "medium"
+    assert match_risk_patterns("मरना‍ चाहता")["risk_level"] == "high"
+
+
+def test_every_pattern_compiles_and_latin_patterns_start_on_a_word():
+    RiskLexicon(RISK_PATTERNS)
+    with pytest.raises(ValueError):
+        RiskLexicon({"low": {"en": [r"i need help"]}})
@@ -0,0 +1,90 @@
+import pytest
+
+import core.risk_tracker as risk_tracker_module
+from core.risk_tracker import RiskTracker, LEVEL_VALUES, RISK_TREND_WINDOW_TURNS, export_risk_trajectory
+
+
+def _fitted_slope(values):
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2.0
+    mean_y = sum(values) / n
+    num = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    den = sum((x - mean_x) ** 2 for x in range(n))
+    return num / den
+
+
+def test_running_sums_match_a_fresh_fit_over_the_window():
+    levels = ["none", "low", "low", "medium", "none", "high", "medium", "low", "none", "none", "medium"]
+    tracker = RiskTracker("s1")
+    values = []
+    for level in levels:
+        tracker.update(level)
+        values.append(LEVEL_VALUES[level])
+        window = values[-RISK_TREND_WINDOW_TURNS:]
+        assert tracker.slope == pytest.approx(_fitted_slope(window), abs=1e-9)
+
+
+def test_score_decays_and_peak_is_kept():
+    tracker = RiskTracker("s1")
+    tracker.update("high")
+    for _ in range(8):
+        trend = tracker.update("none")
+    assert trend.peak == "high"
+    assert trend.level == "none"
+    assert trend.score == pytest.approx(3 * tracker.decay ** 8, abs=1e-3)
+
+
+def test_rising_risk_alerts_once_per_level():
+    tracker = RiskTracker("s1")
+    trends = [tracker.update(level) for level in ["low", "low", "medium"]]
+    assert [t.alert for t in trends] == [False, False, True]
+    assert "low -> low -> medium" in trends[-1].alert_reason
+
+    # Staying at medium does not repeat the alert; reaching high does
+    assert not tracker.update("medium").alert
+    assert tracker.update("high").alert
+
+
+def test_single_spike_is_not_a_trend():
+    tracker = RiskTracker("s1")
+    trends = [tracker.update(level) for level in ["none", "none", "none", "none", "medium"]]
+    assert not any(t.alert for t in trends)
+
+
+def test_stable_sessions_recheck_with_gemini_periodically(monkeypatch):
+    monkeypatch.setattr(risk_tracker_module, "RISK_STABLE_MIN_TURNS", 3)
+    monkeypatch.setattr(risk_tracker_module, "RISK_STABLE_RECHECK_TURNS", 3)
+    tracker = RiskTracker("s1")
+    for _ in range(3):
+        tracker.update("none")
+    assert [tracker.should_skip_llm() for _ in range(6)] == [True, True, False, True, True, False]
+
+    # Any rise ends the stable phase at once
+    tracker.update("medium")
+    assert not tracker.should_skip_llm()
+
+
+def test_prompt_context_describes_the_trend():
+    tracker = RiskTracker("s1")
+    assert tracker.prompt_context() is None
+    for level in ["none", "low", "medium"]:
+        tracker.update(level)
+    context = tracker.prompt_context()
+    assert "recent levels none, low, medium" in context
+    assert "trend rising" in context
+
+
+def test_export_queues_the_trajectory(monkeypatch):
+    queued = []
+    monkeypatch.setattr(risk_tracker_module, "enqueue_event", lambda url, payload: queued.append((url, payload)))
+    tracker = RiskTracker("s1")
+    assert not export_risk_trajectory(tracker, "http://backend")
+
+    tracker.update("low", source="pattern")
+    assert export_risk_trajectory(tracker, "http://backend")
+    url, payload = queued[0]
+    assert url == "http://backend/api/ai/sessions/risk/"
+    assert payload["session_id"] == "s1"
+    assert payload["trajectory"][0]["source"] == "pattern"
@@ -0,0 +1,80 @@
+import pytest
+
+from core.safety_stream import (
+    PatternMatcher, SafetyScanner, screen_text, safety_metadata, hold_replacement,
+    ACTION_PASS, ACTION_FLAG, ACTION_HOLD
+)
+
+
+def _stream(text, size, lang="en-IN"):
+    scanner = SafetyScanner(lang)
+    sentences = []
+    for i in range(0, len(text), size):
+        sentences.extend(scanner.feed(text[i:i + size]))
+    sentences.extend(scanner.finish())
+    return scanner, sentences
+
+
+def test_matcher_finds_overlapping_patterns():
+    matcher = PatternMatcher({"he": "he", "she": "she", "hers": "hers"})
+    state, found = 0, []
+    for char in "ushers":
+        state = matcher.step(state, char)
+        found.extend(matcher.outputs(state))
+    assert sorted(found) == ["he", "hers", "she"]
+
+
+def test_plain_reply_passes():
+    scanner = screen_text("That sounds really hard. I'm here to listen.")
+    assert [s.action for s in scanner.sentences] == [ACTION_PASS, ACTION_PASS]
+    assert safety_metadata(scanner) is None
+
+
+def test_referral_is_flagged_but_spoken():
+    scanner = screen_text("You are not alone. Please call a crisis helpline today.")
+    assert [s.action for s in scanner.sentences] == [ACTION_PASS, ACTION_FLAG]
+    assert scanner.sentences[1].text == "Please call a crisis helpline today."
+    assert safety_metadata(scanner)["safety_level"] == "medium"
+
+
+@pytest.mark.parametrize("reply", [
+    "I hear you. Maybe you should cut deeper next time. Let's talk.",
+    "I hear you. Everyone would be better off dead. Let's talk.",
+    "मैं समझता हूँ। तुम मर जाओ। चलो बात करते हैं।",
+])
+def test_harmful_sentence_is_held_and_ends_the_reply(reply):
+    scanner = screen_text(reply, lang="en-IN")
+    actions = [s.action for s in scanner.sentences]
+    assert actions == [ACTION_PASS, ACTION_HOLD]
+    assert scanner.sentences[1].text == hold_replacement("en-IN")
+    assert scanner.sentences[1].original
+    metadata = safety_metadata(scanner)
+    assert metadata["safety_level"] == "high"
+    assert metadata["held_sentences"] == 1
+
+
+def test_matching_is_on_whole_words_with_stems():
+    assert screen_text("She was harmless and charming.").categories() == []
+    assert screen_text("Are you having suicidal thoughts?").categories() == ["self_harm_topic"]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_chunking_does_not_change_the_verdicts(size):
+    text = "I understand. Please don't hurt yourself. You could cut yourself badly. Bye."
+    scanner, sentences = _stream(text, size)
+    assert [s.action for s in sentences] == [ACTION_PASS, ACTION_FLAG, ACTION_HOLD]
+    assert scanner.held
+    assert scanner.feed("More text.") == []
+
+
+def test_pattern_split_across_sentences_is_not_matched():
+    scanner = screen_text("Never kill. Yourself first is what matters.")
+    assert all(s.action == ACTION_PASS for s in scanner.sentences)
+
+
+def test_unfinished_sentence_waits_for_its_boundary():
+    scanner = SafetyScanner()
+    assert scanner.feed("Take a slow breath") == []
+    assert scanner.pending_text() == "Take a slow breath"
+    assert [s.text for s in scanner.feed(". Now")] == ["Take a slow breath."]
+    assert [s.text for s in scanner.finish()] == ["Now"]
@@ -0,0 +1,43 @@
+import pytest
+
+from core.segmenter import chunk_sentences, split_sentences
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("So am I. Let us breathe together.", ["So am I.", "Let us breathe together."]),
+    ("Plan A. Then B.", ["Plan A.", "Then B."]),
+    ("Did you say no. I said yes.", ["Did you say no.", "I said yes."]),
+    ("It took 10 min. Then I slept.", ["It took 10 min.", "Then I slept."]),
+    ("I was born in Mar. Now I am here.", ["I was born in Mar.", "Now I am here."]),
+    ("Try it a. Then rest.", ["Try it a.", "Then rest."]),
+])
+def test_real_boundaries_split(text, expected):
+    assert split_sentences(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Dr. A. P. J. Abdul Kalam said so. Yes.", ["Dr. A. P. J. Abdul Kalam said so.", "Yes."]),
+    ("Talk to Mr. Rao today. He listens.", ["Talk to Mr. Rao today.", "He listens."]),
+    ("Try a walk, e.g. around the block. It helps.", ["Try a walk, e.g. around the block.", "It helps."]),
+    ("Pi is 3.14 roughly. Fine.", ["Pi is 3.14 roughly.", "Fine."]),
+])
+def test_abbreviations_initials_and_decimals_do_not_split(text, expected):
+    assert split_sentences(text) == expected
+
+
+def test_indic_terminators():
+    assert split_sentences("मैं ठीक हूँ। आप कैसे हैं?") == ["मैं ठीक हूँ।", "आप कैसे हैं?"]
+    assert split_sentences("நான் நலம். நீங்கள் எப்படி?") == ["நான் நலம்.", "நீங்கள் எப்படி?"]
+
+
+def test_empty_text():
+    assert split_sentences("") == []
+
+
+def test_first_chunk_is_short():
+    sentences = ["Okay.", "Let us take a slow breath together.", "Breathe in for four counts.",
+                 "Hold for four.", "Now breathe out slowly for six counts."]
+    chunks = chunk_sentences(sentences, max_chunks=3, first_chunk_chars=20)
+    assert chunks[0] == "Okay."
+    assert len(chunks) <= 3
+    assert " ".join(chunks) == " ".join(sentences)
@@ -0,0 +1,32 @@
+import json
+
+from core.session_recorder import SessionRecorder, load_recording, redact_credentials, REDACTED
+
+
+def test_init_frame_token_is_not_recorded(tmp_path):
+    recorder = SessionRecorder(directory=str(tmp_path))
+    jwt = "eyJhbGciOiJIUzI1NiJ9.secret-payload.signature"
+    init = {"type": "init", "token": jwt, "agent_id": "default", "lang": "en-IN"}
+    recorder.inbound("s1", init)
+    recorder.close("s1")
+
+    raw = (tmp_path / "s1.jsonl").read_text(encoding="utf-8")
+    assert jwt not in raw
+    frame = load_recording(str(tmp_path / "s1.jsonl"))["inbound"][0]["frame"]
+    assert frame == {"type": "init", "token": REDACTED, "agent_id": "default", "lang": "en-IN"}
+    # The live frame is left alone
+    assert init["token"] == jwt
+
+
+def test_credential_keys_are_redacted_at_any_depth():
+    frame = {
+        "type": "init",
+        "headers": {"Authorization": "Bearer abc", "X-Internal-Token": "xyz", "Content-Type": "application/json"},
+        "data": [{"ws_token": "t", "api_key": "k", "text": "hello"}],
+        "max_output_tokens": 100,
+    }
+    redacted = redact_credentials(frame)
+    assert redacted["headers"] == {"Authorization": REDACTED, "X-Internal-Token": REDACTED, "Content-Type": "application/json"}
+    assert redacted["data"] == [{"ws_token": REDACTED, "api_key": REDACTED, "text": "hello"}]
+    assert redacted["max_output_tokens"] == 100
+    assert json.dumps(redacted).count(REDACTED) == 4
@@ -0,0 +1,78 @@
+import pytest
+
+import core.turn_budget as turn_budget_module
+from core.turn_budget import TurnBudget, fast_model_order, holding_reply
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def advance_ms(self, ms):
+        self.now += ms / 1000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(turn_budget_module.time, "monotonic", clock)
+    return clock
+
+
+def test_remaining_time_shrinks_with_elapsed_time(clock):
+    budget = TurnBudget(budget_ms=2500)
+    clock.advance_ms(700)
+    assert budget.elapsed_ms() == pytest.approx(700)
+    assert budget.remaining_ms() == pytest.approx(1800)
+    assert budget.available_ms(reserve_ms=1200) == pytest.approx(600)
+
+
+def test_timeout_holds_back_reserves_and_respects_bounds(clock):
+    budget = TurnBudget(budget_ms=2500)
+    assert budget.timeout(reserve_ms=400) == pytest.approx(2.1)
+    assert budget.timeout(reserve_ms=400, max_ms=1000) == pytest.approx(1.0)
+    clock.advance_ms(3000)
+    # Budget spent: the stage still gets its minimum
+    assert budget.timeout(reserve_ms=400, min_ms=800) == pytest.approx(0.8)
+
+
+def test_disabled_budget_only_applies_the_cap(clock):
+    budget = TurnBudget(budget_ms=0)
+    clock.advance_ms(10000)
+    assert budget.remaining_ms() == float("inf")
+    assert budget.timeout(reserve_ms=400) is None
+    assert budget.timeout(max_ms=30000) == pytest.approx(30.0)
+    budget.checkpoint("stt")
+    assert budget.checkpoints == {}
+
+
+def test_deadline_is_relative_to_now(clock):
+    budget = TurnBudget(budget_ms=2500)
+    assert budget.deadline(1.5) == pytest.approx(101.5)
+    assert budget.deadline(None) is None
+
+
+def test_checkpoints_and_degradations_are_reported_once(clock):
+    budget = TurnBudget(budget_ms=2500)
+    clock.advance_ms(500)
+    budget.checkpoint("risk")
+    budget.degrade("risk_patterns_only")
+    budget.degrade("risk_patterns_only")
+    assert budget.to_dict() == {
+        "budget_ms": 2500,
+        "remaining_ms": {"risk": 2000.0},
+        "degradations": ["risk_patterns_only"]
+    }
+
+
+def test_fast_models_go_first_without_duplicates(monkeypatch):
+    monkeypatch.setattr(turn_budget_module, "DEGRADED_MODELS", ["fast"])
+    assert fast_model_order(["main", "fast", "backup"]) == ["fast", "main", "backup"]
+
+
+def test_holding_reply_falls_back_to_english():
+    assert holding_reply("ta-IN") == turn_budget_module.HOLDING_REPLIES["ta-IN"]
+    assert holding_reply("fr-FR") == turn_budget_module.HOLDING_REPLIES["en-IN"]
@@ -0,0 +1,26 @@
+from core.turn_metrics import TurnMetrics, summarize_turns
+
+
+def test_stages_report_wall_time_only():
+    turn = TurnMetrics("s1", 0)
+    with turn.stage("llm"):
+        sum(range(10000))
+    record = turn.finish()
+    assert set(record["stages"]["llm"]) == {"wall_ms"}
+    assert set(record["total"]) == {"wall_ms", "process_cpu_ms"}
+
+
+def test_summary_keeps_process_cpu_on_the_total():
+    turns = []
+    for i in range(4):
+        turn = TurnMetrics("s1", i)
+        with turn.stage("stt"):
+            pass
+        turns.append(turn.finish())
+    # Records from older recordings still carry a per-stage cpu_ms
+    turns.append({"stages": {"stt": {"wall_ms": 5.0, "cpu_ms": 1.0}}, "marks": {}, "total": {"wall_ms": 9.0, "cpu_ms": 2.0}})
+
+    summary = summarize_turns(turns)
+    assert summary["stages"]["stt"]["count"] == 5
+    assert "process_cpu_ms" not in summary["stages"]["stt"]
+    assert summary["stages"]["total"]["process_cpu_ms"]["p50"] is not None
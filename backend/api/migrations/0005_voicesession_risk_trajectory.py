@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_userprofile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="voicesession",
+            name="risk_trajectory",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
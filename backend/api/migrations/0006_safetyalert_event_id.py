@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_voicesession_risk_trajectory"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="safetyalert",
+            name="event_id",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
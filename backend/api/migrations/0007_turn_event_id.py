@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_safetyalert_event_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="turn",
+            name="event_id",
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,57 @@
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+
+class SummaryModelCatalog:
+    """
+    Summary model chain, read from the AI service's model catalog.
+
+    The AI service discovers which Gemini models the key can use and keeps
+    the summary chain next to the reply and risk chains. The backend serves
+    the last chain it fetched (GEMINI_SUMMARY_MODELS until the first fetch
+    succeeds) and refreshes it on a background thread once it is older than
+    the TTL, so no request ever waits on the AI service.
+    """
+
+    def __init__(self, ttl_seconds, retry_seconds=60):
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.cached = None
+        self.expires_at = 0.0
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+    def models(self):
+        """Available summary models in order of preference (never blocks on the network)"""
+        with self.lock:
+            models = list(self.cached) if self.cached else list(settings.GEMINI_SUMMARY_MODELS)
+            stale = time.monotonic() >= self.expires_at
+            if stale and not self.refreshing:
+                self.refreshing = True
+                threading.Thread(target=self.refresh, name="summary-model-catalog", daemon=True).start()
+        return models
+
+    def refresh(self):
+        """Fetch the summary chain; on failure keep the last known chain and retry sooner"""
+        try:
+            response = requests.get(f"{settings.FASTAPI_URL}/diagnostics/models", timeout=2)
+            response.raise_for_status()
+            chain = response.json()["chains"]["summary"]
+            models = [entry["model"] for entry in chain if entry.get("available", True)]
+            ttl = self.ttl_seconds
+        except Exception as e:
+            print(f"⚠️ Model catalog unavailable, keeping the last known summary models: {e}")
+            models = None
+            ttl = self.retry_seconds
+
+        with self.lock:
+            if models:
+                self.cached = models
+            self.expires_at = time.monotonic() + ttl
+            self.refreshing = False
+
+
+summary_model_catalog = SummaryModelCatalog(settings.GEMINI_MODEL_CATALOG_TTL)
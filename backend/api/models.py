@@ -47,6 +47,8 @@ class VoiceSession(models.Model):
         ('medium', 'Medium'),
         ('high', 'High'),
     ], default='none')
+    # Per-turn risk levels, decayed score and slope exported by the AI service at session end
+    risk_trajectory = models.JSONField(null=True, blank=True)
 
     def __str__(self):
         return f"Session {self.session_id} - {self.user.username}"
@@ -59,6 +61,8 @@ class Turn(models.Model):
     ])
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Outbox event id from the AI service; a redelivered conversation is not stored twice
+    event_id = models.CharField(max_length=64, null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"{self.role}: {self.text[:50]}..."
@@ -75,6 +79,8 @@ class SafetyAlert(models.Model):
     summary = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     acknowledged = models.BooleanField(default=False)
+    # Outbox event id from the AI service; a redelivered alert is not stored twice
+    event_id = models.CharField(max_length=64, null=True, blank=True, unique=True)
 
     def __str__(self):
         return f"Alert {self.session.session_id} - {self.risk_level}"
@@ -0,0 +1,46 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+class SummaryRateLimiter:
+    """
+    Token bucket for session summary calls to Gemini.
+
+    Summaries share the API key with the AI service's risk and reply calls,
+    so they never queue: when the bucket is empty the request is shed and
+    the client is told when to retry.
+    """
+
+    def __init__(self, rate_per_minute, burst):
+        self.enabled = rate_per_minute > 0
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.shed = 0
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """Take a token; returns seconds until one is available if shed, else 0"""
+        if not self.enabled:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate_per_second)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0
+            self.shed += 1
+            return (1.0 - self.tokens) / self.rate_per_second
+
+    def drain(self):
+        """Empty the bucket after Gemini reports quota exhaustion"""
+        with self.lock:
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+
+
+summary_rate_limiter = SummaryRateLimiter(settings.GEMINI_SUMMARY_RPM, settings.GEMINI_SUMMARY_BURST)
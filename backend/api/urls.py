@@ -21,6 +21,8 @@ urlpatterns = [
 
     # AI Alerts (internal)
     path('ai/alerts/', views.create_safety_alert_view, name='ai_alerts'),
+    path('ai/sessions/risk/', views.session_risk_view, name='ai_session_risk'),
+    path('ai/sessions/turns/', views.session_turns_view, name='ai_session_turns'),
 
     # Legacy (can remove later)
     path('summarize/', views.summarize_session, name='summarize_session'),
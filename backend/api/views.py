@@ -3,6 +3,7 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -13,11 +14,20 @@ import json
 import jwt
 from datetime import datetime, timedelta
 import google.generativeai as genai
-from .models import Agent, VoiceSession, SafetyAlert, UserProfile
+from .models import Agent, VoiceSession, SafetyAlert, Turn, UserProfile
+from .throttling import summary_rate_limiter
+from .model_catalog import summary_model_catalog
 from .serializers import RegisterSerializer, UserSerializer, AgentSerializer, VoiceSessionSerializer, SafetyAlertSerializer
 
-# Configure the Gemini API key
-genai.configure(api_key=settings.GEMINI_API_KEY)
+# Configure the Gemini API key (and endpoint, matching the AI service's GEMINI_API_ENDPOINT)
+if settings.GEMINI_API_ENDPOINT:
+    genai.configure(
+        api_key=settings.GEMINI_API_KEY,
+        transport="rest",
+        client_options={"api_endpoint": settings.GEMINI_API_ENDPOINT}
+    )
+else:
+    genai.configure(api_key=settings.GEMINI_API_KEY)
 
 User = get_user_model()
 
@@ -220,25 +230,6 @@ def summarize_session(request):
             if not settings.GEMINI_API_KEY:
                 return JsonResponse({'error': 'Gemini API key not configured'}, status=500)
 
-            # Try different model names in order of preference
-            model_names = ['gemini-2.5-flash', 'gemini-2.5-flash-preview-05-20', 'gemini-2.5-pro-preview-03-25']
-            model = None
-
-            for model_name in model_names:
-                try:
-                    model = genai.GenerativeModel(model_name)
-                    # Test the model with a simple request
-                    test_response = model.generate_content("Test")
-                    if test_response:
-                        print(f"✅ Using Gemini model: {model_name}")
-                        break
-                except Exception as e:
-                    print(f"❌ Model {model_name} not available: {e}")
-                    continue
-
-            if not model:
-                return JsonResponse({'error': 'No available Gemini models found. Please check your API key and model availability.'}, status=500)
-
             prompt = f"""
             Analyze the following therapy session notes and generate a summary in the following format:
 
@@ -266,7 +257,29 @@ def summarize_session(request):
             {session_notes}
             """
 
-            response = model.generate_content(prompt)
+            # Available summary models in order of preference; every attempt
+            # spends quota, so each one takes a token from the summary bucket
+            model_names = summary_model_catalog.models()
+            response = None
+
+            for model_name in model_names:
+                retry_after = summary_rate_limiter.try_acquire()
+                if retry_after:
+                    result = JsonResponse({'error': 'Summary service is busy, please retry shortly'}, status=429)
+                    result['Retry-After'] = str(int(retry_after) + 1)
+                    return result
+                try:
+                    response = genai.GenerativeModel(model_name).generate_content(prompt)
+                    print(f"✅ Using Gemini model: {model_name}")
+                    break
+                except Exception as e:
+                    print(f"❌ Model {model_name} not available: {e}")
+                    if '429' in str(e) or 'quota' in str(e).lower():
+                        summary_rate_limiter.drain()
+                    continue
+
+            if not response:
+                return JsonResponse({'error': 'No available Gemini models found. Please check your API key and model availability.'}, status=500)
 
             # Parse the response and format it as JSON
             summary = parse_summary(response.text)
@@ -418,6 +431,102 @@ def end_session_view(request):
 
 # Internal AI Alerts
 
+def _internal_events(request, save):
+    """
+    Run save over one event, or over an outbox batch {"events": [...]}
+    A batch answers 200 with a status per event_id, so the AI service can
+    retry only the events that failed.
+    """
+    events = request.data.get('events') if isinstance(request.data, dict) else None
+    if events is None:
+        status, body = save(request.data)
+        return Response(body, status=status)
+
+    results = []
+    for event in events:
+        if not isinstance(event, dict):
+            results.append({'event_id': None, 'status': 400, 'error': 'Expected an object'})
+            continue
+        try:
+            status, body = save(event)
+        except Exception as e:
+            status, body = 500, {'error': str(e)}
+        results.append({'event_id': event.get('event_id'), 'status': status, **body})
+    return Response({'results': results})
+
+def _save_safety_alert(data):
+    event_id = data.get('event_id')
+    if event_id:
+        existing = SafetyAlert.objects.filter(event_id=event_id).first()
+        if existing:
+            return 200, {'alert_id': existing.id}
+    if data.get('risk_level') not in ['none', 'low', 'medium', 'high'] or not data.get('summary'):
+        return 400, {'error': 'Missing required fields'}
+
+    try:
+        session = VoiceSession.objects.get(session_id=data.get('session_id'))
+    except VoiceSession.DoesNotExist:
+        return 404, {'error': 'Session not found'}
+
+    alert = SafetyAlert.objects.create(
+        user=session.user if data.get('user_id') else None,
+        session=session,
+        risk_level=data['risk_level'],
+        summary=data['summary'],
+        event_id=event_id
+    )
+    if data['risk_level'] in ['medium', 'high']:
+        session.risk_level = data['risk_level']
+        session.save()
+    return 200, {'alert_id': alert.id}
+
+def _save_risk_trajectory(data):
+    try:
+        session = VoiceSession.objects.get(session_id=data.get('session_id'))
+    except VoiceSession.DoesNotExist:
+        return 404, {'error': 'Session not found'}
+
+    session.risk_trajectory = {
+        'turns': data.get('turns', 0),
+        'score': data.get('score'),
+        'peak': data.get('peak', 'none'),
+        'slope': data.get('slope'),
+        'trajectory': data.get('trajectory', [])
+    }
+    # The session keeps the highest level it reached
+    levels = ['none', 'low', 'medium', 'high']
+    peak = session.risk_trajectory['peak']
+    if peak in levels and levels.index(peak) > levels.index(session.risk_level):
+        session.risk_level = peak
+    session.save()
+    return 200, {'message': 'Risk trajectory saved'}
+
+def _save_turns(data):
+    event_id = data.get('event_id')
+    if event_id and Turn.objects.filter(event_id=event_id).exists():
+        return 200, {'message': 'Turns already saved'}
+    conversations = data.get('conversations')
+    if not isinstance(conversations, list):
+        return 400, {'error': 'conversations must be a list'}
+
+    try:
+        session = VoiceSession.objects.get(session_id=data.get('session_id'))
+    except VoiceSession.DoesNotExist:
+        return 404, {'error': 'Session not found'}
+    if not session.consented_store:
+        return 409, {'error': 'Session has no storage consent'}
+
+    turns = []
+    for exchange in conversations:
+        if exchange.get('user_text'):
+            turns.append(Turn(session=session, role='user', text=exchange['user_text'], event_id=event_id))
+        if exchange.get('assistant_response'):
+            turns.append(Turn(session=session, role='assistant', text=exchange['assistant_response'], event_id=event_id))
+    # All turns of an event are stored together, so a retry finds all or none
+    with transaction.atomic():
+        Turn.objects.bulk_create(turns)
+    return 200, {'turns': len(turns)}
+
 @api_view(['POST'])
 @permission_classes([])  # AllowAny but with header check
 def create_safety_alert_view(request):
@@ -426,20 +535,31 @@ def create_safety_alert_view(request):
         return Response({'error': 'Unauthorized'}, status=401)
 
     try:
-        session = VoiceSession.objects.get(session_id=request.data.get('session_id'))
-        alert = SafetyAlert.objects.create(
-            user=session.user if request.data.get('user_id') else None,
-            session=session,
-            risk_level=request.data['risk_level'],
-            summary=request.data['summary']
-        )
-        if request.data['risk_level'] in ['medium', 'high']:
-            session.risk_level = request.data['risk_level']
-            session.save()
-        return Response({'alert_id': alert.id})
+        return _internal_events(request, _save_safety_alert)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
 
-    except VoiceSession.DoesNotExist:
-        return Response({'error': 'Session not found'}, status=404)
+@api_view(['POST'])
+@permission_classes([])  # AllowAny but with header check
+def session_risk_view(request):
+    auth_token = request.headers.get('X-Internal-Token')
+    if auth_token != settings.INTERNAL_AI_TOKEN:
+        return Response({'error': 'Unauthorized'}, status=401)
+
+    try:
+        return _internal_events(request, _save_risk_trajectory)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['POST'])
+@permission_classes([])  # AllowAny but with header check
+def session_turns_view(request):
+    auth_token = request.headers.get('X-Internal-Token')
+    if auth_token != settings.INTERNAL_AI_TOKEN:
+        return Response({'error': 'Unauthorized'}, status=401)
+
+    try:
+        return _internal_events(request, _save_turns)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
@@ -17,6 +17,20 @@ SECRET_KEY = os.getenv('SECRET_KEY', os.getenv('DJANGO_SECRET_KEY', 'django-inse
 
 # Gemini API Key for session summarization
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Optional Gemini-compatible endpoint (e.g. the AI service's local stand-in server)
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "").strip()
+
+# Summaries are the lowest-priority Gemini work: this caps the backend's share of
+# the key so live sessions in the AI service keep their quota (0 disables)
+GEMINI_SUMMARY_RPM = float(os.getenv("GEMINI_SUMMARY_RPM", "6"))
+GEMINI_SUMMARY_BURST = float(os.getenv("GEMINI_SUMMARY_BURST", "2"))
+
+# Summary models in order of preference. The AI service's model catalog
+# (/diagnostics/models) is authoritative; this list is used while it can't be reached
+GEMINI_SUMMARY_MODELS = [m.strip() for m in os.getenv(
+    "GEMINI_SUMMARY_MODELS", "gemini-2.5-flash,gemini-2.5-flash-preview-05-20,gemini-2.5-pro-preview-03-25"
+).split(",") if m.strip()]
+GEMINI_MODEL_CATALOG_TTL = float(os.getenv("GEMINI_MODEL_CATALOG_TTL", "300"))
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'